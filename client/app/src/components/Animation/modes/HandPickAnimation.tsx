@@ -389,14 +389,18 @@ const cropFaceImage = (
   canvas.width = 128; // 출력 이미지 크기 (정사각형)
   canvas.height = 128;
 
+  // 얼굴 좌표는 카메라(video) 해상도 기준 - 축소 전송된 결과 프레임이면 이미지 크기에 맞춰 변환
+  const scaleX = image.naturalWidth / videoWidth;
+  const scaleY = image.naturalHeight / videoHeight;
+
   try {
     // 이미지의 특정 영역을 캔버스에 그림 (소스 영역 -> 대상 영역)
     ctx.drawImage(
       image,
-      cropX, // 소스 X
-      cropY, // 소스 Y
-      cropW, // 소스 너비
-      cropH, // 소스 높이
+      cropX * scaleX, // 소스 X
+      cropY * scaleY, // 소스 Y
+      cropW * scaleX, // 소스 너비
+      cropH * scaleY, // 소스 높이
       0, // 대상 X
       0, // 대상 Y
       canvas.width, // 대상 너비
@@ -41,15 +41,30 @@ export interface AnimationProps {
   cameraContainerRef?: React.RefObject<HTMLDivElement>;
 }
 
+// 서버가 결과 메시지에 되돌려 보내는 입력 프레임 정보 (캡처 -> 수신 지연 측정용)
+export interface FrameRefEcho {
+  seq: number;
+  capture_ts: number | null;
+  stale: boolean; // 감지 마감을 넘겨 이전 감지 결과가 쓰인 경우
+  timings: {
+    decode_ms: number;
+    queue_ms: number;
+    inference_ms: number;
+    server_ms: number;
+  };
+}
+
 // 기본 웹소켓 메시지 타입 인터페이스
 export interface BaseWebSocketMessage {
   type: string;
+  frame_ref?: FrameRefEcho;
 }
 
 // 공통 메시지 타입들
 export interface AnimationFrameMessage extends BaseWebSocketMessage {
   type: "animation_frame";
   frame: string;
+  frame_mime?: string; // 이미지 MIME (없으면 image/jpeg)
 }
 
 export interface PlaySoundMessage extends BaseWebSocketMessage {
@@ -372,6 +387,7 @@ export interface HandpickResultMessage extends BaseWebSocketMessage {
     score: number;
   }>;
   result_frame?: string; // Optional: 최종 결과 시점의 프레임 (Base64)
+  result_frame_mime?: string; // result_frame 의 MIME (없으면 image/jpeg)
 }
 
 // 보정 완료 메시지 추가
@@ -401,6 +417,34 @@ export interface AvailabilityResponseMessage extends BaseWebSocketMessage {
   reason?: "limit_reached" | "invalid_mode" | string; // 상세 이유 추가
 }
 
+// --- 추가: 서버가 지정하는 프레임 캡처 프로파일 (단계별 전송 정책) ---
+export interface CaptureProfile {
+  phase: "lobby" | "countdown" | "detecting" | "playback" | string;
+  fps: number; // 0이면 전송 안 함
+  max_dimension: number; // 긴 변 최대 길이 (0이면 원본 유지)
+  jpeg_quality: number; // 0~1
+}
+
+export interface CaptureProfileMessage
+  extends BaseWebSocketMessage,
+    CaptureProfile {
+  type: "capture_profile";
+  mode: AnimationMode;
+}
+
+// --- 추가: 서버가 한 번에 보내는 연출 타임라인 (t초 뒤 message를 일반 메시지처럼 처리) ---
+export interface TimelineEvent {
+  t: number; // 타임라인 수신 시점 기준 상대 시각 (초)
+  message: WebSocketMessage;
+}
+
+export interface AnimationTimelineMessage extends BaseWebSocketMessage {
+  type: "animation_timeline";
+  mode: AnimationMode;
+  duration: number; // 초
+  events: TimelineEvent[];
+}
+
 // 잭팟 효과 메시지 타입 추가
 export interface ShowJackpotEffectMessage extends BaseWebSocketMessage {
   type: "show_jackpot_effect";
@@ -482,4 +526,6 @@ export type WebSocketMessage =
   | HandpickResultMessage
   | HandpickDetectionEndMessage
   | CheckAvailabilityMessage
-  | AvailabilityResponseMessage;
+  | AvailabilityResponseMessage
+  | CaptureProfileMessage
+  | AnimationTimelineMessage;
@@ -10,6 +10,8 @@ import {
   RaceParticipant,
   FaceCoordinates,
   CurtainUpdateMessage,
+  CaptureProfile,
+  AnimationTimelineMessage,
 } from "./types";
 import { useAnimationContext } from "./AnimationContext";
 
@@ -64,6 +66,11 @@ export const useAnimation = (
     Array<[number, number, number, number]>
   >([]);
 
+  // 서버가 지정한 프레임 캡처 프로파일 (없으면 카메라 기본값 사용)
+  const [captureProfile, setCaptureProfile] = useState<CaptureProfile | null>(
+    null
+  );
+
   // 슬롯머신 관련 상태들
   const [slotMachineActive, setSlotMachineActive] = useState<boolean>(false);
   const [currentSlotFaces, setCurrentSlotFaces] = useState<
@@ -211,6 +218,61 @@ export const useAnimation = (
   const messageHandlerRef = useRef<(eventDataString: string) => void>(() => {});
   // --- 수정 끝 ---
 
+  // --- 추가: 연출 타임라인 재생 ---
+  // 파싱된 메시지를 공통/모드별 핸들러로 전달 (타임라인 이벤트도 이 경로로 처리)
+  const dispatchMessageRef = useRef<(message: WebSocketMessage) => void>(
+    () => {}
+  );
+  // 예약된 타임라인 이벤트 타이머 (새 애니메이션 시작, 연결 종료 시 정리)
+  const timelineTimersRef = useRef<ReturnType<typeof setTimeout>[]>([]);
+
+  // --- 추가: 캡처 -> 화면 반영 지연 (glass-to-glass) 측정 ---
+  // frame_ref 가 붙은 메시지를 처리한 시점에서 캡처 시각을 뺀 값 (ms)
+  const latencySamplesRef = useRef<number[]>([]);
+
+  const reportLatency = useCallback(
+    (mode: string) => {
+      const samples = latencySamplesRef.current;
+      latencySamplesRef.current = [];
+      if (samples.length === 0) return;
+
+      const sorted = [...samples].sort((a, b) => a - b);
+      const percentile = (p: number) =>
+        sorted[Math.min(sorted.length - 1, Math.floor((p / 100) * sorted.length))];
+      console.info(
+        `[useAnimation] ${mode} glass-to-glass 지연 (${sorted.length}개): ` +
+          `p50 ${percentile(50).toFixed(1)}ms, p95 ${percentile(95).toFixed(1)}ms, ` +
+          `p99 ${percentile(99).toFixed(1)}ms`
+      );
+
+      if (websocket && websocket.readyState === WebSocket.OPEN) {
+        websocket.send(
+          JSON.stringify({ type: "latency_report", mode, samples_ms: samples })
+        );
+      }
+    },
+    [websocket]
+  );
+  // --- 추가 끝 ---
+
+  const clearTimeline = useCallback(() => {
+    timelineTimersRef.current.forEach(clearTimeout);
+    timelineTimersRef.current = [];
+  }, []);
+
+  const playTimeline = useCallback((timeline: AnimationTimelineMessage) => {
+    timeline.events.forEach(({ t, message }) => {
+      const timer = setTimeout(() => {
+        timelineTimersRef.current = timelineTimersRef.current.filter(
+          (id) => id !== timer
+        );
+        dispatchMessageRef.current(message);
+      }, t * 1000);
+      timelineTimersRef.current.push(timer);
+    });
+  }, []);
+  // --- 추가 끝 ---
+
   // useCallback 안의 로직은 그대로 두되, 의존성 배열을 비워서 최초 렌더링 시에만 생성되도록 함
   // 또는 필요한 최소한의 안정적인 의존성만 남김 (예: setter 함수들)
   // 여기서는 일단 빈 배열로 시도하여 함수의 참조 자체를 안정화
@@ -224,7 +286,9 @@ export const useAnimation = (
             !raceActive &&
             !curtainState.isActive
           ) {
-            setCurrentFrame(`data:image/jpeg;base64,${message.frame}`);
+            setCurrentFrame(
+              `data:${message.frame_mime ?? "image/jpeg"};base64,${message.frame}`
+            );
           }
           break;
 
@@ -266,6 +330,15 @@ export const useAnimation = (
           setStatus("🎉 선정 완료!");
           break;
 
+        case "capture_profile":
+          setCaptureProfile({
+            phase: message.phase,
+            fps: message.fps,
+            max_dimension: message.max_dimension,
+            jpeg_quality: message.jpeg_quality,
+          });
+          break;
+
         case "show_jackpot_effect":
           if (currentMode === "slot") {
             setJackpotActive(true);
@@ -294,7 +367,13 @@ export const useAnimation = (
           }
           break;
 
+        case "animation_timeline":
+          playTimeline(message);
+          break;
+
         case "animation_start":
+          // 이전 애니메이션의 남은 타임라인 이벤트 취소
+          clearTimeline();
           setIsSelecting(true);
           setStatus(
             `${
@@ -344,6 +423,8 @@ export const useAnimation = (
       setStatus,
       setIsFaceDetectionStable,
       updateFacesOptimized,
+      playTimeline,
+      clearTimeline,
     ]
   );
 
@@ -824,7 +905,7 @@ export const useAnimation = (
           setHandpickCountdown(null);
           if (message.result_frame) {
             setFinalHandpickFrame(
-              `data:image/jpeg;base64,${message.result_frame}`
+              `data:${message.result_frame_mime ?? "image/jpeg"};base64,${message.result_frame}`
             );
             console.log("Received and set final handpick frame.");
           } else {
@@ -871,19 +952,32 @@ export const useAnimation = (
 
   // --- 추가: handleCommonMessages의 최신 버전을 ref에 저장 ---
   useEffect(() => {
+    dispatchMessageRef.current = (message: WebSocketMessage) => {
+      const frameRef = message.frame_ref;
+      if (currentMode && frameRef && frameRef.capture_ts !== null) {
+        latencySamplesRef.current.push(performance.now() - frameRef.capture_ts);
+      }
+
+      handleCommonMessages(message);
+
+      if (message.type === "animation_complete") {
+        reportLatency(message.mode);
+      }
+
+      if (currentMode && messageHandlers[currentMode]) {
+        messageHandlers[currentMode](message);
+      }
+    };
+
     messageHandlerRef.current = (eventDataString: string) => {
       try {
         const message: WebSocketMessage = JSON.parse(eventDataString);
-        handleCommonMessages(message);
-
-        if (currentMode && messageHandlers[currentMode]) {
-          messageHandlers[currentMode](message);
-        }
+        dispatchMessageRef.current(message);
       } catch (error) {
         console.error("Error parsing websocket message:", error);
       }
     };
-  }, [handleCommonMessages, currentMode, messageHandlers]);
+  }, [handleCommonMessages, currentMode, messageHandlers, reportLatency]);
   // --- 수정 끝 ---
 
   // --- useEffect: 웹소켓 메시지 핸들러 등록 ---
@@ -899,8 +993,9 @@ export const useAnimation = (
     return () => {
       console.log("[useAnimation] 웹소켓 메시지 핸들러 제거 (stable ref)");
       websocket.removeEventListener("message", stableHandler);
+      clearTimeline();
     };
-  }, [websocket]);
+  }, [websocket, clearTimeline]);
 
   const getSlotMachineState = () => ({
     slotMachineActive,
@@ -1002,6 +1097,7 @@ export const useAnimation = (
     detectedFaces,
     resetCountdown,
     isFaceDetectionStable,
+    captureProfile,
     ...getModeState(),
 
     getSlotMachineState,
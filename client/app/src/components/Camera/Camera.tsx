@@ -9,6 +9,7 @@ import React, {
 import styled from "@emotion/styled";
 import * as faceapi from "face-api.js";
 import { useAnimationContext } from "../Animation/AnimationContext";
+import { CaptureProfile } from "../Animation/types";
 
 // --- 추가: face-api.js 환경 설정 ---
 // face-api.js가 브라우저 환경에서 실행됨을 명시적으로 설정
@@ -54,14 +55,27 @@ const HiddenCanvas = styled.canvas`
   display: none; // 화면에 보이지 않게
 `;
 
+// 기본 프레임 전송 정책 (서버 캡처 프로파일을 받기 전)
+const DEFAULT_FRAME_INTERVAL = 150;
+const DEFAULT_JPEG_QUALITY = 0.85;
+
+// 전송 프레임의 원본 크기 (축소 전송 시 서버가 좌표계 복원에 사용)
+export interface CapturedFrameMeta {
+  sourceWidth: number;
+  sourceHeight: number;
+  // 캡처 시각 (performance.now, ms) - 결과 수신까지의 지연 측정용
+  captureTs: number;
+}
+
 export interface CameraProps {
-  onFrame?: (frame: string) => void;
+  onFrame?: (frame: string, meta?: CapturedFrameMeta) => void;
   isActive: boolean;
   faces?: Array<[number, number, number, number]>; // [x, y, width, height]
   isConnected?: boolean;
   onStabilityChange?: (isStable: boolean) => void;
   shouldSendFrameNow?: boolean;
   isFlipped?: boolean;
+  captureProfile?: CaptureProfile | null;
 }
 
 // 외부에서 호출할 수 있는 메서드 타입 정의
@@ -80,6 +94,7 @@ const Camera = forwardRef<CameraHandle, CameraProps>(
       onStabilityChange,
       shouldSendFrameNow = false,
       isFlipped = false,
+      captureProfile = null,
     },
     ref
   ) => {
@@ -103,6 +118,8 @@ const Camera = forwardRef<CameraHandle, CameraProps>(
     const facesPropRef = useRef(faces);
     const isFlippedRef = useRef(isFlipped);
     const tempDetectionCanvasRef = useRef<HTMLCanvasElement | null>(null);
+    const streamCanvasRef = useRef<HTMLCanvasElement | null>(null);
+    const captureProfileRef = useRef(captureProfile);
 
     useEffect(() => {
       shouldSendFrameNowRef.current = shouldSendFrameNow;
@@ -116,6 +133,10 @@ const Camera = forwardRef<CameraHandle, CameraProps>(
       isFlippedRef.current = isFlipped;
     }, [isFlipped]);
 
+    useEffect(() => {
+      captureProfileRef.current = captureProfile;
+    }, [captureProfile]);
+
     const { currentMode, isSelecting } = useAnimationContext();
 
     useEffect(() => {
@@ -391,6 +412,80 @@ const Camera = forwardRef<CameraHandle, CameraProps>(
       );
     }, [detectFacesClientSide]);
 
+    // 서버 캡처 프로파일(최대 크기/품질)에 맞춰 현재 비디오 프레임을 JPEG로 캡처
+    const captureStreamFrame = useCallback((): {
+      data: string;
+      meta: CapturedFrameMeta;
+    } | null => {
+      const video = videoRef.current;
+      if (!video || video.readyState < video.HAVE_METADATA) return null;
+
+      const profile = captureProfileRef.current;
+      const jpegQuality =
+        profile && profile.jpeg_quality > 0
+          ? profile.jpeg_quality
+          : DEFAULT_JPEG_QUALITY;
+
+      try {
+        // 축소 전송용 캔버스는 별도로 사용 (captureCurrentFrame의 원본 캔버스와 분리)
+        if (!streamCanvasRef.current) {
+          streamCanvasRef.current = document.createElement("canvas");
+        }
+        const streamCanvas = streamCanvasRef.current;
+        const ctx = streamCanvas.getContext("2d");
+        if (!ctx) return null;
+
+        const sourceWidth = video.videoWidth;
+        const sourceHeight = video.videoHeight;
+        const maxDimension = profile?.max_dimension || 0;
+        const scale =
+          maxDimension > 0
+            ? Math.min(1, maxDimension / Math.max(sourceWidth, sourceHeight))
+            : 1;
+        const targetWidth = Math.round(sourceWidth * scale);
+        const targetHeight = Math.round(sourceHeight * scale);
+
+        if (
+          streamCanvas.width !== targetWidth ||
+          streamCanvas.height !== targetHeight
+        ) {
+          streamCanvas.width = targetWidth;
+          streamCanvas.height = targetHeight;
+        }
+
+        ctx.save();
+
+        if (isFlippedRef.current) {
+          ctx.scale(1, -1);
+          ctx.translate(0, -streamCanvas.height);
+        }
+
+        ctx.imageSmoothingEnabled = true;
+        ctx.imageSmoothingQuality = "high";
+        const captureTs = performance.now();
+        ctx.drawImage(video, 0, 0, streamCanvas.width, streamCanvas.height);
+
+        ctx.restore();
+
+        const frame = streamCanvas.toDataURL("image/jpeg", jpegQuality);
+        const base64Data = frame.split(",")[1];
+
+        if (base64Data && base64Data.length > 1000) {
+          return {
+            data: base64Data,
+            meta: { sourceWidth, sourceHeight, captureTs },
+          };
+        }
+        console.warn(
+          "캡처된 프레임 데이터가 너무 작거나 유효하지 않습니다:",
+          base64Data?.length
+        );
+      } catch (error) {
+        console.error("프레임 캡처 중 오류:", error);
+      }
+      return null;
+    }, []);
+
     const captureAndSendFrame = useCallback(() => {
       if (!isActive || !isConnected || !isSelecting) {
         if (frameRequestRef.current)
@@ -407,59 +502,49 @@ const Camera = forwardRef<CameraHandle, CameraProps>(
         return;
       }
 
+      // 서버 캡처 프로파일에 따른 전송 간격 (fps 0이면 전송 안 함)
+      const profile = captureProfileRef.current;
+      const frameInterval = profile
+        ? profile.fps > 0
+          ? 1000 / profile.fps
+          : Infinity
+        : DEFAULT_FRAME_INTERVAL;
+
       const now = Date.now();
-      if (now - lastCaptureTime.current < 150) {
+      if (now - lastCaptureTime.current < frameInterval) {
         frameRequestRef.current = requestAnimationFrame(captureAndSendFrame);
         return;
       }
 
       if (shouldSendFrameNowRef.current) {
-        try {
-          const ctx = canvas.getContext("2d");
-          if (ctx) {
-            if (
-              canvas.width !== video.videoWidth ||
-              canvas.height !== video.videoHeight
-            ) {
-              canvas.width = video.videoWidth;
-              canvas.height = video.videoHeight;
-            }
-
-            ctx.save();
-
-            if (isFlippedRef.current) {
-              ctx.scale(1, -1);
-              ctx.translate(0, -canvas.height);
-            }
-
-            ctx.imageSmoothingEnabled = true;
-            ctx.imageSmoothingQuality = "high";
-            ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
-
-            ctx.restore();
-
-            const frame = canvas.toDataURL("image/jpeg", 0.85);
-            const base64Data = frame.split(",")[1];
-
-            if (base64Data && base64Data.length > 10000) {
-              onFrame?.(base64Data);
-              lastCaptureTime.current = now;
-            } else {
-              console.warn(
-                "캡처된 프레임 데이터가 너무 작거나 유효하지 않습니다:",
-                base64Data?.length
-              );
-            }
-          }
-        } catch (error) {
-          console.error("프레임 캡처 중 오류:", error);
+        const captured = captureStreamFrame();
+        if (captured) {
+          onFrame?.(captured.data, captured.meta);
+          lastCaptureTime.current = now;
         }
       } else {
         lastCaptureTime.current = now;
       }
 
       frameRequestRef.current = requestAnimationFrame(captureAndSendFrame);
-    }, [isActive, onFrame, isConnected, isSelecting]);
+    }, [isActive, onFrame, isConnected, isSelecting, captureStreamFrame]);
+
+    // 대기 화면(lobby)에서 서버가 요청한 경우 저속으로 프레임 전송 (서버 사전 감지용)
+    const lobbyFps =
+      captureProfile?.phase === "lobby" ? captureProfile.fps : 0;
+
+    useEffect(() => {
+      if (!isActive || !isConnected || isSelecting || lobbyFps <= 0) return;
+
+      const lobbyTimer = setInterval(() => {
+        const captured = captureStreamFrame();
+        if (captured) {
+          onFrame?.(captured.data, captured.meta);
+        }
+      }, 1000 / lobbyFps);
+
+      return () => clearInterval(lobbyTimer);
+    }, [isActive, isConnected, isSelecting, lobbyFps, onFrame, captureStreamFrame]);
 
     useEffect(() => {
       console.log(
@@ -8,7 +8,7 @@ import React, {
   useCallback,
 } from "react";
 import styled from "@emotion/styled";
-import Camera, { CameraHandle } from "../Camera/Camera";
+import Camera, { CameraHandle, CapturedFrameMeta } from "../Camera/Camera";
 import { AnimationProvider } from "../Animation/AnimationProvider";
 import { AnimationMode } from "../Animation/types";
 import { useAnimationContext } from "../Animation/AnimationContext";
@@ -494,13 +494,20 @@ const ModalContentComponent = React.memo<{
   const [clientFaceStable, setClientFaceStable] = useState<boolean>(false);
   const [isCameraFlipped, setIsCameraFlipped] = useState<boolean>(false);
 
-  const { detectedFaces, resetCountdown, ...animationState } = useAnimation(
+  const {
+    detectedFaces,
+    resetCountdown,
+    captureProfile,
+    ...animationState
+  } = useAnimation(
     websocket || null,
     () => setIsProcessingInitialRequest(false)
   );
 
   const cameraRef = useRef<CameraHandle>(null);
   const cameraContainerRef = useRef<HTMLDivElement>(null);
+  // 전송 프레임 순번 (서버가 결과 메시지에 되돌려 보내 지연 측정에 사용)
+  const frameSeqRef = useRef<number>(0);
 
   const {
     currentMode,
@@ -558,7 +565,7 @@ const ModalContentComponent = React.memo<{
   }, []);
 
   const handleFrame = useCallback(
-    (frame: string) => {
+    (frame: string, meta?: CapturedFrameMeta) => {
       if (!websocket || websocket.readyState !== WebSocket.OPEN) {
         console.log("WebSocket not ready for handleFrame");
         return;
@@ -569,6 +576,13 @@ const ModalContentComponent = React.memo<{
           type: "start_animation",
           mode: getModeId(modeName),
           frame: frame,
+          frame_seq: ++frameSeqRef.current,
+          capture_ts: meta?.captureTs ?? performance.now(),
+          // 축소 전송된 프레임을 서버가 원본 좌표계로 복원할 수 있도록 원본 크기 전달
+          ...(meta && {
+            source_width: meta.sourceWidth,
+            source_height: meta.sourceHeight,
+          }),
         })
       );
     },
@@ -617,6 +631,8 @@ const ModalContentComponent = React.memo<{
         type: "start_animation",
         mode: getModeId(modeName),
         frame: currentFrameBase64,
+        frame_seq: ++frameSeqRef.current,
+        capture_ts: performance.now(),
         startAnimation: true,
       })
     );
@@ -825,6 +841,7 @@ const ModalContentComponent = React.memo<{
             onStabilityChange={handleClientStabilityChange}
             shouldSendFrameNow={shouldSendFrameNow}
             isFlipped={isCameraFlipped}
+            captureProfile={captureProfile}
           />
         </CameraContainer>
       )}
@@ -1,6 +1,19 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from api.routes import websocket  # 웹소켓 라우터 임포트
+from api.routes import admin  # 관리자 진단 라우터 (SPOTLIGHT_ADMIN_TOKEN 필요)
+from api.services.metered_websocket import send_queue_report
+from src.thread_budget import THREAD_PLAN
+from src.inference import scheduler_report
+from src.face_detection import face_model_pool
+from src.metrics import register_collector, render_prometheus, PROMETHEUS_CONTENT_TYPE
+from src.loop_monitor import loop_monitor
+from src.tracing import get_writer
+from api.services.session_recorder import close_recordings
+from src.config import LOOP_MONITOR_ENABLED, TRACING_ENABLED, SESSION_RECORDING
 
 app = FastAPI()
 
@@ -15,7 +28,73 @@ app.add_middleware(
 
 # 웹소켓 라우터 등록
 app.include_router(websocket.router)
+# 관리자 진단 라우터 등록 (프로파일러, tracemalloc)
+app.include_router(admin.router)
+
+def _runtime_gauges():
+    """수집 시점의 워커 상태 (추론 대기열, 애니메이션 태스크, 모델 풀, 연결/전송 상태)"""
+    schedulers = scheduler_report()
+    supervisor = websocket.animation_service.supervisor.report()
+    pool = face_model_pool.report()
+    send_queue = send_queue_report()
+    return [
+        ('spotlight_inference_queued', '작업 종류별 대기 중인 추론 작업 수',
+         [({'workload': name}, report['queued']) for name, report in schedulers.items()]),
+        ('spotlight_inference_running', '작업 종류별 실행 중인 추론 작업 수',
+         [({'workload': name}, report['running']) for name, report in schedulers.items()]),
+        ('spotlight_animation_tasks', '애니메이션 태스크 상태',
+         [({'state': state}, supervisor[state]) for state in ('running', 'leaked_now')]),
+        ('spotlight_model_pool_available', '빌릴 수 있는 YOLO 복제본 수', [({}, pool['available'])]),
+        ('spotlight_model_pool_waits', '빈 YOLO 복제본을 기다린 누적 횟수', [({}, pool['waits'])]),
+        ('spotlight_connections', '현재 웹소켓 연결 수 (워커 기준)',
+         [({}, len(websocket.animation_service.active_clients))]),
+        ('spotlight_ws_sends_in_flight', '현재 전송 중인 웹소켓 메시지 수', [({}, send_queue['in_flight'])]),
+        ('spotlight_ws_send_queue_peak', '한 연결의 최대 동시 전송 수 (워커 시작 이후)', [({}, send_queue['peak'])]),
+    ]
+
+
+register_collector(_runtime_gauges)
+
+@app.on_event("startup")
+async def apply_thread_budget():
+    # 기본 executor(to_thread 등)도 워커 스레드 예산 안으로 제한
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=THREAD_PLAN.default_executor_threads, thread_name_prefix="default")
+    )
+    print(THREAD_PLAN.describe())
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    # 이벤트 루프 지연 측정 + 블로킹 감시 (막힌 순간의 루프 스레드 스택 기록)
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    await loop_monitor.stop()
+
+@app.on_event("shutdown")
+async def cancel_animation_tasks():
+    # 진행 중인 애니메이션 태스크를 취소하고 grace 시간 동안 종료를 대기
+    await websocket.animation_service.supervisor.cancel_all()
+
+@app.on_event("shutdown")
+async def close_trace_file():
+    # 남은 트레이스 이벤트 기록 후 파일을 닫음 (완전한 JSON 배열)
+    if TRACING_ENABLED:
+        get_writer().close()
+
+@app.on_event("shutdown")
+async def close_recording_files():
+    # 남은 녹화 내용 기록 후 파일을 닫음
+    if SESSION_RECORDING:
+        close_recordings()
 
 @app.get("/")
 async def root():
     return {"message": "Spotlight API Server"}
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus 텍스트 형식 (수집 시점에만 직렬화)
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,79 @@
+import asyncio
+import hmac
+import threading
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from src.config import ADMIN_TOKEN, PROFILE_MAX_SECONDS, PROFILE_MIN_INTERVAL
+from src.sampling_profiler import profiler, render_collapsed
+from src.memory_snapshots import memory_snapshots
+
+
+def require_admin(x_admin_token: str = Header(default='')):
+    """관리자 토큰 확인 (SPOTLIGHT_ADMIN_TOKEN 미설정 시 관리자 경로 자체를 숨김)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404)
+    if not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def sample_profile(seconds: float = 10.0, interval_ms: float = 10.0, loop_only: bool = False, lines: bool = False):
+    """seconds 동안 샘플링 프로파일 후 collapsed stack 반환 (flamegraph.pl, speedscope 입력 형식)
+
+    loop_only: 이벤트 루프 스레드만 수집 / lines: 프레임 이름에 줄 번호 포함
+    """
+    seconds = min(max(seconds, 0.1), PROFILE_MAX_SECONDS)
+    interval = max(interval_ms / 1000, PROFILE_MIN_INTERVAL)
+    thread_ids = {threading.get_ident()} if loop_only else None
+
+    future = profiler.start(seconds, interval, thread_ids=thread_ids, with_lines=lines)
+    if future is None:
+        raise HTTPException(status_code=409, detail="이미 프로파일이 실행 중입니다.")
+    result = await asyncio.wrap_future(future)
+
+    return PlainTextResponse(
+        render_collapsed(result['stacks']),
+        headers={
+            'X-Profile-Samples': str(result['samples']),
+            'X-Profile-Seconds': f"{result['elapsed']:.3f}",
+            # 샘플러 스레드가 스택 수집에 쓴 시간 (프로파일 자체 오버헤드)
+            'X-Profile-Sampler-Seconds': f"{result['sampler_seconds']:.3f}",
+        },
+    )
+
+
+@router.post("/tracemalloc/start")
+async def tracemalloc_start(frames: int = 1):
+    """할당 추적 시작 (frames: 할당 위치로 기록할 스택 깊이, 클수록 비용 증가)"""
+    return memory_snapshots.start(asyncio.get_running_loop(), frames=min(max(frames, 1), 25))
+
+
+@router.post("/tracemalloc/stop")
+async def tracemalloc_stop():
+    return memory_snapshots.stop()
+
+
+@router.get("/tracemalloc")
+async def tracemalloc_status():
+    return memory_snapshots.status()
+
+
+@router.post("/tracemalloc/snapshot")
+async def tracemalloc_snapshot(top: int = 30):
+    """스냅샷 저장 후 모듈별 상위 할당 반환"""
+    try:
+        return await asyncio.to_thread(memory_snapshots.take, top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/tracemalloc/diff")
+async def tracemalloc_diff(base: int = None, target: int = None, top: int = 30):
+    """두 스냅샷의 모듈별 할당 증감 (기본: 가장 오래된 스냅샷 -> 가장 최근 스냅샷)"""
+    try:
+        return await asyncio.to_thread(memory_snapshots.diff, base, target, top)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
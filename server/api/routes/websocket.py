@@ -1,21 +1,25 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from ..services.animation_service import AnimationService
+from ..services.connection_dispatcher import ConnectionDispatcher
+from ..services.metered_websocket import MeteredWebSocket
 
 router = APIRouter()
 animation_service = AnimationService()
 
 @router.websocket("/ws/animation")
 async def animation_websocket(websocket: WebSocket):
-    client_id = id(websocket)
     await websocket.accept()
+    # 전송 지표/트래픽 집계용 래퍼 (이후 모든 처리와 client_id 는 래퍼 기준)
+    websocket = MeteredWebSocket(websocket)
+    client_id = id(websocket)
     
     # 연결 성공 시 서비스에 웹소켓 등록
     animation_service.register_client(client_id, websocket)
     
     try:
-        while True:
-            data = await websocket.receive_json()
-            await animation_service.handle_animation(websocket, data)
+        # 수신 루프: 제어 메시지와 프레임(최신 프레임만 유지)을 분리 처리
+        dispatcher = ConnectionDispatcher(websocket, animation_service)
+        await dispatcher.run()
     except WebSocketDisconnect:
         # 클라이언트가 연결을 종료한 경우
         print(f"클라이언트 연결 종료: {client_id}")
@@ -25,5 +29,8 @@ async def animation_websocket(websocket: WebSocket):
     finally:
         # 어떤 경우든 클라이언트 연결 종료 시 정리 작업 수행
         await animation_service.cleanup_resources(client_id)
+        # 연결별 트래픽 요약 (메시지 type 별 수/바이트, 최대 동시 전송 수)
+        print(websocket.traffic.summary(client_id))
+        websocket.trace.close()
         # 중요: 이미 닫힌 연결을 다시 닫으려고 시도하지 않도록 수정
         # 직접 close()를 호출하지 않고 정리 작업만 수행
@@ -0,0 +1,75 @@
+from src.config import ADMISSION_BACKEND, REDIS_URL
+
+
+class RedisAdmission:
+    """모드별 입장 인원을 Redis Set 으로 관리 (여러 워커가 같은 인원 제한을 공유)
+
+    mode:{mode}:users          입장한 client_id 집합
+    client:{client_id}:current_mode  클라이언트가 입장한 모드
+    """
+    name = 'redis'
+
+    def __init__(self, url=REDIS_URL):
+        import redis.asyncio as redis  # 비동기 Redis 클라이언트 (local 백엔드에서는 불필요)
+        self.redis_pool = redis.ConnectionPool.from_url(url, decode_responses=True)
+        self.redis = redis.Redis(connection_pool=self.redis_pool)
+
+    async def try_admit(self, client_id, mode, limit):
+        """현재 인원이 limit 미만이면 입장 처리 후 True"""
+        mode_users_key = f"mode:{mode}:users"
+        current_users = await self.redis.scard(mode_users_key)
+        if current_users >= limit:
+            return False
+        await self.redis.sadd(mode_users_key, str(client_id))
+        await self.redis.set(f"client:{client_id}:current_mode", mode)
+        return True
+
+    async def release(self, client_id):
+        """클라이언트를 입장한 모드에서 제거 (입장했던 모드 반환, 없으면 None)"""
+        client_mode_key = f"client:{client_id}:current_mode"
+        mode = await self.redis.get(client_mode_key)
+        if mode:
+            await self.redis.srem(f"mode:{mode}:users", str(client_id))
+            await self.redis.delete(client_mode_key)
+        return mode
+
+
+class LocalAdmission:
+    """프로세스 내 입장 인원 관리 (Redis 없이 단일 워커 실행, 오프라인 부하 테스트용)
+
+    인원 제한은 이 프로세스 안에서만 적용된다 (워커가 여럿이면 워커마다 따로 계산).
+    """
+    name = 'local'
+
+    def __init__(self):
+        self.mode_users = {}
+        self.client_modes = {}
+
+    async def try_admit(self, client_id, mode, limit):
+        users = self.mode_users.setdefault(mode, set())
+        if len(users) >= limit:
+            return False
+        users.add(client_id)
+        self.client_modes[client_id] = mode
+        return True
+
+    async def release(self, client_id):
+        mode = self.client_modes.pop(client_id, None)
+        if mode is not None:
+            self.mode_users.get(mode, set()).discard(client_id)
+        return mode
+
+
+_BACKENDS = {
+    RedisAdmission.name: RedisAdmission,
+    LocalAdmission.name: LocalAdmission,
+}
+
+
+def create_admission_backend(name=ADMISSION_BACKEND):
+    """설정된 입장 인원 저장소 생성 (알 수 없는 이름이면 redis)"""
+    backend_cls = _BACKENDS.get(name)
+    if backend_cls is None:
+        print(f"⚠️ 알 수 없는 입장 관리 백엔드 '{name}', redis 사용")
+        backend_cls = RedisAdmission
+    return backend_cls()
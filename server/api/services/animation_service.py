@@ -1,11 +1,18 @@
 from fastapi import WebSocket
-import base64
-import cv2
-import numpy as np
-from src.face_detection import detect_faces_yolo
+from src.codec import decode_frame_async
+from src.face_detection import detect_faces_yolo, forget_client
+from src.inference import PRIORITY_INTERACTIVE
 from src.animation import ANIMATION_MODULES
+from src.animation.capture_profile import send_capture_profile
+from .animation_supervisor import AnimationSupervisor
+from .speculative_detector import SpeculativeDetector
+from .admission import create_admission_backend
+from src.config import SPECULATIVE_DETECTION_ENABLED
+from src.metrics import current_mode, observe_stage, count_error, FRAMES, ANIMATIONS, mode_label
+from src.tracing import record_span
+from src.frame_timing import FrameRef, current_frame_ref, MAX_REPORTED_LATENCY_MS, MAX_REPORT_SAMPLES
 import asyncio
-import redis.asyncio as redis # 비동기 Redis 클라이언트 임포트
+import time
 
 # 모드별 최대 허용 인원 정의 (handpick: 1명, scanner: 3명, 나머지는 제한 없음 - 매우 큰 수)
 MODE_LIMITS = {
@@ -21,18 +28,27 @@ class AnimationService:
     def __init__(self):
         # 사용자별 마지막 프레임을 저장할 딕셔너리
         self.last_frames = {}
+        # 사용자별 마지막 프레임의 수신 순번 (오래된 프레임으로 덮어쓰기 방지)
+        self.last_frame_seqs = {}
+        # 사용자별 마지막 프레임의 출처 정보 (클라이언트 frame_seq / capture_ts, 디코딩 시간)
+        self.last_frame_refs = {}
+        # 사용자별 마지막 프레임 픽셀 -> 원본 카메라 좌표 배율 (캡처 프로파일로 축소 전송된 프레임은 1보다 큼)
+        self.last_frame_scales = {}
         # 활성 클라이언트 저장 (웹소켓 객체) - 워커별로 관리됨
         self.active_clients = {}
         # 진행 중인 애니메이션 작업 저장 (애니메이션 중지 플래그) - 워커별로 관리될 수 있음
         self.running_animations = {}
         # 클라이언트별 활성 애니메이션 상태 (애니메이션 로직 실행 여부) - 워커별로 관리될 수 있음
         self.active_animations = {}
+        # 클라이언트별 애니메이션 태스크 핸들 관리 (재시작/연결 종료 시 실제 취소)
+        self.supervisor = AnimationSupervisor()
+        # 입장 허용된 클라이언트의 모드 (대기 화면 사전 감지 대상)
+        self.lobby_modes = {}
+        # 대기 화면 클라이언트 사전 감지기 (선택 기능)
+        self.speculative_detector = SpeculativeDetector(self) if SPECULATIVE_DETECTION_ENABLED else None
         
-        # --- Redis 클라이언트 초기화 ---
-        # TODO: Redis 연결 정보는 환경 변수나 설정 파일에서 가져오도록 수정하는 것이 좋습니다.
-        self.redis_pool = redis.ConnectionPool(host='localhost', port=6379, db=0, decode_responses=True)
-        self.redis = redis.Redis(connection_pool=self.redis_pool)
-        # print("AnimationService 초기화: Redis 클라이언트 생성 완료")
+        # --- 모드별 입장 인원 저장소 (기본 Redis, SPOTLIGHT_ADMISSION_BACKEND=local 이면 프로세스 내) ---
+        self.admission = create_admission_backend()
 
         # self.active_mode_users는 이제 Redis가 관리하므로 제거합니다.
         # print(f"AnimationService 초기화 완료. 모드별 사용자 저장소: {self.active_mode_users}")
@@ -40,6 +56,8 @@ class AnimationService:
     def register_client(self, client_id, websocket):
         """새로운 클라이언트 연결 등록"""
         self.active_clients[client_id] = websocket
+        if self.speculative_detector is not None:
+            self.speculative_detector.ensure_running()
         # print(f"새 클라이언트 등록: {client_id}, 현재 총 {len(self.active_clients)}개 연결 (워커 기준)")
 
     def unregister_client(self, client_id):
@@ -49,12 +67,25 @@ class AnimationService:
             # print(f"클라이언트 등록 해제: {client_id}, 현재 총 {len(self.active_clients)}개 연결 (워커 기준)")
 
     async def cleanup_resources(self, client_id):
-        """클라이언트 연결 종료 시 관련 리소스 정리 (Redis 포함)"""
+        """클라이언트 연결 종료 시 관련 리소스 정리 (입장 인원 저장소 포함)"""
         # print(f"클라이언트 리소스 정리 시작: {client_id}")
 
+        # 실행 중인 애니메이션 태스크 즉시 취소 (대기 중인 추론 요청도 함께 폐기)
+        if client_id in self.running_animations:
+            self.running_animations[client_id] = False
+        await self.supervisor.cancel(client_id)
+
         # 저장된 프레임 제거
         if client_id in self.last_frames:
             del self.last_frames[client_id]
+        self.last_frame_seqs.pop(client_id, None)
+        self.last_frame_refs.pop(client_id, None)
+        self.last_frame_scales.pop(client_id, None)
+        # 클라이언트별 감지 상태(장면 변화 게이트 등) 제거
+        forget_client(client_id)
+        self.lobby_modes.pop(client_id, None)
+        if self.speculative_detector is not None:
+            self.speculative_detector.forget(client_id)
 
         # 진행 중인 애니메이션 작업 정리
         if client_id in self.running_animations:
@@ -65,16 +96,8 @@ class AnimationService:
         if client_id in self.active_animations:
              del self.active_animations[client_id]
 
-        # --- Redis에서 클라이언트 모드 정보 제거 ---
-        client_mode_key = f"client:{client_id}:current_mode"
-        mode = await self.redis.get(client_mode_key)
-        removed_from_mode_redis = False
-        if mode:
-            mode_users_key = f"mode:{mode}:users"
-            await self.redis.srem(mode_users_key, str(client_id))
-            await self.redis.delete(client_mode_key)
-            # print(f"Redis: 클라이언트 {client_id}가 {mode} 모드에서 나감.")
-            removed_from_mode_redis = True
+        # --- 입장 인원 저장소에서 클라이언트 모드 정보 제거 ---
+        removed_mode = await self.admission.release(client_id)
         
         # --- 기존 로직: 모드별 활성 사용자 목록에서 제거 (Python dict - 이제 사용 안 함) ---
         # removed_from_mode = None
@@ -86,7 +109,7 @@ class AnimationService:
 
         self.unregister_client(client_id) # 워커 내부 active_clients 에서 제거
 
-        # print(f"클라이언트 리소스 정리 완료: {client_id}, Redis에서 모드 제거: {removed_from_mode_redis}")
+        # print(f"클라이언트 리소스 정리 완료: {client_id}, 입장 모드에서 제거: {removed_mode}")
 
     async def handle_animation(self, websocket: WebSocket, data: dict):
         client_id = id(websocket)
@@ -110,25 +133,21 @@ class AnimationService:
                 })
                 return
 
-            # --- Redis에서 현재 모드 사용자 수 확인 ---
-            mode_users_key = f"mode:{mode}:users"
-            current_users = await self.redis.scard(mode_users_key)
+            # --- 현재 모드 사용자 수 확인 후 입장 처리 (Redis 또는 프로세스 내 저장소) ---
             limit = MODE_LIMITS.get(mode, float('inf')) # MODE_LIMITS에 없으면 무제한으로 처리
-            
-            # print(f"[AnimationService] Redis 모드 '{mode}': 현재 인원 {current_users}, 제한 {limit}")
-
-            if current_users < limit:
-                # 입장 허용: Redis Set에 추가 및 클라이언트 모드 정보 저장
-                await self.redis.sadd(mode_users_key, str(client_id))
-                await self.redis.set(f"client:{client_id}:current_mode", mode)
-                # print(f"[AnimationService] Redis 모드 '{mode}' 입장 허용. 클라이언트 {client_id} 추가. 현재 인원: {await self.redis.scard(mode_users_key)}")
+
+            if await self.admission.try_admit(client_id, mode, limit):
+                # 입장 허용: 저장소에 클라이언트와 모드 정보 저장됨
+                self.lobby_modes[client_id] = mode
+                # print(f"[AnimationService] 모드 '{mode}' 입장 허용. 클라이언트 {client_id} 추가.")
                 await websocket.send_json({
                     'type': 'availability_response',
                     'allowed': True,
                     'mode': mode
                 })
+                await send_capture_profile(websocket, mode, 'lobby')
             else:
-                # print(f"[AnimationService] Redis 모드 '{mode}' 입장 불가 (인원 초과). 클라이언트: {client_id}")
+                # print(f"[AnimationService] 모드 '{mode}' 입장 불가 (인원 초과). 클라이언트: {client_id}")
                 await websocket.send_json({
                     'type': 'availability_response',
                     'allowed': False,
@@ -137,6 +156,21 @@ class AnimationService:
                 })
             return # 확인 요청 처리 후 종료
 
+        # --- 세션 트레이스 켜기/끄기 (SPOTLIGHT_TRACING 이 켜져 있을 때만 적용) ---
+        if message_type == 'set_tracing':
+            enabled = websocket.trace.set_enabled(data.get('enabled', True))
+            await websocket.send_json({'type': 'tracing_status', 'enabled': enabled})
+            return
+
+        # --- 클라이언트가 측정한 캡처 -> 결과 수신 지연 보고 ---
+        if message_type == 'latency_report':
+            samples = data.get('samples_ms')
+            if isinstance(samples, list):
+                for latency_ms in samples[:MAX_REPORT_SAMPLES]:
+                    if isinstance(latency_ms, (int, float)) and 0 <= latency_ms <= MAX_REPORTED_LATENCY_MS:
+                        observe_stage('glass_to_glass', latency_ms / 1000, data.get('mode'))
+            return
+
         # --- 기존 메시지 처리 로직 ---
 
         # 클라이언트에서 보내는 애니메이션 완료 메시지 처리 추가
@@ -149,6 +183,7 @@ class AnimationService:
             # 애니메이션 완료 처리 (선택 완료 메시지 등)
             await websocket.send_json({'type': 'selection_complete', 'mode': mode})
             await websocket.send_json({'type': 'animation_complete', 'mode': mode})
+            await send_capture_profile(websocket, mode, 'lobby')
 
             # 애니메이션 완료 시 active_animations 상태 업데이트
             if client_id in self.active_animations:
@@ -165,120 +200,59 @@ class AnimationService:
             #     print(f"[AnimationService] 경고: 클라이언트 {client_id}가 {mode} 모드에 없는데 애니메이션 시작 요청함.")
                 # 여기서 오류 처리 또는 무시할 수 있음
 
+            # 'frame' 데이터가 없는 경우
+            if 'frame' not in data:
+                print(f"[AnimationService] 프레임 데이터 누락 (클라이언트: {client_id})")
+                await websocket.send_json({
+                    'type': 'error',
+                    'message': "프레임 데이터가 필요합니다."
+                })
+                # 이 경우에도 실행 관련 플래그 해제 필요
+                self.running_animations[client_id] = False
+                self.active_animations[client_id] = False
+                return
+
+            # startAnimation=False 인 경우: 프레임만 업데이트하고 얼굴 감지 등은 하지 않음
+            if not data.get('startAnimation'):
+                await self.handle_frame_update(client_id, data)
+                return
+
             try:
-                # 이전에 실행 중인 애니메이션이 있으면 중지 플래그 설정
-                if client_id in self.running_animations and self.running_animations[client_id]:
-                    # print(f"[AnimationService] 기존 애니메이션 중지 플래그 설정 (클라이언트: {client_id})")
-                    self.running_animations[client_id] = False # 실행 중지 플래그만 설정
+                # 새 애니메이션 시작 요청이면 기존 애니메이션 태스크를 실제로 취소
+                if self.supervisor.is_active(client_id):
+                    # print(f"[AnimationService] 기존 애니메이션 태스크 취소 (클라이언트: {client_id})")
+                    self.running_animations[client_id] = False
+                    await self.supervisor.cancel(client_id)
 
-                # 새 애니메이션 실행용 플래그 설정 (startAnimation=True 일 때만 의미 가짐)
+                # 새 애니메이션 실행용 플래그 설정
                 self.running_animations[client_id] = True
                 # 활성 애니메이션 상태 초기화 (실제 애니메이션 시작 직전에 True로 설정)
                 self.active_animations[client_id] = False
 
-                # 프레임 디코딩 - 'frame' 필드가 있는 경우에만 처리
-                if 'frame' in data:
-                    frame = self._decode_frame(data['frame'])
-                    self.last_frames[client_id] = frame # 최신 프레임 저장
-
-                    # 실제 애니메이션 시작 요청인지 확인 (startAnimation 플래그)
-                    if data.get('startAnimation'):
-                        # print(f"[AnimationService] startAnimation=True 확인. 얼굴 감지 시작 (클라이언트: {client_id})")
-                        faces = await detect_faces_yolo(frame)
-
-                        if len(faces) == 0:
-                            # print(f"[AnimationService] 얼굴 미감지 - 오류 메시지 전송 (클라이언트: {client_id})")
-                            await websocket.send_json({
-                                'type': 'error',
-                                'message': '❌ 감지된 얼굴이 없습니다.'
-                            })
-                            # 애니메이션 실행 플래그 및 상태 해제
-                            self.running_animations[client_id] = False
-                            self.active_animations[client_id] = False
-                            return # 애니메이션 실행 안함
-
-                        # mode = data['mode'] # 이미 위에서 가져옴
-                        if mode and mode in ANIMATION_MODULES:
-                            # print(f"[AnimationService] {mode} 애니메이션 함수 준비 (클라이언트: {client_id})")
-                            animation_func = ANIMATION_MODULES[mode]
-
-                            # 활성 애니메이션 상태를 True로 설정 (실제 실행 직전)
-                            self.active_animations[client_id] = True
-                            # print(f"[AnimationService] active_animations[{client_id}] = True 설정")
-
-
-                            # 애니메이션 실행 중지 확인 함수 (클로저 사용)
-                            def is_running():
-                                is_still_running = self.running_animations.get(client_id, False)
-                                # print(f"[is_running check for {client_id}]: {is_still_running}") # 디버깅 로그 추가
-                                return is_still_running
-
-
-                            # 비동기 태스크로 애니메이션 함수 실행
-                            # print(f"[AnimationService] {mode} 애니메이션 태스크 생성 및 실행 (클라이언트: {client_id})")
-                            animation_task = asyncio.create_task(
-                                animation_func(frame, faces, websocket, data['frame'], is_running, self, client_id)
-                            )
-
-                            # 애니메이션 완료 후 처리 (비동기 태스크 내에서 완료 메시지 전송 등)
-                            async def handle_animation_completion():
-                                try:
-                                    await animation_task # 애니메이션 태스크 완료 대기
-                                    # print(f"[AnimationService] {mode} 애니메이션 태스크 완료 (클라이언트: {client_id})")
-
-                                    # 애니메이션이 정상적으로 (중단되지 않고) 완료되었고, 룰렛 모드가 아닐 경우 완료 메시지 전송
-                                    if is_running() and mode != 'roulette':
-                                        # print(f"[AnimationService] {mode} 애니메이션 완료 메시지 전송 (클라이언트: {client_id})")
-                                        await websocket.send_json({
-                                            'type': 'animation_complete',
-                                            'mode': mode
-                                        })
-                                except asyncio.CancelledError:
-                                     print(f"[AnimationService] {mode} 애니메이션 태스크 취소됨 (클라이언트: {client_id})")
-                                except Exception as e:
-                                    print(f"[AnimationService] 애니메이션 완료 처리 중 오류 (클라이언트: {client_id}): {str(e)}")
-                                finally:
-                                     # 애니메이션 태스크 완료 또는 취소/오류 시 active_animations 상태 업데이트
-                                     if client_id in self.active_animations:
-                                          # print(f"[AnimationService] active_animations[{client_id}] = False 설정 (태스크 종료)")
-                                          self.active_animations[client_id] = False
-                                     # running_animations 플래그는 is_running() 호출 시 체크되므로 여기서 건드리지 않음
-                                     # print(f"[AnimationService] 애니메이션 완료 처리 종료 (클라이언트: {client_id})")
-
-
-                            # 완료 처리 태스크 시작
-                            asyncio.create_task(handle_animation_completion())
-
-                            # handle_animation 함수는 즉시 반환되어 다음 메시지를 받을 수 있음
-                            return
-
-                        else:
-                            # print(f"[AnimationService] 정의되지 않은 모드 또는 모듈 없음: {mode} (클라이언트: {client_id})")
-                            # 유효하지 않은 모드에 대한 오류 메시지 전송 등 처리 추가 가능
-                             await websocket.send_json({
-                                 'type': 'error',
-                                 'message': f"❌ 알 수 없는 모드({mode})입니다."
-                             })
-                             self.running_animations[client_id] = False
-                             self.active_animations[client_id] = False
-
-
-                    # else: startAnimation=False 인 경우
-                        # print(f"[AnimationService] startAnimation=False, 프레임만 업데이트 (클라이언트: {client_id})")
-                        # 단순히 프레임만 업데이트하고 얼굴 감지 등은 하지 않음
-                        # 필요 시 얼굴 감지 결과만 보내는 로직 추가 가능
-                        pass
-
-                else: # 'frame' 데이터가 없는 경우
-                    print(f"[AnimationService] 프레임 데이터 누락 (클라이언트: {client_id})")
+                if not mode or mode not in ANIMATION_MODULES:
+                    # print(f"[AnimationService] 정의되지 않은 모드 또는 모듈 없음: {mode} (클라이언트: {client_id})")
                     await websocket.send_json({
                         'type': 'error',
-                        'message': "프레임 데이터가 필요합니다."
+                        'message': f"❌ 알 수 없는 모드({mode})입니다."
                     })
-                    # 이 경우에도 실행 관련 플래그 해제 필요
                     self.running_animations[client_id] = False
                     self.active_animations[client_id] = False
-
+                    return
+
+                # 프레임 디코딩(codec 풀) 및 최신 프레임 저장
+                decode_started = time.monotonic()
+                frame = await decode_frame_async(data['frame'], client_id, priority=PRIORITY_INTERACTIVE)
+                start_ref = FrameRef.from_message(data, (time.monotonic() - decode_started) * 1000)
+                self._store_frame(client_id, frame, data.get('_seq'), start_ref)
+
+                # 얼굴 감지부터 애니메이션 완료까지 하나의 태스크로 실행
+                # (감지 중에도 제어 메시지 처리가 막히지 않도록 handle_animation 은 즉시 반환)
+                # print(f"[AnimationService] {mode} 애니메이션 태스크 생성 및 실행 (클라이언트: {client_id})")
+                self.supervisor.spawn(
+                    client_id,
+                    self._run_animation(websocket, client_id, mode, frame, data['frame'], start_ref),
+                    name=f"animation:{mode}:{client_id}"
+                )
 
             except Exception as e:
                 # start_animation 처리 중 예외 발생 시
@@ -294,21 +268,111 @@ class AnimationService:
                      self.active_animations[client_id] = False
                 # raise # 디버깅 시 주석 해제
 
-    def _decode_frame(self, frame_data: str) -> np.ndarray:
+    async def handle_frame_update(self, client_id, data: dict):
+        """애니메이션 진행 중 전송되는 일반 프레임 처리 (디코딩 후 최신 프레임으로 저장)"""
+        decode_started = time.monotonic()
         try:
-            # Base64 문자열 앞의 'data:image/jpeg;base64,' 제거 (클라이언트에서 붙이는 경우)
-            if frame_data.startswith('data:image'):
-                frame_data = frame_data.split(',')[1]
-
-            nparr = np.frombuffer(base64.b64decode(frame_data), np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            if img is None:
-                raise ValueError("cv2.imdecode returned None")
-            return img
+            # 디코딩은 codec 풀에서 실행 (이벤트 루프를 막지 않음)
+            frame = await decode_frame_async(data['frame'], client_id)
         except Exception as e:
+            # 손상된 프레임 하나 때문에 연결을 끊지 않음 (이전 프레임 유지)
             print(f"프레임 디코딩 오류: {e}")
-            # print(f"오류 발생한 프레임 데이터 (앞 50자): {frame_data[:50]}") # 디버깅용
+            FRAMES.inc(mode_label(), 'decode_error')
+            return
+
+        frame_ref = FrameRef.from_message(data, (time.monotonic() - decode_started) * 1000)
+        # 캡처 프로파일로 축소 전송된 프레임은 축소된 채로 보관하고 원본 좌표 배율만 함께 저장
+        # (감지된 얼굴 좌표는 이 배율로 시작 프레임과 같은 원본 카메라 좌표계로 변환됨)
+        source_width = data.get('source_width')
+        scale = source_width / frame.shape[1] if source_width else 1.0
+        self._store_frame(client_id, frame, data.get('_seq'), frame_ref, scale)
+
+    def _store_frame(self, client_id, frame, seq=None, frame_ref=None, scale=1.0):
+        """최신 프레임 저장 (수신 순서가 더 오래된 프레임으로 덮어쓰지 않음)"""
+        if seq is not None:
+            if seq < self.last_frame_seqs.get(client_id, -1):
+                return
+            self.last_frame_seqs[client_id] = seq
+        self.last_frames[client_id] = frame
+        self.last_frame_refs[client_id] = frame_ref
+        self.last_frame_scales[client_id] = scale
+
+    def frame_scale(self, client_id):
+        """최신 프레임 픽셀 -> 원본 카메라 좌표 배율 (축소 전송되지 않았으면 1.0)"""
+        return self.last_frame_scales.get(client_id, 1.0)
+
+    def frame_ref(self, client_id):
+        """최신 프레임으로 시작하는 작업용 FrameRef (클라이언트가 frame_seq 를 보내지 않았으면 None)"""
+        frame_ref = self.last_frame_refs.get(client_id)
+        return frame_ref.derive() if frame_ref is not None else None
+
+    async def _run_animation(self, websocket: WebSocket, client_id, mode, frame, original_frame, start_ref=None):
+        """시작 프레임 얼굴 감지 후 애니메이션 실행 및 완료 처리 (supervisor 태스크)"""
+
+        # 애니메이션 실행 중지 확인 함수 (클로저 사용)
+        def is_running():
+            is_still_running = self.running_animations.get(client_id, False)
+            # print(f"[is_running check for {client_id}]: {is_still_running}") # 디버깅 로그 추가
+            return is_still_running
+
+        # 이 태스크에서 실행되는 감지/전송 지표의 모드 레이블
+        current_mode.set(mode)
+        # 시작 프레임 감지 시간은 start_ref 에 누적 (init_* 메시지에서 되돌려 보냄)
+        current_frame_ref.set(start_ref)
+        started = time.monotonic()
+        result = 'completed'
+        try:
+            # print(f"[AnimationService] startAnimation=True 확인. 얼굴 감지 시작 (클라이언트: {client_id})")
+            faces = await detect_faces_yolo(frame, client_id, priority=PRIORITY_INTERACTIVE)
+
+            if len(faces) == 0:
+                # print(f"[AnimationService] 얼굴 미감지 - 오류 메시지 전송 (클라이언트: {client_id})")
+                await websocket.send_json({
+                    'type': 'error',
+                    'message': '❌ 감지된 얼굴이 없습니다.'
+                })
+                # 애니메이션 실행 플래그 해제 (active_animations 는 finally 에서 해제)
+                self.running_animations[client_id] = False
+                result = 'no_faces'
+                await send_capture_profile(websocket, mode, 'lobby')
+                return # 애니메이션 실행 안함
+
+            # print(f"[AnimationService] {mode} 애니메이션 함수 준비 (클라이언트: {client_id})")
+            animation_func = ANIMATION_MODULES[mode]
+
+            # 활성 애니메이션 상태를 True로 설정 (실제 실행 직전)
+            self.active_animations[client_id] = True
+
+            await animation_func(frame, faces, websocket, original_frame, is_running, self, client_id)
+            # print(f"[AnimationService] {mode} 애니메이션 태스크 완료 (클라이언트: {client_id})")
+
+            # 애니메이션이 정상적으로 (중단되지 않고) 완료되었고, 룰렛 모드가 아닐 경우 완료 메시지 전송
+            if is_running() and mode != 'roulette':
+                # print(f"[AnimationService] {mode} 애니메이션 완료 메시지 전송 (클라이언트: {client_id})")
+                await websocket.send_json({
+                    'type': 'animation_complete',
+                    'mode': mode
+                })
+                # 대기 화면으로 복귀
+                await send_capture_profile(websocket, mode, 'lobby')
+        except asyncio.CancelledError:
+            result = 'cancelled'
+            print(f"[AnimationService] {mode} 애니메이션 태스크 취소됨 (클라이언트: {client_id})")
             raise
+        except Exception as e:
+            result = 'error'
+            count_error('animation', mode)
+            print(f"[AnimationService] 애니메이션 완료 처리 중 오류 (클라이언트: {client_id}): {str(e)}")
+        finally:
+            ANIMATIONS.inc(mode_label(mode), result)
+            finished = time.monotonic()
+            observe_stage('animation_total', finished - started, mode)
+            record_span(f'animation:{mode}', 'animation', started, finished, result=result)
+            # 애니메이션 태스크 완료 또는 취소/오류 시 active_animations 상태 업데이트
+            if client_id in self.active_animations:
+                # print(f"[AnimationService] active_animations[{client_id}] = False 설정 (태스크 종료)")
+                self.active_animations[client_id] = False
+            # running_animations 플래그는 is_running() 호출 시 체크되므로 여기서 건드리지 않음
 
     async def _send_faces(self, websocket: WebSocket, faces):
         # 이 함수는 현재 직접 호출되지 않음. 필요 시 사용.
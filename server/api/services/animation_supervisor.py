@@ -0,0 +1,89 @@
+import asyncio
+
+
+class AnimationSupervisor:
+    """클라이언트별 애니메이션 태스크 핸들을 보관하고, 재시작/연결 종료 시 실제로 취소"""
+
+    def __init__(self, cancel_grace: float = 2.0):
+        # client_id -> 실행 중인 태스크 집합
+        self.tasks = {}
+        # 취소 요청 후 grace 시간 안에 끝나지 않은 태스크 (누수 의심)
+        self.leaked_tasks = set()
+        # 취소 후 종료를 기다리는 최대 시간 (초)
+        self.cancel_grace = cancel_grace
+        self.started_count = 0
+        self.completed_count = 0
+        self.cancelled_count = 0
+        self.leaked_total = 0
+
+    def spawn(self, client_id, coro, name=None):
+        """클라이언트 소유의 태스크를 생성하고 핸들을 보관"""
+        task = asyncio.create_task(coro, name=name)
+        self.tasks.setdefault(client_id, set()).add(task)
+        self.started_count += 1
+        task.add_done_callback(lambda t: self._on_task_done(client_id, t))
+        return task
+
+    def _on_task_done(self, client_id, task):
+        client_tasks = self.tasks.get(client_id)
+        if client_tasks is not None:
+            client_tasks.discard(task)
+            if not client_tasks:
+                del self.tasks[client_id]
+        self.leaked_tasks.discard(task)
+
+        if task.cancelled():
+            self.cancelled_count += 1
+        else:
+            self.completed_count += 1
+            # 처리되지 않은 예외가 "never retrieved" 경고로 남지 않도록 회수
+            exc = task.exception()
+            if exc is not None:
+                print(f"[AnimationSupervisor] 태스크 오류 (클라이언트: {client_id}): {exc}")
+
+    def is_active(self, client_id):
+        """해당 클라이언트의 태스크가 아직 실행 중인지 여부"""
+        return any(not t.done() for t in self.tasks.get(client_id, ()))
+
+    async def cancel(self, client_id):
+        """클라이언트의 모든 태스크를 취소하고 grace 시간 동안 종료를 대기
+
+        반환값은 grace 시간 안에 끝나지 않은(누수된) 태스크 수.
+        """
+        current = asyncio.current_task()
+        pending = [t for t in self.tasks.get(client_id, ()) if not t.done() and t is not current]
+        if not pending:
+            return 0
+
+        for task in pending:
+            task.cancel()
+
+        _, still_running = await asyncio.wait(pending, timeout=self.cancel_grace)
+
+        if still_running:
+            self.leaked_tasks.update(still_running)
+            self.leaked_total += len(still_running)
+            print(f"⚠️ [AnimationSupervisor] 취소 후에도 종료되지 않은 태스크 {len(still_running)}개 (클라이언트: {client_id})")
+
+        return len(still_running)
+
+    async def cancel_all(self):
+        """모든 클라이언트의 태스크 취소 (워커 종료 시)"""
+        for client_id in list(self.tasks.keys()):
+            await self.cancel(client_id)
+
+    def leaked_count(self):
+        """현재 남아 있는 누수 태스크 수"""
+        return sum(1 for t in self.leaked_tasks if not t.done())
+
+    def report(self):
+        """태스크 상태 요약"""
+        return {
+            'clients': len(self.tasks),
+            'running': sum(len(tasks) for tasks in self.tasks.values()),
+            'started': self.started_count,
+            'completed': self.completed_count,
+            'cancelled': self.cancelled_count,
+            'leaked_total': self.leaked_total,
+            'leaked_now': self.leaked_count(),
+        }
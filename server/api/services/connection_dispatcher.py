@@ -0,0 +1,142 @@
+import asyncio
+import json
+import time
+from fastapi import WebSocket
+from src.metrics import current_mode, observe_stage, count_error, FRAMES, mode_label, MODE_LABELS
+from src.tracing import current_trace
+from .session_recorder import create_session_recorder
+
+
+def is_frame_update(data: dict) -> bool:
+    """애니메이션 진행 중 전송되는 일반 프레임 메시지인지 여부 (최신 프레임만 의미 있음)"""
+    return (
+        data.get('type') == 'start_animation'
+        and 'frame' in data
+        and not data.get('startAnimation')
+    )
+
+
+class FrameMailbox:
+    """단일 슬롯 메일박스: 처리되지 않은 이전 프레임은 새 프레임으로 덮어씀 (latest-frame-wins)"""
+
+    def __init__(self):
+        self._item = None
+        self._event = asyncio.Event()
+        # 디코딩되기 전에 새 프레임에 밀려 버려진 프레임 수
+        self.dropped = 0
+
+    def put(self, item):
+        """프레임 저장 (처리되지 않은 이전 프레임을 버렸으면 True)"""
+        replaced = self._item is not None
+        if replaced:
+            self.dropped += 1
+        self._item = item
+        self._event.set()
+        return replaced
+
+    async def get(self):
+        await self._event.wait()
+        item = self._item
+        self._item = None
+        self._event.clear()
+        return item
+
+
+class ConnectionDispatcher:
+    """웹소켓 연결별 수신 분배기
+
+    수신 루프(reader)는 메시지를 파싱해 두 경로로 나눈다.
+    - 일반 프레임: 단일 슬롯 메일박스에 넣어 최신 프레임만 디코딩
+    - 제어 메시지: 순서대로 처리하는 큐 (프레임 처리에 막히지 않음)
+    """
+
+    def __init__(self, websocket: WebSocket, animation_service):
+        self.websocket = websocket
+        self.animation_service = animation_service
+        self.client_id = id(websocket)
+        self.trace = websocket.trace
+        self.frames = FrameMailbox()
+        self.control_queue = asyncio.Queue()
+        # 수신 순번 (프레임 처리 순서가 뒤바뀌어도 오래된 프레임이 최신 프레임을 덮어쓰지 않도록)
+        self._seq = 0
+        # 수신 메시지 녹화 (SPOTLIGHT_SESSION_RECORDING 설정 시, 부하 테스트 재생용)
+        self.recorder = create_session_recorder(self.client_id)
+
+    async def run(self):
+        """연결이 끊길 때까지 수신 루프 실행 (WebSocketDisconnect 등은 호출자에게 전파)"""
+        # 세션 트레이스: 이후 생성되는 처리 태스크/애니메이션 태스크로 전파
+        current_trace.set(self.trace)
+        control_task = asyncio.create_task(self._control_loop())
+        frame_task = asyncio.create_task(self._frame_loop())
+        try:
+            await self._read_loop(control_task, frame_task)
+        finally:
+            # 녹화는 먼저 닫음 (아래 대기 중 다시 취소되어도 남은 기록이 버려지지 않도록)
+            if self.recorder is not None:
+                self.recorder.close()
+            control_task.cancel()
+            frame_task.cancel()
+            await asyncio.gather(control_task, frame_task, return_exceptions=True)
+
+    async def _read_loop(self, control_task, frame_task):
+        while True:
+            # 소비자 태스크가 예기치 않게 종료되면 연결 처리를 중단
+            for task in (control_task, frame_task):
+                if task.done():
+                    task.result()
+                    raise RuntimeError("수신 처리 태스크가 종료되었습니다.")
+
+            text = await self.websocket.receive_text()
+            received_at = time.monotonic()
+            data = json.loads(text)
+            if not isinstance(data, dict):
+                continue
+            if self.recorder is not None:
+                self.recorder.record(text, received_at)
+
+            self._seq += 1
+            data['_seq'] = self._seq
+            data['_received_at'] = received_at
+
+            mode = self._mode_of(data)
+            frame_update = is_frame_update(data)
+            self.websocket.traffic.record_inbound(
+                'frame_update' if frame_update else data.get('type'), len(text), mode
+            )
+            if 'frame' in data:
+                FRAMES.inc(mode_label(mode), 'received')
+            if frame_update:
+                if self.frames.put(data):
+                    FRAMES.inc(mode_label(mode), 'dropped')
+            else:
+                self.control_queue.put_nowait(data)
+            parsed_at = time.monotonic()
+            observe_stage('receive', parsed_at - received_at, mode)
+            if self.trace.enabled:
+                if mode in MODE_LABELS:
+                    self.trace.mode = mode
+                self.trace.complete(
+                    f"recv:{'frame_update' if frame_update else data.get('type')}", 'recv',
+                    received_at * 1e6, parsed_at * 1e6, {'bytes': len(text), 'seq': self._seq}
+                )
+
+    def _mode_of(self, data):
+        """메시지가 속한 모드 (메시지에 없으면 입장한 모드)"""
+        return data.get('mode') or self.animation_service.lobby_modes.get(self.client_id)
+
+    async def _control_loop(self):
+        while True:
+            data = await self.control_queue.get()
+            # 이 태스크와 여기서 생성되는 애니메이션 태스크의 지표 레이블
+            current_mode.set(self._mode_of(data))
+            try:
+                await self.animation_service.handle_animation(self.websocket, data)
+            except Exception as e:
+                count_error('control')
+                print(f"[ConnectionDispatcher] 제어 메시지 처리 오류 (클라이언트: {self.client_id}): {str(e)}")
+
+    async def _frame_loop(self):
+        while True:
+            data = await self.frames.get()
+            current_mode.set(self._mode_of(data))
+            await self.animation_service.handle_frame_update(self.client_id, data)
@@ -0,0 +1,129 @@
+import json
+import time
+from fastapi import WebSocket
+from src.metrics import observe_stage, count_error, mode_label, MESSAGES, MESSAGE_BYTES
+from src.tracing import SessionTrace
+
+# 클라이언트 -> 서버 메시지 type 레이블 (그 외 값은 'other' 로 묶어 시계열 수 제한)
+INBOUND_TYPES = ('check_availability', 'start_animation', 'frame_update', 'animation_complete_client', 'set_tracing',
+                 'latency_report')
+
+# 워커 전체: 현재 전송 중인 메시지 수 / 한 연결의 최대 동시 전송 수
+_in_flight_total = 0
+_peak_send_depth = 0
+
+
+def _byte_length(text):
+    # ASCII 문자열(base64 프레임 등)은 인코딩 없이 길이 그대로
+    return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+
+def send_queue_report():
+    """워커 전체 전송 대기 상태 (지표 수집용)"""
+    return {'in_flight': _in_flight_total, 'peak': _peak_send_depth}
+
+
+class TrafficStats:
+    """연결별 메시지 수/바이트 집계 (type 별, 방향별)"""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        # type -> [메시지 수, 바이트]
+        self.inbound = {}
+        self.outbound = {}
+        # 이 연결에서 동시에 전송 중인 메시지 수 (송신 대기열 깊이)
+        self.send_depth = 0
+        self.peak_send_depth = 0
+        self.modes = set()
+
+    @staticmethod
+    def _add(table, message_type, nbytes):
+        entry = table.get(message_type)
+        if entry is None:
+            entry = table[message_type] = [0, 0]
+        entry[0] += 1
+        entry[1] += nbytes
+
+    def record_inbound(self, message_type, nbytes, mode=None):
+        if message_type not in INBOUND_TYPES:
+            message_type = 'other'
+        label = mode_label(mode)
+        self.modes.add(label)
+        self._add(self.inbound, message_type, nbytes)
+        MESSAGES.inc('in', label, message_type)
+        MESSAGE_BYTES.inc('in', label, message_type, amount=nbytes)
+
+    def record_outbound(self, message_type, nbytes):
+        label = mode_label()
+        self.modes.add(label)
+        self._add(self.outbound, message_type, nbytes)
+        MESSAGES.inc('out', label, message_type)
+        MESSAGE_BYTES.inc('out', label, message_type, amount=nbytes)
+
+    def summary(self, client_id, top=5):
+        """연결 종료 시 출력할 한 줄 요약"""
+        def totals(table):
+            return sum(e[0] for e in table.values()), sum(e[1] for e in table.values())
+
+        def heaviest(table, direction):
+            ranked = sorted(table.items(), key=lambda item: item[1][1], reverse=True)[:top]
+            return [f"{direction} {message_type} {nbytes / 1024:.1f}KB/{count}개" for message_type, (count, nbytes) in ranked]
+
+        in_count, in_bytes = totals(self.inbound)
+        out_count, out_bytes = totals(self.outbound)
+        modes = ','.join(sorted(self.modes - {'none'})) or '-'
+        return (
+            f"[Traffic] 클라이언트 {client_id} ({modes}, {time.monotonic() - self.started_at:.1f}초): "
+            f"수신 {in_count}개 {in_bytes / 1024:.1f}KB, 송신 {out_count}개 {out_bytes / 1024:.1f}KB, "
+            f"최대 동시 전송 {self.peak_send_depth} | "
+            + ', '.join(heaviest(self.inbound, '수신') + heaviest(self.outbound, '송신'))
+        )
+
+
+class MeteredWebSocket:
+    """웹소켓 래퍼: 송신 메시지의 type 별 수/바이트와 send_json 소요 시간('send' 단계)을 기록
+
+    연결별 세션 트레이스(trace)도 보관하며, 켜져 있으면 각 전송을 구간으로 기록한다.
+
+    나머지 속성/메서드는 원본 웹소켓에 그대로 위임한다.
+    애니메이션 모듈과 서비스는 원본 대신 이 객체를 받으며, client_id 도 이 객체 기준이다.
+    수신 메시지는 파싱하는 쪽(ConnectionDispatcher)이 traffic.record_inbound 로 기록한다.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self._websocket = websocket
+        self.traffic = TrafficStats()
+        self.trace = SessionTrace(id(self))
+
+    def __getattr__(self, name):
+        return getattr(self._websocket, name)
+
+    async def send_json(self, data, mode: str = 'text'):
+        global _in_flight_total, _peak_send_depth
+        # Starlette send_json 과 같은 직렬화 (크기 측정을 위해 여기서 한 번만 수행)
+        text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+        message_type = data.get('type', 'unknown') if isinstance(data, dict) else 'unknown'
+        nbytes = _byte_length(text)
+        self.traffic.record_outbound(message_type, nbytes)
+
+        traffic = self.traffic
+        traffic.send_depth += 1
+        traffic.peak_send_depth = max(traffic.peak_send_depth, traffic.send_depth)
+        _peak_send_depth = max(_peak_send_depth, traffic.send_depth)
+        _in_flight_total += 1
+        started = time.monotonic()
+        try:
+            if mode == 'text':
+                await self._websocket.send_text(text)
+            else:
+                await self._websocket.send_bytes(text.encode('utf-8'))
+        except Exception:
+            count_error('send')
+            raise
+        finally:
+            traffic.send_depth -= 1
+            _in_flight_total -= 1
+            finished = time.monotonic()
+            observe_stage('send', finished - started)
+            if self.trace.enabled:
+                self.trace.complete(f'send:{message_type}', 'send', started * 1e6, finished * 1e6, {'bytes': nbytes})
@@ -0,0 +1,118 @@
+import json
+import os
+import queue
+import threading
+import time
+from src.config import SESSION_RECORDING, SESSION_RECORD_DIR
+
+# 녹화 파일 형식 버전 (test/replay_load.py 가 읽음)
+RECORDING_VERSION = 1
+
+# 기록 스레드로 한 번에 넘길 줄 수 (프레임 메시지는 줄마다 수백 KB)
+RECORD_FLUSH_LINES = 16
+
+
+class _RecordingWriter:
+    """모든 녹화기가 공유하는 기록 스레드 (파일 열기/쓰기/닫기를 이벤트 루프 밖에서 수행)
+
+    대기열 항목: (path, lines, close) - path 파일에 lines 를 이어 쓰고, close 면 파일을 닫음.
+    threading.Event 항목은 그때까지 열린 파일을 모두 닫은 뒤 set (서버 종료 시 대기용).
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        # 기록 스레드만 사용: path -> 열린 파일
+        self._files = {}
+
+    def submit(self, path, lines, close=False):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='session-recorder', daemon=True)
+                    self._thread.start()
+        self._queue.put((path, lines, close))
+
+    def close(self, timeout=10.0):
+        """지금까지 넘긴 기록을 모두 쓰고 열린 파일을 닫을 때까지 대기 (서버 종료 시)
+
+        기록 스레드는 계속 실행되므로 이후 닫히는 연결의 녹화도 이어 쓴 뒤 닫힌다.
+        """
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                for path in list(self._files):
+                    self._close_file(path)
+                item.set()
+                continue
+            path, lines, close = item
+            try:
+                file = self._files.get(path)
+                if file is None:
+                    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                    file = self._files[path] = open(path, 'a', encoding='utf-8')
+                file.writelines(lines)
+            except OSError as e:
+                print(f"[SessionRecorder] 녹화 파일 기록 오류: {e}")
+            if close:
+                self._close_file(path)
+
+    def _close_file(self, path):
+        file = self._files.pop(path, None)
+        if file is None:
+            return
+        try:
+            file.close()
+            print(f"[SessionRecorder] 세션 녹화 저장: {path}")
+        except OSError as e:
+            print(f"[SessionRecorder] 녹화 파일 기록 오류: {e}")
+
+
+_writer = _RecordingWriter()
+
+
+class SessionRecorder:
+    """연결별 수신 메시지를 받은 시각과 함께 JSONL 로 기록 (부하 테스트 재생용)
+
+    첫 줄은 헤더 {"version", "started_at"}, 이후 줄은 {"t": 연결 후 경과 초, "message": 원본 메시지}.
+    원본 텍스트를 다시 직렬화하지 않고 그대로 기록한다.
+    수신 루프에서는 줄을 모아 기록 스레드로 넘기기만 하며, 파일 쓰기는 기록 스레드가 한다.
+    """
+
+    def __init__(self, client_id, directory):
+        self.path = os.path.join(directory, f"session-{time.strftime('%Y%m%d-%H%M%S')}-{client_id}.jsonl")
+        self._started = time.monotonic()
+        self._lines = [json.dumps({'version': RECORDING_VERSION, 'started_at': time.time()}) + '\n']
+        self._closed = False
+
+    def record(self, text, received_at):
+        self._lines.append(f'{{"t":{received_at - self._started:.4f},"message":{text}}}\n')
+        if len(self._lines) >= RECORD_FLUSH_LINES:
+            lines, self._lines = self._lines, []
+            _writer.submit(self.path, lines)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            lines, self._lines = self._lines, []
+            _writer.submit(self.path, lines, close=True)
+
+
+def create_session_recorder(client_id):
+    """SPOTLIGHT_SESSION_RECORDING 이 켜진 경우에만 녹화기 생성"""
+    if not SESSION_RECORDING:
+        return None
+    return SessionRecorder(client_id, SESSION_RECORD_DIR)
+
+
+def close_recordings():
+    """남은 녹화 내용을 모두 기록하고 파일을 닫음 (서버 종료 시)"""
+    _writer.close()
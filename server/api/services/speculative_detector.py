@@ -0,0 +1,78 @@
+import asyncio
+import time
+from src.face_detection import detect_faces_yolo
+from src.inference import inference_load, PRIORITY_SPECULATIVE
+from src.config import (
+    SPECULATIVE_INTERVAL,
+    SPECULATIVE_MAX_PER_TICK,
+    SPECULATIVE_MAX_INFLIGHT,
+    SPECULATIVE_REUSE_AGE,
+)
+
+
+class SpeculativeDetector:
+    """대기 화면(lobby) 클라이언트의 최신 프레임으로 미리 얼굴 감지
+
+    결과는 클라이언트별 장면 변화 게이트에 저장되므로, 시작 프레임이
+    사전 감지 프레임과 거의 같으면 start_animation 이 YOLO 없이 바로 재사용한다.
+    실시간 애니메이션과 경쟁하지 않도록 추론 작업이 없을 때만, 가장 낮은 우선순위로 실행한다.
+    """
+
+    def __init__(self, animation_service):
+        self.animation_service = animation_service
+        # client_id -> (마지막 사전 감지 시각, 사용한 프레임 순번)
+        self.last_runs = {}
+        self.runs = 0
+        self.skipped_busy = 0
+        self._task = None
+
+    def ensure_running(self):
+        """백그라운드 루프가 없으면 시작 (이벤트 루프 안에서 호출)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop(), name="speculative-detector")
+
+    def forget(self, client_id):
+        self.last_runs.pop(client_id, None)
+
+    def _candidates(self, now):
+        """사전 감지 대상: 입장 허용 후 아직 시작하지 않았고, 새 프레임이 있는 클라이언트"""
+        service = self.animation_service
+        candidates = []
+        for client_id in list(service.lobby_modes.keys()):
+            if service.supervisor.is_active(client_id) or client_id not in service.last_frames:
+                continue
+            last_run, last_seq = self.last_runs.get(client_id, (0.0, None))
+            if now - last_run < SPECULATIVE_INTERVAL:
+                continue
+            if last_seq is not None and service.last_frame_seqs.get(client_id) == last_seq:
+                continue # 마지막 사전 감지 이후 새 프레임 없음
+            candidates.append((last_run, client_id))
+        # 가장 오래 전에 사전 감지한 클라이언트부터
+        candidates.sort(key=lambda item: item[0])
+        return [client_id for _, client_id in candidates[:SPECULATIVE_MAX_PER_TICK]]
+
+    async def _loop(self):
+        service = self.animation_service
+        while service.active_clients:
+            await asyncio.sleep(SPECULATIVE_INTERVAL / 2)
+
+            # 여유 용량이 없으면 이번 주기 건너뜀
+            if inference_load() >= SPECULATIVE_MAX_INFLIGHT:
+                self.skipped_busy += 1
+                continue
+
+            now = time.monotonic()
+            for client_id in self._candidates(now):
+                frame = service.last_frames.get(client_id)
+                if frame is None:
+                    continue
+                self.last_runs[client_id] = (now, service.last_frame_seqs.get(client_id))
+                try:
+                    await detect_faces_yolo(
+                        frame, client_id, reuse_age=SPECULATIVE_REUSE_AGE, priority=PRIORITY_SPECULATIVE,
+                        scale=service.frame_scale(client_id)
+                    )
+                    self.runs += 1
+                except Exception as e:
+                    print(f"[SpeculativeDetector] 사전 감지 오류 (클라이언트: {client_id}): {e}")
+        self._task = None
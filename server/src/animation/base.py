@@ -1,16 +1,78 @@
 from abc import ABC, abstractmethod
 from fastapi import WebSocket
 import numpy as np
-import cv2
-import base64
+from src.codec import encode_frame_async
+from src.tracing import sleep
+
+
+class Timeline:
+    """연출 타임라인 빌더: 상대 시각(초)에 예약된 메시지를 한 번에 전송하고 클라이언트가 재생
+
+    키프레임/사운드/텍스트처럼 감지 결과와 무관한 연출을 프레임 단위로 보내지 않고
+    'animation_timeline' 메시지 하나로 보낸다. 클라이언트는 각 이벤트를 t 초 뒤에
+    일반 웹소켓 메시지처럼 처리한다.
+    """
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.events = []
+        # 다음 이벤트가 예약될 시각 (초)
+        self.cursor = 0.0
+
+    def add(self, message: dict, at: float = None):
+        """현재 커서(또는 지정한 at) 시각에 메시지 예약"""
+        t = self.cursor if at is None else at
+        self.events.append({'t': round(t, 3), 'message': message})
+        return self
+
+    def wait(self, seconds: float):
+        """커서를 seconds 만큼 뒤로 이동"""
+        self.cursor += seconds
+        return self
+
+    def sound(self, sound_name: str, options: dict = None):
+        message = {'type': 'play_sound', 'sound': sound_name}
+        if options:
+            message['options'] = options
+        return self.add(message)
+
+    def stop_sound(self, sound_name: str):
+        return self.add({'type': 'stop_sound', 'sound': sound_name})
+
+    def text(self, text: str, position: dict, style: dict):
+        return self.add({'type': 'show_text', 'text': text, 'position': position, 'style': style})
+
+    @property
+    def duration(self):
+        """타임라인 전체 길이 (마지막 이벤트 또는 커서 중 늦은 시각)"""
+        last_event = max((event['t'] for event in self.events), default=0.0)
+        return max(self.cursor, last_event)
+
+    def compile(self):
+        return {
+            'type': 'animation_timeline',
+            'mode': self.mode,
+            'duration': round(self.duration, 3),
+            'events': sorted(self.events, key=lambda event: event['t']),
+        }
+
+    async def send(self, websocket: WebSocket):
+        """타임라인 전송 후 길이(초) 반환"""
+        await websocket.send_json(self.compile())
+        return self.duration
+
+    async def play(self, websocket: WebSocket):
+        """타임라인 전송 후 재생이 끝날 때까지 대기 (서버 측 대기는 1회)"""
+        await sleep(await self.send(websocket), name=f'timeline:{self.mode}')
+
 
 class BaseAnimation(ABC):
-    async def send_frame(self, websocket: WebSocket, frame: np.ndarray):
-        _, buffer = cv2.imencode('.jpg', frame)
-        base64_frame = base64.b64encode(buffer).decode('utf-8')
+    async def send_frame(self, websocket: WebSocket, frame: np.ndarray, tier: str = 'full'):
+        # 인코딩은 codec 풀에서 실행 (이벤트 루프를 막지 않음)
+        payload = await encode_frame_async(frame, tier=tier)
         await websocket.send_json({
             'type': 'animation_frame',
-            'frame': base64_frame
+            **payload
         })
 
     async def send_sound(self, websocket: WebSocket, sound_name: str, options: dict = None):
@@ -28,6 +90,9 @@ class BaseAnimation(ABC):
             'style': style
         })
 
+    def timeline(self, mode: str) -> Timeline:
+        return Timeline(mode)
+
     @abstractmethod
     async def animate(self, frame: np.ndarray, faces: np.ndarray, websocket: WebSocket):
         pass
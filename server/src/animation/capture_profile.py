@@ -0,0 +1,53 @@
+from fastapi import WebSocket
+from src.config import SPECULATIVE_DETECTION_ENABLED
+
+# 애니메이션 단계 (클라이언트 프레임 전송 정책이 바뀌는 시점)
+CAPTURE_PHASES = ('lobby', 'countdown', 'detecting', 'playback')
+
+# 프레임이 필요 없는 단계: 전송 중지
+_OFF = {'fps': 0, 'max_dimension': 0, 'jpeg_quality': 0}
+
+# 대기 화면: 사전 감지(speculative detection)용 저속 프레임 (비활성화 시 전송 안 함)
+_LOBBY = {'fps': 1, 'max_dimension': 1280, 'jpeg_quality': 0.6} if SPECULATIVE_DETECTION_ENABLED else _OFF
+
+# 모드별/단계별 캡처 프로파일
+# - fps: 초당 전송 프레임 수 (0이면 전송 안 함)
+# - max_dimension: 긴 변 최대 길이 (px)
+# - jpeg_quality: 0~1 (canvas.toDataURL 품질 값)
+# 각 모드가 실제로 프레임을 소비하는 방식에 맞춤
+MODE_CAPTURE_PROFILES = {
+    # 시작 프레임만 사용 (이후 프레임 미사용)
+    'slot': {},
+    'roulette': {},
+    'race': {},
+    # 선택 라운드마다(약 4.6초 간격) 최신 프레임 1장으로 감지
+    'curtain': {
+        'detecting': {'fps': 2, 'max_dimension': 1280, 'jpeg_quality': 0.7},
+    },
+    # 타겟팅 중 0.7초 간격으로 감지, 선정 이후 프레임 미사용
+    'scanner': {
+        'detecting': {'fps': 2, 'max_dimension': 1280, 'jpeg_quality': 0.7},
+    },
+    # 카운트다운 끝의 기준 프레임 + 10초간 연속 감지 (랜드마크 정확도를 위해 품질 유지)
+    'handpick': {
+        'countdown': {'fps': 2, 'max_dimension': 1280, 'jpeg_quality': 0.8},
+        'detecting': {'fps': 10, 'max_dimension': 1280, 'jpeg_quality': 0.8},
+    },
+}
+
+
+def get_capture_profile(mode, phase):
+    """모드와 단계에 맞는 캡처 프로파일 반환 (정의되지 않은 단계는 전송 중지)"""
+    default = _LOBBY if phase == 'lobby' else _OFF
+    profile = MODE_CAPTURE_PROFILES.get(mode, {}).get(phase, default)
+    return dict(profile)
+
+
+async def send_capture_profile(websocket: WebSocket, mode, phase):
+    """단계 전환 시 클라이언트에 프레임 전송 정책 전달"""
+    await websocket.send_json({
+        'type': 'capture_profile',
+        'mode': mode,
+        'phase': phase,
+        **get_capture_profile(mode, phase)
+    })
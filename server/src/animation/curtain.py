@@ -1,6 +1,10 @@
 import random
-import asyncio
-from src.face_detection import detect_faces_yolo
+from src.face_detection import detect_faces_until
+from src.inference import prefetch
+from src.config import DETECTION_DEADLINE
+from src.frame_timing import tracking, frame_echo
+from .capture_profile import send_capture_profile
+from .base import Timeline
 
 
 async def apply_curtain_effect(frame, faces, websocket, original_frame=None, is_running=lambda: True, animation_service=None, client_id=None):
@@ -31,22 +35,26 @@ async def apply_curtain_effect(frame, faces, websocket, original_frame=None, is_
         'text': "🎭 커튼콜 타임! 🎭"
     })
     
-    # 5초 대기
+    # 인트로 동안은 프레임 불필요
+    await send_capture_profile(websocket, 'curtain', 'countdown')
+
+    # 5초 카운트다운 + 인트로 종료 (타임라인 한 번으로 전송)
+    intro = Timeline('curtain')
     for i in range(5, 0, -1):
-        if not is_running():
-            return frame, None
-            
-        await websocket.send_json({
+        intro.add({
             'type': 'curtain_countdown',
             'count': i
         })
-        
-        await asyncio.sleep(1)
-    
-    # 인트로 종료 메시지 추가
-    await websocket.send_json({
+        intro.wait(1)
+    intro.add({
         'type': 'curtain_intro_end'
     })
+    await intro.play(websocket)
+    if not is_running():
+        return frame, None
+
+    # 선택 라운드마다 최신 프레임으로 감지하므로 저속 프레임 전송 요청
+    await send_capture_profile(websocket, 'curtain', 'detecting')
     
     # 참가자 선택 루프 (3-5회)
     num_selections = max(3, min(5, len(faces)))
@@ -55,41 +63,32 @@ async def apply_curtain_effect(frame, faces, websocket, original_frame=None, is_
     for selection in range(num_selections):
         if not is_running():
             return frame, None
+
+        # 1. 커튼 닫기 애니메이션 (닫힌 후 잠시 대기까지 포함)
+        closing = _curtain_sweep('closing').wait(0.3)
+
+        # 커튼이 닫히는 동안(약 0.6초) 최신 프레임에서 얼굴 감지를 미리 시작
+        # 닫힌 뒤 DETECTION_DEADLINE 안에 끝나지 않으면 최근 감지 얼굴로 진행 (연출 속도 유지)
+        # animation_service가 전달되었고 client_id가 있으면 최신 프레임 사용
+        faces_prefetch = None
+        frame_ref = None
+        if animation_service and client_id and client_id in animation_service.last_frames:
+            # 감지 대기열/추론 시간을 입력 프레임 정보에 누적 (curtain_selection 에서 되돌려 보냄)
+            frame_ref = animation_service.frame_ref(client_id)
+            with tracking(frame_ref):
+                faces_prefetch = prefetch(detect_faces_until(
+                    animation_service.last_frames[client_id], client_id,
+                    timeout=closing.duration + DETECTION_DEADLINE,
+                    scale=animation_service.frame_scale(client_id)
+                ))
         
-        # 1. 커튼 닫기 애니메이션
-        await websocket.send_json({
-            'type': 'play_sound',
-            'sound': 'curtain/curtain_close'
-        })
-        
-        # 단계별 커튼 닫기 (12단계)
-        steps = 12
-        for i in range(steps, -1, -1):
-            if not is_running():
-                return frame, None
-                
-            curtain_pos = i / float(steps)  # 1.0(완전히 열림) -> 0.0(완전히 닫힘)
-            
-            await websocket.send_json({
-                'type': 'curtain_update',
-                'position': curtain_pos,
-                'state': 'closing'
-            })
-            
-            await asyncio.sleep(0.025)  # 부드러운 애니메이션을 위한 짧은 딜레이
-        
-        # 커튼이 완전히 닫힌 후 잠시 대기
-        await asyncio.sleep(0.3)
+        await closing.play(websocket)
         
-        # 2. 참가자 선택 - 최신 프레임에서 얼굴 감지
-        current_frame = None
+        # 2. 참가자 선택 - 커튼이 닫히는 동안 미리 시작한 감지 결과 수거
         current_faces = []
-        
-        # animation_service가 전달되었고 client_id가 있으면 최신 프레임 사용
-        if animation_service and client_id and client_id in animation_service.last_frames:
-            current_frame = animation_service.last_frames[client_id]
-            # 최신 프레임에서 얼굴 감지 (비동기 호출로 변경)
-            current_faces = await detect_faces_yolo(current_frame) # await 추가
+        is_stale = False
+        if faces_prefetch is not None:
+            current_faces, is_stale = await faces_prefetch.result()
             # print(f"최신 프레임에서 얼굴 감지 결과: {current_faces}")
         
         # 최신 얼굴이 감지되었으면 그것을 사용, 아니면 초기 얼굴 사용
@@ -119,33 +118,17 @@ async def apply_curtain_effect(frame, faces, websocket, original_frame=None, is_
             'zoom_params': {
                 'scale': zoom_scale,
                 'duration': 0.8
-            }
+            },
+            **frame_echo(frame_ref, is_stale)
         })
         
         # 3. 커튼 열기 + 스포트라이트 효과
-        await websocket.send_json({
-            'type': 'play_sound',
-            'sound': 'curtain/curtain_open'
-        })
-        
-        # 단계별 커튼 열기 (12단계)
-        for i in range(steps + 1):
-            if not is_running():
-                return frame, None
-                
-            curtain_pos = i / float(steps)  # 0.0(완전히 닫힘) -> 1.0(완전히 열림)
-            
-            await websocket.send_json({
-                'type': 'curtain_update',
-                'position': curtain_pos,
-                'state': 'opening'
-            })
-            
-            await asyncio.sleep(0.025)  # 부드러운 애니메이션을 위한 짧은 딜레이
-        
         # 4. 선택된 인물 보여주기 (3초)
-        await asyncio.sleep(3.0)
+        await _curtain_sweep('opening').wait(3.0).play(websocket)
         
+    # 선정 완료 이후로는 프레임 불필요
+    await send_capture_profile(websocket, 'curtain', 'playback')
+
     # 최종 결과 - 타다 사운드 재생
     await websocket.send_json({
         'type': 'play_sound',
@@ -170,3 +153,20 @@ async def apply_curtain_effect(frame, faces, websocket, original_frame=None, is_
     })
     
     return frame, selected_face
+
+
+
+def _curtain_sweep(state, steps=12, step_delay=0.025):
+    """커튼 닫기/열기 사운드와 단계별 위치(12단계) 타임라인"""
+    timeline = Timeline('curtain')
+    timeline.sound('curtain/curtain_close' if state == 'closing' else 'curtain/curtain_open')
+    for i in range(steps + 1):
+        # closing: 1.0(완전히 열림) -> 0.0(완전히 닫힘), opening: 0.0 -> 1.0
+        step = steps - i if state == 'closing' else i
+        timeline.add({
+            'type': 'curtain_update',
+            'position': step / float(steps),
+            'state': state
+        })
+        timeline.wait(step_delay)  # 부드러운 애니메이션을 위한 짧은 딜레이
+    return timeline
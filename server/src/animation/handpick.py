@@ -2,23 +2,21 @@ import asyncio
 import random
 import numpy as np
 import cv2
-import dlib
 from math import hypot, tanh
 # YOLO 얼굴 감지 함수 임포트
-from src.face_detection import detect_faces_yolo
-import base64 # base64 인코딩을 위해 추가
-
-# dlib 얼굴 랜드마크 감지기 초기화 (경로는 환경에 맞게 조정 필요)
-try:
-    predictor_path = "assets/models/shape_predictor_68_face_landmarks.dat"
-    detector = dlib.get_frontal_face_detector()
-    predictor = dlib.shape_predictor(predictor_path)
-    dlib_available = True
-except Exception as e:
-    print(f"⚠️ Dlib 초기화 실패: {e}. 랜드마크 기반 기능이 제한됩니다.")
-    dlib_available = False
-    detector = None
-    predictor = None
+from src.face_detection import detect_faces_until, scale_faces
+from src.config import DETECTION_DEADLINE
+from src.inference import run_inference, prefetch
+from src.landmarks import create_landmark_backend, LandmarkCache
+from src.metrics import timed
+from src.codec import encode_frame_async
+from src.tracing import sleep
+from src.frame_timing import tracking, frame_echo
+from .capture_profile import send_capture_profile
+
+# 얼굴 랜드마크 백엔드 초기화 (설정: SPOTLIGHT_LANDMARK_BACKEND = dlib | onnx)
+landmark_backend = create_landmark_backend()
+landmarks_available = landmark_backend.available
 
 # 표정 점수 계산을 위한 클래스
 class ExpressionDetector:
@@ -33,8 +31,8 @@ class ExpressionDetector:
     # 함수 이름 변경 및 로직 수정: get_expression_change -> get_expression_score
     def get_expression_score(self, face_idx, landmarks, detection_mode):
         """표정 점수 계산 (지정된 모드 기준 절대 점수)"""
-        if not dlib_available or landmarks is None:
-            return 0.0 # dlib 사용 불가 또는 랜드마크 없으면 0점 반환
+        if not landmarks_available or landmarks is None:
+            return 0.0 # 랜드마크 백엔드 사용 불가 또는 랜드마크 없으면 0점 반환
 
         current_score = 0.0
         if detection_mode == 'smile' or detection_mode == 'big_smile':
@@ -202,42 +200,21 @@ class ExpressionDetector:
 
         return min(1.0, max(0.0, total_score)) # 0~1 범위 클램핑
 
-# CPU 바운드 작업을 처리할 동기 함수 (dlib 예측)
-def _run_dlib_prediction(frame_copy, face_x, face_y, face_w, face_h):
-    """실제 dlib 랜드마크 예측을 수행하는 동기 함수"""
-    if not dlib_available: return None
-    try:
-        # dlib은 그레이스케일 이미지를 사용
-        gray = cv2.cvtColor(frame_copy, cv2.COLOR_BGR2GRAY)
-        rect = dlib.rectangle(int(face_x), int(face_y), int(face_x + face_w), int(face_y + face_h))
-
-        shape = predictor(gray, rect)
-        coords = np.zeros((68, 2), dtype=int)
-
-        for i in range(0, 68):
-            coords[i] = (shape.part(i).x, shape.part(i).y)
-
-        return coords
-    except Exception as e:
-        # 실제 운영 시 로깅 등으로 대체하는 것이 좋음
-        print(f"랜드마크 감지 오류 (동기 함수 내): {e}")
-        return None
-
-# 기존 get_face_landmarks 함수를 async 함수로 변경
-async def get_face_landmarks(frame, face_x, face_y, face_w, face_h):
-    """dlib를 사용해 얼굴 랜드마크 추출 (비동기 실행)"""
-    # 프레임 복사본 전달 (dlib 처리를 위해 필요할 수 있음)
-    landmarks = await asyncio.to_thread(
-        _run_dlib_prediction, frame.copy(), face_x, face_y, face_w, face_h
+async def get_faces_landmarks(frame, boxes, client_id=None):
+    """얼굴 박스 (x, y, w, h) 목록의 랜드마크를 한 번에 추출 (비동기 실행, 박스 순서대로)"""
+    # 프레임 복사본 전달 (추론 스레드에서 사용)
+    return await run_inference(
+        landmark_backend.predict_batch, frame.copy(), list(boxes),
+        workload='landmarks', client_id=client_id
     )
-    return landmarks
+
 
 async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=None, is_running=lambda: True, animation_service=None, client_id=None):
     """표정 변화를 감지하여 발표자 선정 - 독립 프레임 방식"""
-    if not dlib_available:
+    if not landmarks_available:
          await websocket.send_json({
             'type': 'error',
-            'message': '❌ 얼굴 랜드마크 감지기(dlib)를 사용할 수 없습니다.'
+            'message': '❌ 얼굴 랜드마크 감지기를 사용할 수 없습니다.'
         })
          return frame, None
 
@@ -252,14 +229,32 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
 
     detection_mode = random.choice(["open_mouth", "big_smile", "surprise", "ugly_face"])
     expression_detector = ExpressionDetector()
+    landmark_cache = LandmarkCache(get_faces_landmarks, client_id)
 
-    await asyncio.sleep(1)
+    await sleep(1)
     await websocket.send_json({'type': 'handpick_start'})
     await websocket.send_json({'type': 'play_sound', 'sound': 'handpick/start'})
 
+    # 카운트다운 종료 시점의 기준 프레임이 필요하므로 저속 전송 요청
+    await send_capture_profile(websocket, 'handpick', 'countdown')
+
     # --- 카운트다운 ---
+    baseline_prefetch = None
     for countdown in range(5, 0, -1):
         if not is_running(): return frame, None
+        if countdown == 1:
+            # --- 보정 단계 (단순히 초기 프레임 가져오기) ---
+            # 마지막 1초 동안 기준 프레임의 얼굴 감지를 미리 시작
+            # (얼굴 좌표는 원본 카메라 좌표계, 랜드마크는 프레임 배율로 되돌려 축소 프레임에서 계산)
+            baseline_scale = 1.0
+            if animation_service and client_id and client_id in animation_service.last_frames:
+                baseline_frame = animation_service.last_frames[client_id].copy()
+                baseline_scale = animation_service.frame_scale(client_id)
+            else:
+                baseline_frame = frame.copy() # Fallback
+            baseline_prefetch = prefetch(detect_faces_until(
+                baseline_frame, client_id, timeout=1.0 + DETECTION_DEADLINE, scale=baseline_scale
+            ))
         # await websocket.send_json({'type': 'play_sound', 'sound': 'handpick/countdown'})
         faces_for_countdown = [] # 카운트다운 중엔 얼굴 정보 불필요
         await websocket.send_json({
@@ -270,7 +265,7 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
             'countdown': countdown,
             'expression_mode': detection_mode
         })
-        await asyncio.sleep(1)
+        await sleep(1)
 
     # --- 추가: 표정 감지 시작 시 배경음악 재생 ---
     await websocket.send_json({
@@ -280,21 +275,15 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
     })
     # --- 추가 끝 ---
 
-    # --- 보정 단계 (단순히 초기 프레임 가져오기) ---
-    baseline_frame = None
-    if animation_service and client_id and client_id in animation_service.last_frames:
-        baseline_frame = animation_service.last_frames[client_id].copy()
-    else:
-        baseline_frame = frame.copy() # Fallback
-
-    # 초기 얼굴 감지 (후속 감지 루프의 시작점)
-    last_detected_faces = await detect_faces_yolo(baseline_frame)
+    # 초기 얼굴 감지 결과 수거 (후속 감지 루프의 시작점)
+    last_detected_faces, is_stale = await baseline_prefetch.result()
     if len(last_detected_faces) == 0:
         print("⚠️ 초기 프레임에서 얼굴 감지 실패. 핸드픽 로직 중단 가능성.")
         last_detected_faces = initial_faces # 일단 initial_faces로 시도
 
     # --- 추가: 마지막 YOLO 성공 시 프레임 저장 변수 ---
     frame_for_last_yolo = baseline_frame.copy() # 초기값은 baseline
+    frame_for_last_yolo_scale = baseline_scale
     # --- 추가 끝 ---
 
     await websocket.send_json({
@@ -303,6 +292,9 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
         'measurement_time': 10
     })
 
+    # 10초간 연속 감지 - 고속 프레임 전송 요청
+    await send_capture_profile(websocket, 'handpick', 'detecting')
+
     # --- 표정 변화 감지 루프 (10초) ---
     detection_time = 10
     start_time = asyncio.get_event_loop().time()
@@ -324,28 +316,39 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
 
         # 최신 프레임 가져오기
         current_frame = None
+        frame_ref = None
         if animation_service and client_id and client_id in animation_service.last_frames:
             current_frame = animation_service.last_frames[client_id].copy()
+            frame_ref = animation_service.frame_ref(client_id)
+            current_scale = animation_service.frame_scale(client_id)
         else:
              current_frame = baseline_frame # Fallback
+             current_scale = baseline_scale
 
-        # 실시간 얼굴 감지
-        current_faces_in_loop = await detect_faces_yolo(current_frame)
+        # 실시간 얼굴 감지 (늦어지면 최근 감지 얼굴로 진행 - 진행 주기 유지)
+        with tracking(frame_ref):
+            current_faces_in_loop, is_stale = await detect_faces_until(
+                current_frame, client_id, DETECTION_DEADLINE, scale=current_scale
+            )
 
         if len(current_faces_in_loop) == 0: # 현재 프레임에 얼굴 없으면 스킵
             await websocket.send_json({
                 'type': 'handpick_progress',
                 'faces': [], # 얼굴 없음 표시
                 'stage': 'waiting',
-                'progress': min(1.0, elapsed / detection_time)
+                'progress': min(1.0, elapsed / detection_time),
+                **frame_echo(frame_ref, is_stale)
             })
-            await asyncio.sleep(0.1)
+            await sleep(0.1)
             continue # 다음 루프 반복으로
 
         # --- 수정: YOLO 성공 시 프레임 저장 ---
         # 유효한 얼굴 정보 업데이트 및 해당 프레임 저장
-        last_detected_faces = current_faces_in_loop
-        frame_for_last_yolo = current_frame.copy() # 현재 성공한 프레임을 저장
+        # (최근 얼굴로 대체된 경우 현재 프레임과 쌍이 맞지 않으므로 최종 랭킹용으로 저장하지 않음)
+        if not is_stale:
+            last_detected_faces = current_faces_in_loop
+            frame_for_last_yolo = current_frame.copy() # 현재 성공한 프레임을 저장
+            frame_for_last_yolo_scale = current_scale
         # --- 수정 끝 ---
 
         # 얼굴별 표정 점수 계산 (현재 프레임 기준)
@@ -354,38 +357,45 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
         current_loop_candidate_idx = -1
         has_candidates = False
 
-        for idx, (x, y, w, h) in enumerate(current_faces_in_loop):
-            landmarks = await get_face_landmarks(current_frame, int(x), int(y), int(w), int(h))
-            score = 0.0
-            if landmarks is not None:
-                score = expression_detector.get_expression_score(idx, landmarks, detection_mode)
-                if score > current_loop_max_score:
-                    current_loop_max_score = score
-                    current_loop_candidate_idx = idx
-                    has_candidates = True
-
-            face_data.append({
-                "face": current_faces_in_loop[idx].tolist(),
-                "expression_score": int(score * 100),
-                "is_candidate": idx == current_loop_candidate_idx
-            })
+        with tracking(frame_ref):
+            loop_landmarks = await landmark_cache.get_many(
+                current_frame, scale_faces(current_faces_in_loop, 1 / current_scale)
+            )
+        with timed('expression'):
+            for idx, landmarks in enumerate(loop_landmarks):
+                score = 0.0
+                if landmarks is not None:
+                    score = expression_detector.get_expression_score(idx, landmarks, detection_mode)
+                    if score > current_loop_max_score:
+                        current_loop_max_score = score
+                        current_loop_candidate_idx = idx
+                        has_candidates = True
+
+                face_data.append({
+                    "face": current_faces_in_loop[idx].tolist(),
+                    "expression_score": int(score * 100),
+                    "is_candidate": idx == current_loop_candidate_idx
+                })
 
         # 진행 상황 전송
         await websocket.send_json({
             'type': 'handpick_progress',
             'faces': face_data,
             'stage': 'detecting' if has_candidates else 'waiting',
-            'progress': min(1.0, elapsed / detection_time)
+            'progress': min(1.0, elapsed / detection_time),
+            **frame_echo(frame_ref, is_stale)
         })
 
-        await asyncio.sleep(0.1)
+        await sleep(0.1)
 
     # --- 루프 종료 후 ---
     # --- 추가: 클라이언트에 감지 종료 알림 ---
     await websocket.send_json({'type': 'handpick_detection_end'})
+    await send_capture_profile(websocket, 'handpick', 'playback')
     # --- 추가 끝 ---
 
     print("Handpick 루프 종료, 최종 점수 계산 시작")
+    print(f"랜드마크 캐시: 재사용 {landmark_cache.hits}회, 예측 {landmark_cache.misses}회")
     # --- 수정: 최종 프레임을 last_detected_faces와 쌍을 이루는 프레임으로 변경 ---
     final_frame = frame_for_last_yolo
     # --- 수정 끝 ---
@@ -404,13 +414,17 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
          return frame, None
     else:
         # 마지막 프레임 기준으로 점수 계산 (이제 final_frame과 final_faces_for_ranking이 일치함)
-        for idx, (x, y, w, h) in enumerate(final_faces_for_ranking):
-            final_landmarks = await get_face_landmarks(final_frame, int(x), int(y), int(w), int(h))
-            final_score = 0.0
-            if final_landmarks is not None:
-                final_score = expression_detector.get_expression_score(idx, final_landmarks, detection_mode)
-
-            final_scores_calculated[idx] = final_score
+        # 루프 마지막 감지와 같은 프레임/박스이므로 캐시된 랜드마크 재사용
+        all_final_landmarks = await landmark_cache.get_many(
+            final_frame, scale_faces(final_faces_for_ranking, 1 / frame_for_last_yolo_scale)
+        )
+        with timed('expression'):
+            for idx, final_landmarks in enumerate(all_final_landmarks):
+                final_score = 0.0
+                if final_landmarks is not None:
+                    final_score = expression_detector.get_expression_score(idx, final_landmarks, detection_mode)
+
+                final_scores_calculated[idx] = final_score
 
     # 최종 점수 기반 순위 선정
     all_scores = [{"idx": idx, "score": score} for idx, score in final_scores_calculated.items()]
@@ -480,11 +494,11 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
             }
             ranking_data.append(rank_info)
 
-    # 최종 프레임 Base64 인코딩
-    result_frame_base64 = None
+    # 최종 프레임 인코딩 (codec 풀, 받은 크기 그대로 - 클라이언트가 얼굴 좌표를 이미지 크기에 맞춰 자름)
+    result_frame = {'frame': None, 'frame_mime': None}
     try:
-        _, buffer = cv2.imencode('.jpg', final_frame) # 이제 final_frame은 마지막 YOLO 프레임
-        result_frame_base64 = base64.b64encode(buffer).decode('utf-8')
+        # 이제 final_frame은 마지막 YOLO 프레임
+        result_frame = await encode_frame_async(final_frame, client_id, tier='full')
     except Exception as e:
         print(f"Error encoding final frame: {e}")
 
@@ -501,7 +515,8 @@ async def apply_handpick_effect(frame, initial_faces, websocket, original_frame=
         'expression_name': expression_name,
         'message': message,
         'ranking': ranking_data,
-        'result_frame': result_frame_base64
+        'result_frame': result_frame['frame'],
+        'result_frame_mime': result_frame['frame_mime']
     })
 
     await websocket.send_json({'type': 'selection_complete', 'mode': 'handpick'})
@@ -1,5 +1,10 @@
 import random
-import asyncio
+from src.tracing import sleep
+from src.frame_timing import current_frame_echo
+from .capture_profile import send_capture_profile
+
+# 레이스 최대 참가자 수 (얼굴이 더 많으면 무작위로 선택)
+MAX_RACERS = 12
 
 async def apply_race_effect(frame, faces, websocket, original_frame=None, is_running=lambda: True, animation_service=None, client_id=None):
     """레이스 애니메이션 실행 (WebSocket 통신 방식)"""
@@ -15,6 +20,9 @@ async def apply_race_effect(frame, faces, websocket, original_frame=None, is_run
         'mode': 'race'
     })
     
+    # 시작 프레임 이후로는 프레임 불필요 - 전송 중지 요청
+    await send_capture_profile(websocket, 'race', 'playback')
+
     await websocket.send_json({
         'type': 'play_sound',
         'sound': 'race/race_loop',
@@ -25,7 +33,7 @@ async def apply_race_effect(frame, faces, websocket, original_frame=None, is_run
     
     # 기본 설정 및 참가자 정보 초기화
     max_lanes = 6  # 최대 레인 수는 6개로 유지
-    num_participants = min(len(faces), 12)  # 최대 12명으로 확장
+    num_participants = min(len(faces), MAX_RACERS)
     visible_width = 1000  # 화면에 보이는 영역의 너비
     track_length = visible_width * 3  # 화면 너비의 3배로 설정
     
@@ -82,7 +90,9 @@ async def apply_race_effect(frame, faces, websocket, original_frame=None, is_run
             'racers_per_lane': racers_per_lane,  # 레인별 참가자 수 추가
             'visible_width': visible_width,
             'camera_position': current_camera_position # 초기 카메라 위치
-        }
+        },
+        # 시작 프레임의 캡처 시각/순번과 서버 측 처리 시간
+        **current_frame_echo()
     })
     
     # 장애물 생성 - 개수 조정 및 블랙홀 비율 제어
@@ -209,7 +219,7 @@ async def apply_race_effect(frame, faces, websocket, original_frame=None, is_run
             'count': count
         })
         
-        await asyncio.sleep(1)
+        await sleep(1)
     
     # 레이스 메인 루프
     race_finished = False
@@ -468,7 +478,7 @@ async def apply_race_effect(frame, faces, websocket, original_frame=None, is_run
             'camera_position': current_camera_position # 보간된 카메라 위치 전송
         })
         
-        await asyncio.sleep(0.033)  # 업데이트 간격 (30fps)
+        await sleep(0.033)  # 업데이트 간격 (30fps)
     
     # 레이스 종료 후 처리
     if not is_running(): # 중단된 경우
@@ -490,7 +500,7 @@ async def apply_race_effect(frame, faces, websocket, original_frame=None, is_run
             'position': {'x': 0.5, 'y': 0.5},
             'style': {'fontSize': 60, 'color': 'red'}
         })
-        await asyncio.sleep(3) # 메시지 보여줄 시간
+        await sleep(3) # 메시지 보여줄 시간
 
     await websocket.send_json({
         'type': 'selection_complete',
@@ -1,4 +1,5 @@
 import random
+from .capture_profile import send_capture_profile
 
 async def apply_roulette_effect(frame, faces, websocket, original_frame=None, is_running=lambda: True, animation_service=None, client_id=None):
     """ 룰렛 애니메이션 실행하며 발표자 선정 (WebSocket 통신 방식) """
@@ -11,6 +12,9 @@ async def apply_roulette_effect(frame, faces, websocket, original_frame=None, is
         'mode': 'roulette'
     })
     
+    # 시작 프레임 이후로는 프레임 불필요 - 전송 중지 요청
+    await send_capture_profile(websocket, 'roulette', 'playback')
+
     # 회전 관련 랜덤 값 설정 - 선형 감속 방식으로 변경
     initial_speed = random.uniform(11, 13)  # 초기 속도
     deceleration_constant = random.uniform(0.10, 0.13)  # 선형 감속 상수
@@ -1,7 +1,10 @@
-import asyncio
 import random
-from ..face_detection import detect_faces_yolo
-import time # time 모듈 임포트 (asyncio.get_event_loop().time() 대체 가능)
+from ..face_detection import detect_faces_until
+from ..inference import prefetch
+from ..config import DETECTION_DEADLINE
+from ..frame_timing import tracking, frame_echo
+from .capture_profile import send_capture_profile
+from .base import Timeline
 
 async def apply_scanner_zoom_effect(frame, initial_faces, websocket, original_frame=None, is_running=lambda: True, animation_service=None, client_id=None):
     """사우론의 눈 효과 적용 - 웹소켓 통신 방식"""
@@ -35,124 +38,110 @@ async def apply_scanner_zoom_effect(frame, initial_faces, websocket, original_fr
         'duration': 1.0
     })
     
-    # 3단계: 가짜 타겟팅 - 스캔 사운드 재생
-    await websocket.send_json({
-        'type': 'play_sound',
-        'sound': 'scanner_zoom/scan_sweep',
-        'options': {
-            'loop': True
-        }
-    })
-    
+    # 타겟팅 단계에서 0.7초 간격으로 감지하므로 프레임 전송 요청
+    await send_capture_profile(websocket, 'scanner', 'detecting')
+
     # 가짜 타겟팅 포인트 생성
     fake_target_points = []
     for _ in range(10):
         fake_x = random.randint(width // 10, width - width // 10)
         fake_y = random.randint(height // 10, height - height // 10)
         fake_target_points.append((fake_x, fake_y))
-    
-    # --- 가짜 타겟팅 최적화: 루프 전 YOLO 호출 제거 ---
-    # 아래 블록 제거
-    # faces_for_targeting = initial_faces
-    # if animation_service and client_id and client_id in animation_service.last_frames:
-    #     latest_frame_before_fake = animation_service.last_frames[client_id]
-    #     detected_faces_before_fake = await detect_faces_yolo(latest_frame_before_fake)
-    #     if len(detected_faces_before_fake) > 0:
-    #         faces_for_targeting = detected_faces_before_fake
-    # --- 제거 끝 ---
 
-    # 가짜 타겟팅 효과 (YOLO 호출 없음)
+    # 3단계: 가짜 타겟팅 효과 (YOLO 호출 없음) - 스캔 사운드부터 전환까지 타임라인 한 번으로 전송
+    fake_targeting = Timeline('scanner')
+    fake_targeting.sound('scanner_zoom/scan_sweep', {'loop': True})
     for i, (fake_x, fake_y) in enumerate(fake_target_points):
-        if not is_running(): return frame, None
-        await websocket.send_json({
+        fake_targeting.add({
             'type': 'scanner_target',
             'target_point': [fake_x, fake_y],
             'progress': (i+1)*100//len(fake_target_points),
             'stage': 'fake_targeting'
         })
-        await asyncio.sleep(0.2)
+        fake_targeting.wait(0.2)
 
     # 가짜 타겟팅 이후에 sweep 사운드 중지
-    await websocket.send_json({
-        'type': 'stop_sound',
-        'sound': 'scanner_zoom/scan_sweep'
-    })
+    fake_targeting.stop_sound('scanner_zoom/scan_sweep')
     
     # 4단계: 타겟 발견 전환
-    await websocket.send_json({
+    fake_targeting.add({
         'type': 'scanner_transition',
         'text': "운명의 제물이 발견되었습니다!"
     })
+    fake_targeting.wait(0.5)
+
+    # 가짜 타겟팅(약 2.5초) 동안 첫 얼굴 타겟팅에 쓸 감지를 미리 시작
+    targeting_prefetch = None
+    prefetch_frame_ref = None
+    if animation_service and client_id and client_id in animation_service.last_frames:
+        prefetch_frame_ref = animation_service.frame_ref(client_id)
+        with tracking(prefetch_frame_ref):
+            targeting_prefetch = prefetch(detect_faces_until(
+                animation_service.last_frames[client_id], client_id,
+                timeout=fake_targeting.duration + DETECTION_DEADLINE,
+                scale=animation_service.frame_scale(client_id)
+            ))
+
+    await fake_targeting.play(websocket)
     
-    await asyncio.sleep(0.5)
-    
-    # 5단계: 얼굴 타겟팅 (12회로 변경)
-    # --- valid_faces 초기화 수정 ---
+    # 5단계: 얼굴 타겟팅 (12회)
     # 초기 얼굴 정보로 시작 (initial_faces 사용)
     valid_faces = initial_faces.copy()
-    # --- 수정 끝 ---
-    last_yolo_call_time = 0
-    yolo_call_interval = 0.7 # 또는 다른 원하는 간격으로 설정
-
     selected_idx_at_end = -1
 
-    for i in range(12):
+    # 감지 결과가 갱신될 때마다 다음 감지 전까지의 타겟팅 구간을 타임라인으로 전송
+    for segment in _face_targeting_segments():
         if not is_running(): return frame, None
 
-        # processing 사운드를 타겟팅 과정 중 10번 정도 실행
-        if i % 1 == 0 and i < 12:  # 0부터 11까지 12번 실행
-            await websocket.send_json({
-                'type': 'play_sound',
-                'sound': 'scanner_zoom/processing'
-            })
-        
-        current_loop_time = asyncio.get_event_loop().time()
-
-        if current_loop_time - last_yolo_call_time >= yolo_call_interval:
-            # 실시간 프레임 가져오기 및 YOLO 호출
+        # 실시간 프레임 가져오기 및 YOLO 호출
+        if targeting_prefetch is not None:
+            # 첫 감지는 가짜 타겟팅 동안 미리 시작한 결과 사용
+            current_faces, is_stale = await targeting_prefetch.result()
+            targeting_prefetch = None
+            frame_ref = prefetch_frame_ref
+        else:
             current_frame = None
+            frame_ref = None
+            frame_scale = 1.0
             if animation_service and client_id and client_id in animation_service.last_frames:
                 current_frame = animation_service.last_frames[client_id]
+                frame_ref = animation_service.frame_ref(client_id)
+                frame_scale = animation_service.frame_scale(client_id)
             else:
                 print("⚠️ 최신 프레임 가져오기 실패 (얼굴 타겟팅)")
                 current_frame = frame # fallback
+            # 감지가 늦어지면 최근 감지 얼굴로 진행 (타겟팅 속도 유지)
+            with tracking(frame_ref):
+                current_faces, is_stale = await detect_faces_until(
+                    current_frame, client_id, DETECTION_DEADLINE, scale=frame_scale
+                )
 
-            if current_frame is not None:
-                current_faces = await detect_faces_yolo(current_frame)
-                if len(current_faces) > 0:
-                    # --- valid_faces 업데이트: 여기서 최신 정보로 덮어씀 ---
-                    valid_faces = current_faces
-                    # --- 업데이트 끝 ---
-                # else: 얼굴 없으면 이전 valid_faces 유지 (초기값 또는 이전 호출 결과)
-                last_yolo_call_time = current_loop_time
-
-        if len(valid_faces) == 0:
-            await asyncio.sleep(0.1)
-            continue
+        if len(current_faces) > 0:
+            # --- valid_faces 업데이트: 여기서 최신 정보로 덮어씀 ---
+            valid_faces = current_faces
+        # else: 얼굴 없으면 이전 valid_faces 유지 (초기값 또는 이전 호출 결과)
 
-        # --- 현재 타겟 얼굴 결정 (단순히 i % len(valid_faces)) ---
-        current_idx = i % len(valid_faces)
-        selected_face = valid_faces[current_idx].tolist()
-        # --- 결정 끝 ---
-
-        await websocket.send_json({
-            'type': 'scanner_face_target',
-            'face': selected_face,
-            'is_final': False, # 이 플래그는 더 이상 의미 없음 (항상 False 또는 제거)
-            'stage': 'face_targeting'
-        })
+        targeting = Timeline('scanner')
+        for i, delay in segment:
+            # processing 사운드를 타겟팅마다 재생
+            targeting.sound('scanner_zoom/processing')
 
-        # --- 마지막 반복(i=11)에서 최종 인덱스 저장 ---
-        if i == 11:
+            # --- 현재 타겟 얼굴 결정 (단순히 i % len(valid_faces)) ---
+            current_idx = i % len(valid_faces)
+            target = {
+                'type': 'scanner_face_target',
+                'face': valid_faces[current_idx].tolist(),
+                'is_final': False, # 이 플래그는 더 이상 의미 없음 (항상 False 또는 제거)
+                'stage': 'face_targeting'
+            }
+            if targeting.cursor == 0:
+                # 구간 첫 타겟(즉시 재생)에만 입력 프레임 정보 첨부 (이후 타겟은 예약 지연이 섞임)
+                target.update(frame_echo(frame_ref, is_stale))
+            targeting.add(target)
+            # 마지막 반복에서 최종 인덱스 저장
             selected_idx_at_end = current_idx
-        # --- 저장 끝 ---
-
-        # 단계별 지연 시간 설정 (루프 횟수 변경에 따라 조정 가능)
-        if i < 4: delay = 0.2
-        elif i < 7: delay = 0.3
-        elif i < 10: delay = 0.5
-        else: delay = 0.7 # 마지막 두 번은 더 느리게
-        await asyncio.sleep(delay)
+            targeting.wait(delay)
+        await targeting.play(websocket)
 
     # 6단계: 첫 번째 줌
     # 최종 인덱스가 유효한지 확인 및 사용
@@ -164,7 +153,49 @@ async def apply_scanner_zoom_effect(frame, initial_faces, websocket, original_fr
             return frame, None
 
     selected_face = valid_faces[selected_idx_at_end].tolist()
+
+    # 선정 이후(줌/패닝)로는 프레임 불필요
+    await send_capture_profile(websocket, 'scanner', 'playback')
+
+    # 선정 이후의 연출은 선정된 얼굴에만 의존하므로 결과까지 타임라인 한 번으로 전송
+    if not is_running():
+        return frame, None
+    await _selection_timeline(selected_face, width, height).play(websocket)
+
+    # 최신 프레임 반환
+    if animation_service and client_id and client_id in animation_service.last_frames:
+        frame = animation_service.last_frames[client_id]
     
+    return frame, selected_face
+
+
+# 얼굴 타겟팅 12회의 단계별 지연 시간 (점점 느려짐, 마지막 두 번은 더 느리게)
+FACE_TARGETING_DELAYS = [0.2] * 4 + [0.3] * 3 + [0.5] * 3 + [0.7] * 2
+# 얼굴 타겟팅 중 YOLO 호출 최소 간격 (초)
+YOLO_CALL_INTERVAL = 0.7
+
+
+def _face_targeting_segments(delays=FACE_TARGETING_DELAYS, interval=YOLO_CALL_INTERVAL):
+    """YOLO 재호출 시점마다 나눈 (반복 번호, 지연) 구간 목록
+
+    각 구간 시작 시 감지를 한 번 수행하고, 구간 안의 타겟팅은 그 결과로 재생한다.
+    """
+    segments = []
+    elapsed = 0.0
+    last_call = None
+    for i, delay in enumerate(delays):
+        if last_call is None or elapsed - last_call >= interval - 1e-9:
+            segments.append([])
+            last_call = elapsed
+        segments[-1].append((i, delay))
+        elapsed += delay
+    return segments
+
+
+def _selection_timeline(selected_face, width, height):
+    """선정된 얼굴에 대한 줌 -> 카메라 패닝 -> 최종 줌 -> 결과 타임라인"""
+    timeline = Timeline('scanner')
+
     # 얼굴 크기에 따른 줌 비율 계산 (화면 너비 대비 비율 방식)
     x, y, w, h = selected_face
     face_ratio = w / width  # 화면 너비 대비 얼굴 비율
@@ -174,40 +205,22 @@ async def apply_scanner_zoom_effect(frame, initial_faces, websocket, original_fr
     zoom_scale = middle_target_ratio / max(face_ratio, 0.01)  # 너무 작은 비율 방지
     zoom_scale = max(1.0, min(3.0, zoom_scale))  # 줌 한도 설정
     
-    # 줌 효과 전송
+    # 줌 효과
     for step in range(1, 5):
-        if not is_running():
-            return frame, None
-            
-        # 실시간 프레임 업데이트
-        if animation_service and client_id and client_id in animation_service.last_frames:
-            frame = animation_service.last_frames[client_id]
-            
         current_zoom = 1.0 + (zoom_scale - 1.0) * (step / 4)
         
-        await websocket.send_json({
+        timeline.add({
             'type': 'scanner_zoom',
             'face': selected_face,
             'zoom_scale': current_zoom,
             'stage': 'first_zoom',
             'progress': step * 25
         })
-        
-        await asyncio.sleep(0.2)
-    
-    # 6.5단계: 줌 영역 내 추가 분석 단계 추가
-    # await websocket.send_json({
-    #     'type': 'scanner_transition',
-    #     'text': "의지력 측정 완료: 최종 심판을 시작합니다"
-    # })
+        timeline.wait(0.2)
     
-    await websocket.send_json({
-        'type': 'play_sound',
-        'sound': 'scanner_zoom/processing'
-    })
+    timeline.sound('scanner_zoom/processing')
     
     # 카메라 패닝 효과 - 더 예측 불가능한 패턴으로 움직임
-    x, y, w, h = selected_face
     # 무작위성을 높인 패닝 경로
     pan_offsets = [
         (-0.15, -0.15),     # 좌상
@@ -238,21 +251,11 @@ async def apply_scanner_zoom_effect(frame, initial_faces, websocket, original_fr
     
     # 카메라 패닝 효과
     for i, (offset_x, offset_y) in enumerate(pan_offsets):
-        if not is_running():
-            return frame, None
-            
-        # 실시간 프레임 업데이트
-        if animation_service and client_id and client_id in animation_service.last_frames:
-            frame = animation_service.last_frames[client_id]
-        
         # 패닝 중간에 target_locked 사운드 추가 (약 3번 정도)
         if i % 4 == 0 and i > 0:  # 4, 8, 12번째 패닝 시점에 재생
-            await websocket.send_json({
-                'type': 'play_sound',
-                'sound': 'scanner_zoom/target_locked'
-            })
+            timeline.sound('scanner_zoom/target_locked')
         
-        await websocket.send_json({
+        timeline.add({
             'type': 'scanner_camera_pan',
             'face': selected_face,
             'offset_x': offset_x,
@@ -268,20 +271,10 @@ async def apply_scanner_zoom_effect(frame, initial_faces, websocket, original_fr
         if i == len(pan_offsets) - 1:
             delay = 0.75  # 마지막 위치로 이동할 때는 더 긴 지연 시간
         
-        await asyncio.sleep(delay)
+        timeline.wait(delay)
     
-    # 추가 분석 메시지
-    # await websocket.send_json({
-    #     'type': 'scanner_transition',
-    #     'text': "의지력 측정 완료: 최종 심판을 시작합니다"
-    # })
-    
-    await websocket.send_json({
-        'type': 'play_sound',
-        'sound': 'scanner_zoom/beep'
-    })
-    
-    await asyncio.sleep(0.5)
+    timeline.sound('scanner_zoom/beep')
+    timeline.wait(0.5)
     
     # 7단계: 최종 줌
     # 커튼과 동일한 줌 비율 계산 (화면 너비의 27% 차지)
@@ -290,16 +283,9 @@ async def apply_scanner_zoom_effect(frame, initial_faces, websocket, original_fr
     final_zoom_scale = max(1.0, min(5.0, final_zoom_scale))  # 줌 한도 설정
     
     for step in range(1, 6):
-        if not is_running():
-            return frame, None
-            
-        # 실시간 프레임 업데이트
-        if animation_service and client_id and client_id in animation_service.last_frames:
-            frame = animation_service.last_frames[client_id]
-            
         current_zoom = zoom_scale + (final_zoom_scale - zoom_scale) * (step / 5)
         
-        await websocket.send_json({
+        timeline.add({
             'type': 'scanner_zoom',
             'face': selected_face,
             'zoom_scale': current_zoom,
@@ -307,36 +293,25 @@ async def apply_scanner_zoom_effect(frame, initial_faces, websocket, original_fr
             'progress': step * 20,
             'show_border': step == 5
         })
-        
-        await asyncio.sleep(0.2)
+        timeline.wait(0.2)
     
     # 스캔 사운드 중지
-    await websocket.send_json({
-        'type': 'stop_sound',
-        'sound': 'scanner_zoom/scan_sweep'
-    })
+    timeline.stop_sound('scanner_zoom/scan_sweep')
     
     # 8단계: 최종 결과
-    await websocket.send_json({
-        'type': 'play_sound',
-        'sound': 'scanner_zoom/gollum'
-    })
+    timeline.sound('scanner_zoom/gollum')
+    timeline.sound('scanner_zoom/whistle')
     
-    await websocket.send_json({
-        'type': 'play_sound',
-        'sound': 'scanner_zoom/whistle'
-    })
-    
-    await websocket.send_json({
+    timeline.add({
         'type': 'scanner_result',
         'face': selected_face,
         'message': "한 명의 반지의 제왕만이 존재할 뿐..."
     })
     
-    # 선택 완료 메시지 전송
-    await websocket.send_json({
+    # 선택 완료
+    timeline.add({
         'type': 'selection_complete',
         'mode': 'scanner'
     })
     
-    return frame, selected_face
+    return timeline
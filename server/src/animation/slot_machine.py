@@ -1,5 +1,6 @@
 import random
-import asyncio  # time 대신 asyncio 사용
+from .capture_profile import send_capture_profile
+from .base import Timeline
 
 async def apply_slot_machine_effect(frame, faces, websocket, original_frame=None, is_running=lambda: True, animation_service=None, client_id=None):
     """ 슬롯머신 효과 적용 - 좌표 기반으로 변경 """
@@ -16,15 +17,9 @@ async def apply_slot_machine_effect(frame, faces, websocket, original_frame=None
         'frame': original_frame  # 원본 프레임 데이터만 전송
     })
     
-    # 슬롯머신 회전 사운드 재생 요청
-    await websocket.send_json({
-        'type': 'play_sound',
-        'sound': 'slot_machine/slot_spin',
-        'options': {
-            'loop': True
-        }
-    })
-    
+    # 시작 프레임 이후로는 프레임 불필요 - 전송 중지 요청
+    await send_capture_profile(websocket, 'slot', 'playback')
+
     # NumPy int32를 Python int로 변환
     face_coords = []
     for face in faces:
@@ -37,36 +32,36 @@ async def apply_slot_machine_effect(frame, faces, websocket, original_frame=None
         'mode': 'slot_machine'
     })
     
+    # 시작 시점의 얼굴만 사용하므로 연출 전체를 타임라인 하나로 전송
+    timeline = Timeline('slot')
+
+    # 슬롯머신 회전 사운드 재생
+    timeline.sound('slot_machine/slot_spin', {'loop': True})
+    
     # 15단계의 슬롯머신 회전 애니메이션
     for i in range(15):
-        if not is_running():
-            return frame, None
-            
         # 무작위로 3개의 얼굴 선택
         selected_indices = random.choices(range(len(face_coords)), k=3)
         
-        # 선택된 얼굴 좌표 전송
-        await websocket.send_json({
+        # 선택된 얼굴 좌표
+        timeline.add({
             'type': 'animation_step',
             'step': i,
             'faces': [face_coords[idx] for idx in selected_indices]
         })
 
         # 속도 조절 (점점 느려짐)
-        await asyncio.sleep(0.1 + (i * 0.02))
+        timeline.wait(0.1 + (i * 0.02))
     
     # 슬롯머신 회전 사운드 중지 - 15번 회전 후에 중지
-    await websocket.send_json({
-        'type': 'stop_sound',
-        'sound': 'slot_machine/slot_spin'
-    })
+    timeline.stop_sound('slot_machine/slot_spin')
     
     # 최종 당첨자 선택
     winner_idx = random.randrange(len(face_coords))
     selected = face_coords[winner_idx]
     
-    # 최종 결과 전송
-    await websocket.send_json({
+    # 최종 결과
+    timeline.add({
         'type': 'animation_result',
         'face': selected
     })
@@ -74,43 +69,41 @@ async def apply_slot_machine_effect(frame, faces, websocket, original_frame=None
     # 순차적으로 슬롯 표시 (3개의 슬롯 모두 동일한 얼굴)
     for slot_idx in range(3):
         # 각 슬롯이 멈출 때마다 멈춤 효과음 재생
-        await websocket.send_json({
-            'type': 'play_sound',
-            'sound': 'slot_machine/slot_stop'
-        })
+        timeline.sound('slot_machine/slot_stop')
         
-        await websocket.send_json({
+        timeline.add({
             'type': 'show_slot',
             'slot_idx': slot_idx,
             'face': selected
         })
-        await asyncio.sleep(1)
+        timeline.wait(1)
     
-    # 승리 효과음 재생 요청
-    await websocket.send_json({
-        'type': 'play_sound',
-        'sound': 'slot_machine/winner'
-    })
+    # 승리 효과음 재생
+    timeline.sound('slot_machine/winner')
 
-    # 잭팟 효과 시작 메시지 추가
-    await websocket.send_json({
+    # 잭팟 효과 시작
+    timeline.add({
         'type': 'show_jackpot_effect'
     })
 
-    # 텍스트 오버레이 요청
-    await websocket.send_json({
-        'type': 'show_text',
-        'text': '🎉 럭키 777',
-        'position': {'x': 50, 'y': int(height - 50)},  # int로 변환
-        'style': {
+    # 텍스트 오버레이
+    timeline.text(
+        '🎉 럭키 777',
+        {'x': 50, 'y': int(height - 50)},  # int로 변환
+        {
             'fontSize': 30,
             'color': '#00ff00'
         }
-    })
+    )
     
-    # 선택 완료 메시지 전송
-    await websocket.send_json({
+    # 선택 완료
+    timeline.add({
         'type': 'selection_complete'
     })
+
+    # 타임라인 재생이 끝날 때까지 대기
+    if not is_running():
+        return frame, None
+    await timeline.play(websocket)
     
     return frame  # 원본 얼굴 좌표 반환
\ No newline at end of file
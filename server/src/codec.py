@@ -0,0 +1,110 @@
+##codec.py
+
+import binascii
+import threading
+import cv2
+import numpy as np
+from src.inference import run_inference, PRIORITY_REFRESH
+from src.metrics import timed
+from src.config import OUTBOUND_IMAGE_FORMAT
+
+# 송신 프레임 품질/크기 단계
+# - max_dimension: 긴 변 최대 길이 (0이면 원본 크기)
+# - quality: JPEG/WebP 품질 (1~100)
+# 기본은 full (원본 크기, OpenCV 기본 JPEG 품질 95 - 기존 송신 프레임과 동일), 축소 단계는 호출하는 쪽에서 선택
+CODEC_TIERS = {
+    'full': {'max_dimension': 0, 'quality': 95},
+    'standard': {'max_dimension': 1280, 'quality': 80},
+    'preview': {'max_dimension': 640, 'quality': 70},
+}
+
+# 포맷별 확장자 / MIME / 품질 파라미터
+_FORMATS = {
+    'jpeg': ('.jpg', 'image/jpeg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', 'image/webp', cv2.IMWRITE_WEBP_QUALITY),
+}
+
+
+def _resolve_format(name):
+    """설정된 송신 포맷 (이 OpenCV 빌드가 WebP 인코딩을 지원하지 않으면 JPEG)"""
+    if name == 'webp' and cv2.haveImageWriter('.webp'):
+        return 'webp'
+    if name != 'jpeg':
+        print(f"⚠️ 송신 이미지 포맷 '{name}' 사용 불가, JPEG 사용")
+    return 'jpeg'
+
+
+DEFAULT_FORMAT = _resolve_format(OUTBOUND_IMAGE_FORMAT)
+
+# codec 스레드별 축소 버퍼 (같은 크기로 반복 인코딩할 때 매번 새 배열을 만들지 않음)
+_buffers = threading.local()
+
+
+def _resize_buffer(shape):
+    buffers = getattr(_buffers, 'resize', None)
+    if buffers is None:
+        buffers = _buffers.resize = {}
+    buffer = buffers.get(shape)
+    if buffer is None:
+        buffer = buffers[shape] = np.empty(shape, np.uint8)
+    return buffer
+
+
+def decode_frame(frame_data: str) -> np.ndarray:
+    """클라이언트 프레임(Base64 JPEG, data URL 가능) -> BGR 이미지 (동기 함수, codec 풀에서 실행)
+
+    캡처 프로파일로 축소 전송된 프레임도 받은 크기 그대로 반환한다 (원본 좌표 변환은 감지 결과에서).
+    디코딩 결과는 최신 프레임으로 보관되므로 버퍼를 재사용하지 않는다.
+    """
+    # Base64 문자열 앞의 'data:image/jpeg;base64,' 제거 (클라이언트에서 붙이는 경우)
+    if frame_data.startswith('data:image'):
+        frame_data = frame_data.split(',', 1)[1]
+
+    with timed('base64_decode'):
+        nparr = np.frombuffer(binascii.a2b_base64(frame_data), np.uint8)
+    with timed('imdecode'):
+        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("cv2.imdecode returned None")
+    return img
+
+
+def encode_frame(frame: np.ndarray, tier='full', image_format=None) -> dict:
+    """BGR 이미지 -> 전송용 페이로드 {'frame': Base64, 'frame_mime': MIME} (동기 함수, codec 풀에서 실행)"""
+    settings = CODEC_TIERS[tier]
+    image_format = image_format or DEFAULT_FORMAT
+    extension, mime, quality_flag = _FORMATS[image_format]
+
+    height, width = frame.shape[:2]
+    max_dimension = settings['max_dimension']
+    if max_dimension and max(width, height) > max_dimension:
+        scale = max_dimension / max(width, height)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        buffer = _resize_buffer((size[1], size[0]) + frame.shape[2:])
+        frame = cv2.resize(frame, size, dst=buffer, interpolation=cv2.INTER_AREA)
+
+    with timed(f'encode_{image_format}'):
+        ok, encoded = cv2.imencode(extension, frame, [quality_flag, settings['quality']])
+    if not ok:
+        raise ValueError(f"cv2.imencode({extension}) 실패")
+    return {
+        'frame': binascii.b2a_base64(encoded, newline=False).decode('ascii'),
+        'frame_mime': mime,
+    }
+
+
+async def decode_frame_async(frame_data: str, client_id=None, priority=PRIORITY_REFRESH):
+    """프레임 디코딩을 codec 풀에서 실행 (이벤트 루프를 막지 않음)"""
+    return await run_inference(
+        decode_frame, frame_data,
+        workload='codec', priority=priority, client_id=client_id
+    )
+
+
+async def encode_frame_async(frame: np.ndarray, client_id=None, tier='full', image_format=None,
+                             priority=PRIORITY_REFRESH):
+    """프레임 인코딩을 codec 풀에서 실행하고 전송용 페이로드 반환"""
+    return await run_inference(
+        encode_frame, frame, tier, image_format,
+        workload='codec', priority=priority, client_id=client_id
+    )
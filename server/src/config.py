@@ -0,0 +1,131 @@
+##config.py
+
+import os
+import sys
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+# 프로젝트 루트(server/) 경로 (PyInstaller 빌드 시 압축 해제 경로)
+if getattr(sys, 'frozen', False):
+    BASE_DIR = sys._MEIPASS
+else:
+    BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(BASE_DIR, "assets", "models")
+
+
+# --- 대기 화면(lobby) 사전 감지 ---
+# 대기 중인 클라이언트의 최신 프레임으로 미리 얼굴 감지 (시작 시 결과 재사용)
+# 켜면 대기 화면 프레임 업로드(1fps)와 YOLO 부하가 늘어나므로 기본값은 꺼짐
+SPECULATIVE_DETECTION_ENABLED = _env_bool('SPOTLIGHT_SPECULATIVE_DETECTION', False)
+# 클라이언트별 사전 감지 최소 간격 (초)
+SPECULATIVE_INTERVAL = _env_float('SPOTLIGHT_SPECULATIVE_INTERVAL', 2.0)
+# 한 번의 주기에서 사전 감지할 최대 클라이언트 수
+SPECULATIVE_MAX_PER_TICK = _env_int('SPOTLIGHT_SPECULATIVE_MAX_PER_TICK', 1)
+# 진행 중인 추론 작업이 이 수 이상이면 사전 감지 건너뜀 (실시간 애니메이션 우선)
+SPECULATIVE_MAX_INFLIGHT = _env_int('SPOTLIGHT_SPECULATIVE_MAX_INFLIGHT', 1)
+# 사전 감지 결과 최대 재사용 시간 (초)
+SPECULATIVE_REUSE_AGE = _env_float('SPOTLIGHT_SPECULATIVE_REUSE_AGE', 3.0)
+
+# --- YOLO 모델 풀 ---
+# 워커 내 YOLO 모델 복제본 수 (0이면 추론 스레드 수와 동일)
+YOLO_REPLICAS = _env_int('SPOTLIGHT_YOLO_REPLICAS', 0)
+
+# --- 스레드 예산 (gunicorn 워커 간 CPU 분배) ---
+# 워커 수 (0이면 WEB_CONCURRENCY / GUNICORN_CMD_ARGS 에서 추정, 없으면 1)
+WORKER_COUNT = _env_int('SPOTLIGHT_WORKERS', 0)
+# 워커별로 서로 다른 CPU 집합에 고정 (sched_setaffinity, Linux 전용)
+PIN_WORKERS = _env_bool('SPOTLIGHT_PIN_WORKERS', False)
+
+# --- 마감 시간 기반 감지 ---
+# 연출 대기 구간이 끝난 뒤 감지 결과를 추가로 기다리는 최대 시간 (초)
+DETECTION_DEADLINE = _env_float('SPOTLIGHT_DETECTION_DEADLINE', 0.35)
+# 마감 시간을 넘긴 감지 요청을 계속 실행해 최근 얼굴 캐시를 갱신할지 여부 (False면 취소)
+DETECTION_KEEP_LATE = _env_bool('SPOTLIGHT_DETECTION_KEEP_LATE', True)
+
+# --- 대강당용 coarse-to-fine 감지 ---
+# 이 너비(px) 이상 프레임은 저해상도 전역 감지 + 관심 영역(ROI) 고해상도 감지 사용 (0이면 사용 안 함, 기본)
+# 1080p 에서는 단일 패스보다 느리므로, 켜기 전에 test/bench_hotpaths.py 의
+# yolo_single_* 와 yolo_coarse_to_fine_* 를 대상 해상도에서 비교할 것
+COARSE_TO_FINE_MIN_WIDTH = _env_int('SPOTLIGHT_COARSE_TO_FINE_MIN_WIDTH', 0)
+
+# --- 얼굴 랜드마크 백엔드 ---
+# 'dlib' (shape_predictor_68) 또는 'onnx' (onnxruntime 필요, 실패 시 dlib 으로 대체)
+LANDMARK_BACKEND = os.environ.get('SPOTLIGHT_LANDMARK_BACKEND', 'dlib').strip().lower()
+LANDMARK_DLIB_MODEL = os.environ.get(
+    'SPOTLIGHT_LANDMARK_DLIB_MODEL', os.path.join(MODELS_DIR, "shape_predictor_68_face_landmarks.dat")
+)
+LANDMARK_ONNX_MODEL = os.environ.get(
+    'SPOTLIGHT_LANDMARK_ONNX_MODEL', os.path.join(MODELS_DIR, "face_landmarks_68.onnx")
+)
+# ONNX 모델 입력 크기 (정사각 얼굴 crop 한 변)
+LANDMARK_ONNX_INPUT_SIZE = _env_int('SPOTLIGHT_LANDMARK_ONNX_INPUT_SIZE', 112)
+
+# --- 지표 (/metrics) ---
+# 단계별 지연 시간 히스토그램/카운터 기록 여부 (끄면 기록 함수가 즉시 반환)
+METRICS_ENABLED = _env_bool('SPOTLIGHT_METRICS', True)
+
+# --- 이벤트 루프 감시 ---
+# 이벤트 루프 지연 측정 + 블로킹 감시 스레드 사용 여부
+LOOP_MONITOR_ENABLED = _env_bool('SPOTLIGHT_LOOP_MONITOR', True)
+# 지연 측정 간격 (초)
+LOOP_LAG_INTERVAL = _env_float('SPOTLIGHT_LOOP_LAG_INTERVAL', 0.1)
+# 이 시간(초) 이상 루프가 막히면 루프 스레드 스택을 기록
+LOOP_BLOCK_THRESHOLD = _env_float('SPOTLIGHT_LOOP_BLOCK_THRESHOLD', 0.25)
+# 스택 덤프 출력 최소 간격 (초)
+LOOP_BLOCK_DUMP_INTERVAL = _env_float('SPOTLIGHT_LOOP_BLOCK_DUMP_INTERVAL', 10.0)
+
+# --- 이미지 코덱 ---
+# 디코딩/인코딩 전용 스레드 수 (0이면 추론 스레드 수의 절반, 최소 1)
+CODEC_WORKERS = _env_int('SPOTLIGHT_CODEC_WORKERS', 0)
+# 송신 프레임 포맷: 'jpeg' 또는 'webp' (OpenCV 빌드가 WebP 를 지원하지 않으면 JPEG)
+OUTBOUND_IMAGE_FORMAT = os.environ.get('SPOTLIGHT_OUTBOUND_IMAGE_FORMAT', 'jpeg').strip().lower()
+
+# --- 세션 트레이스 (Chrome trace event JSON, Perfetto 로 열람) ---
+# 트레이스 기능 전체 허용 여부 (끄면 샘플링/제어 메시지 모두 무시)
+TRACING_ENABLED = _env_bool('SPOTLIGHT_TRACING', False)
+# 연결 시 트레이스를 켤 세션 비율 (0~1, 0이면 'set_tracing' 제어 메시지로만 켬)
+TRACE_SAMPLE_RATE = _env_float('SPOTLIGHT_TRACE_SAMPLE_RATE', 0.0)
+# 트레이스 파일 위치 (워커별 spotlight-trace-<pid>.json)
+TRACE_DIR = os.environ.get('SPOTLIGHT_TRACE_DIR', os.path.join(BASE_DIR, "traces"))
+# 파일 하나의 최대 크기 (바이트), 넘으면 회전
+TRACE_MAX_BYTES = _env_int('SPOTLIGHT_TRACE_MAX_BYTES', 50 * 1024 * 1024)
+# 보관할 이전 파일 수
+TRACE_BACKUPS = _env_int('SPOTLIGHT_TRACE_BACKUPS', 3)
+
+# --- 관리자 진단 경로 (/admin/*) ---
+# 관리자 토큰 (X-Admin-Token 헤더, 비어 있으면 관리자 경로 비활성화)
+ADMIN_TOKEN = os.environ.get('SPOTLIGHT_ADMIN_TOKEN', '')
+# 샘플링 프로파일 최대 길이 (초)
+PROFILE_MAX_SECONDS = _env_float('SPOTLIGHT_PROFILE_MAX_SECONDS', 60.0)
+# 샘플링 최소 간격 (초) - 스택 수집 오버헤드 상한
+PROFILE_MIN_INTERVAL = _env_float('SPOTLIGHT_PROFILE_MIN_INTERVAL', 0.005)
+# tracemalloc 자동 중지 시간 (초) - 추적 중에는 모든 할당에 비용이 듦
+TRACEMALLOC_MAX_SECONDS = _env_float('SPOTLIGHT_TRACEMALLOC_MAX_SECONDS', 600.0)
+
+# --- 모드 입장 인원 관리 ---
+# 입장 인원 저장소: redis (워커 간 공유) | local (프로세스 내, 단일 워커/부하 테스트용)
+ADMISSION_BACKEND = os.environ.get('SPOTLIGHT_ADMISSION_BACKEND', 'redis').strip().lower()
+# Redis 연결 주소 (ADMISSION_BACKEND=redis)
+REDIS_URL = os.environ.get('SPOTLIGHT_REDIS_URL', 'redis://localhost:6379/0')
+
+# --- 세션 녹화 (부하 테스트 재생용) ---
+# 연결별 수신 메시지를 시각과 함께 JSONL 로 저장 (녹화용으로 띄운 서버에서만 켤 것)
+SESSION_RECORDING = _env_bool('SPOTLIGHT_SESSION_RECORDING', False)
+# 녹화 파일 위치 (연결별 session-<시각>-<client_id>.jsonl)
+SESSION_RECORD_DIR = os.environ.get('SPOTLIGHT_SESSION_RECORD_DIR', os.path.join(BASE_DIR, "recordings"))
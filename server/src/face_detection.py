@@ -1,12 +1,19 @@
 ##face_detection.py
 
 import os
+import functools
 import cv2
 import numpy as np
 from ultralytics import YOLO
 import torch
 import sys
 import asyncio
+from src.inference import run_inference, PRIORITY_REFRESH
+from src.model_pool import ModelPool
+from src.thread_budget import THREAD_PLAN, apply_thread_plan
+from src.config import DETECTION_KEEP_LATE, COARSE_TO_FINE_MIN_WIDTH
+from src.scene_gate import SceneChangeGate, scene_thumbnail
+from src.metrics import DETECTIONS, FACES_DETECTED, mode_label
 
 # 프로젝트 루트 디렉토리 경로 설정
 if getattr(sys, 'frozen', False):
@@ -17,58 +24,332 @@ else:
 
 MODEL_PATH = os.path.join(BASE_DIR, "assets", "models", "yolov8n-face.pt")
 
-# YOLO 모델 로드
-face_model = YOLO(MODEL_PATH)
+# YOLO 모델 복제본 수 (기본: 추론 스레드마다 하나)
+FACE_MODEL_REPLICAS = THREAD_PLAN.model_replicas
+
+# 워커별 스레드 예산 적용: 복제본 수 x torch 스레드 = 워커당 코어 수 (과다 구독 방지)
+apply_thread_plan(THREAD_PLAN)
+
+# 감지 신뢰도 임계값
+CONF_THRESHOLD = 0.5
+
+# YOLO 모델 로드 (복제본 풀)
+face_model_pool = ModelPool(lambda: YOLO(MODEL_PATH), FACE_MODEL_REPLICAS)
+
+# --- 고정 입력 크기 버킷 ---
+# 모델 입력은 아래 정사각 크기 중 하나로 레터박스 (해상도마다 새 입력 형태가 생기지 않도록, 배치 가능)
+# 1024/1536 은 1440p/4K 프레임을 기존 축소 비율(0.4) 그대로 감지하기 위한 버킷
+INPUT_BUCKETS = (320, 480, 640, 768, 1024, 1536)
+# 레터박스 여백 색 (ultralytics 기본값과 동일)
+LETTERBOX_COLOR = 114
 
-# CPU 바운드 작업을 처리할 동기 함수
-def _run_yolo_prediction(frame_copy):
-    """실제 YOLO 예측 및 후처리를 수행하는 동기 함수"""
-    height, width = frame_copy.shape[:2]
 
+class ResizePlan:
+    """원본 해상도 -> 버킷 입력 변환 계획 (원본 해상도별로 캐시)"""
+    __slots__ = ('bucket', 'scale', 'width', 'height')
+
+    def __init__(self, bucket, scale, width, height):
+        self.bucket = bucket
+        self.scale = scale
+        # 버킷 안에 들어가는 축소 프레임 크기 (좌상단 정렬, 나머지는 여백)
+        self.width = width
+        self.height = height
+
+
+@functools.lru_cache(maxsize=64)
+def _resize_plan(src_width, src_height):
     # 해상도에 따른 축소 비율 조정
-    if width >= 1920:  # 1080p
+    if src_width >= 1920:  # 1080p
         scale_factor = 0.4
     else:  # 720p
         scale_factor = 0.5
+    target = max(src_width, src_height) * scale_factor
+    # 목표 크기를 담을 수 있는 가장 작은 버킷 (없으면 가장 큰 버킷에 맞춰 축소)
+    bucket = next((b for b in INPUT_BUCKETS if b >= target), INPUT_BUCKETS[-1])
+    scale = min(scale_factor, bucket / max(src_width, src_height))
+    return ResizePlan(bucket, scale, max(1, round(src_width * scale)), max(1, round(src_height * scale)))
+
+
+def _letterbox(frame, plan):
+    """계획에 따라 축소 후 버킷 크기 정사각 입력에 좌상단 정렬로 배치"""
+    canvas = np.full((plan.bucket, plan.bucket, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    canvas[:plan.height, :plan.width] = cv2.resize(frame, (plan.width, plan.height), interpolation=cv2.INTER_AREA)
+    return canvas
+
+
+def _restore_faces(xyxy, conf, scale):
+    """신뢰도 필터링 + 원본 좌표 복원 (벡터 연산) -> (x, y, w, h) 정수 배열"""
+    xyxy = xyxy[conf > CONF_THRESHOLD]
+    if len(xyxy) == 0:
+        return np.array([])
+    # 원본 크기로 좌표 복원 시 scale 역으로 적용
+    xyxy = (xyxy / scale).astype(int)
+    return np.column_stack([xyxy[:, 0], xyxy[:, 1], xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1]])
+
+
+def _predict_boxes(images, imgsz):
+    """이미지 목록을 한 번에 예측해 이미지별 (xyxy 배열, conf 배열) 반환"""
+    with face_model_pool.model() as face_model:
+        results = face_model.predict(
+            images,
+            verbose=False,
+            device="cuda" if torch.cuda.is_available() else "cpu",
+            conf=CONF_THRESHOLD,
+            imgsz=imgsz
+        )
+    boxes = []
+    for r in results:
+        if hasattr(r, "boxes") and len(r.boxes) > 0:
+            boxes.append((r.boxes.xyxy.cpu().numpy(), r.boxes.conf.cpu().numpy()))
+        else:
+            boxes.append((np.zeros((0, 4), dtype=np.float32), np.zeros(0, dtype=np.float32)))
+    return boxes
+
+
+# CPU 바운드 작업을 처리할 동기 함수
+def _run_yolo_predictions(frames):
+    """여러 프레임을 버킷별로 묶어 예측 (프레임 순서대로 (x, y, w, h) 배열 목록 반환)"""
+    plans = [_resize_plan(frame.shape[1], frame.shape[0]) for frame in frames]
+    faces = [None] * len(frames)
+    for bucket in set(plan.bucket for plan in plans):
+        indices = [i for i, plan in enumerate(plans) if plan.bucket == bucket]
+        inputs = [_letterbox(frames[i], plans[i]) for i in indices]
+        for i, (xyxy, conf) in zip(indices, _predict_boxes(inputs, bucket)):
+            faces[i] = _restore_faces(xyxy, conf, plans[i].scale)
+    return faces
+
+
+def _run_yolo_prediction(frame_copy):
+    """실제 YOLO 예측 및 후처리를 수행하는 동기 함수"""
+    return _run_yolo_predictions([frame_copy])[0]
+
+
+# --- coarse-to-fine 감지 (대강당 뒷줄의 작은 얼굴 대응) ---
+# 전역 저해상도 패스의 긴 변 크기 (큰 얼굴과 새로 나타난 얼굴 위치 파악용)
+COARSE_MAX_SIDE = 640
+# 관심 영역(ROI) / 타일 고해상도 패스 입력 크기
+FINE_IMGSZ = 640
+# ROI 패딩 (박스 크기 대비 비율, 움직임 여유)
+ROI_PADDING = 0.6
+# ROI 최소 한 변 길이 (px, 주변 맥락 포함)
+ROI_MIN_SIDE = 160
+# ROI 가 이보다 많으면 타일 패스로 대체
+MAX_ROIS = 8
+# 사전 정보가 없을 때 타일 분할 (가로 x 세로) 과 타일 간 겹침 비율
+TILE_GRID = (2, 2)
+TILE_OVERLAP = 0.1
+# 타일/ROI 간 중복 박스 제거 IoU 임계값
+NMS_IOU = 0.45
+
+
+def _pad_regions(boxes_xywh, width, height):
+    """(x, y, w, h) 박스를 패딩한 ROI (x0, y0, x1, y1) 목록"""
+    regions = []
+    for x, y, w, h in boxes_xywh:
+        pad_w = max(w * (1 + 2 * ROI_PADDING), ROI_MIN_SIDE)
+        pad_h = max(h * (1 + 2 * ROI_PADDING), ROI_MIN_SIDE)
+        cx, cy = x + w / 2, y + h / 2
+        regions.append([
+            max(0, int(cx - pad_w / 2)), max(0, int(cy - pad_h / 2)),
+            min(width, int(cx + pad_w / 2)), min(height, int(cy + pad_h / 2)),
+        ])
+    return regions
+
+
+def _merge_regions(regions):
+    """겹치는 ROI 를 하나로 합침 (같은 영역을 두 번 감지하지 않도록)"""
+    merged = []
+    for region in sorted(regions):
+        for existing in merged:
+            if region[0] < existing[2] and existing[0] < region[2] and region[1] < existing[3] and existing[1] < region[3]:
+                existing[:] = [min(existing[0], region[0]), min(existing[1], region[1]),
+                               max(existing[2], region[2]), max(existing[3], region[3])]
+                break
+        else:
+            merged.append(list(region))
+    # 합친 결과가 다시 겹칠 수 있으므로 변화가 없을 때까지 반복
+    return merged if len(merged) == len(regions) else _merge_regions(merged)
+
 
-    small_frame = cv2.resize(frame_copy, (int(width * scale_factor),
-                                          int(height * scale_factor)))
-
-    # 모델 예측 실행
-    results = face_model.predict(
-        small_frame,
-        verbose=False,
-        device="cuda" if torch.cuda.is_available() else "cpu",
-        conf=0.5,
-        imgsz=max(small_frame.shape[:2])
-    )
-
-    faces = []
-    if isinstance(results, list):
-        for r in results:
-            if hasattr(r, "boxes"):
-                for box in r.boxes:
-                    x, y, x2, y2 = box.xyxy[0].tolist()
-                    conf = box.conf[0].item()
-                    if conf > 0.5:
-                        # 원본 크기로 좌표 복원 시 scale_factor 역으로 적용
-                        x, y, x2, y2 = int(x / scale_factor), int(y / scale_factor), int(x2 / scale_factor), int(y2 / scale_factor)
-                        faces.append((x, y, x2 - x, y2 - y)) # (x, y, w, h) 형식으로 저장
-
-    return np.array(faces)
+def _tile_regions(width, height):
+    cols, rows = TILE_GRID
+    tile_w, tile_h = width / cols, height / rows
+    pad_x, pad_y = tile_w * TILE_OVERLAP, tile_h * TILE_OVERLAP
+    return [
+        [max(0, int(c * tile_w - pad_x)), max(0, int(r * tile_h - pad_y)),
+         min(width, int((c + 1) * tile_w + pad_x)), min(height, int((r + 1) * tile_h + pad_y))]
+        for r in range(rows) for c in range(cols)
+    ]
+
+
+def _nms_xywh(xyxy, conf):
+    """타일/ROI 경계에서 중복된 박스 제거 후 (x, y, w, h) 정수 배열 반환"""
+    if len(xyxy) == 0:
+        return np.array([])
+    xywh = np.column_stack([xyxy[:, 0], xyxy[:, 1], xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1]])
+    keep = cv2.dnn.NMSBoxes(xywh.tolist(), conf.tolist(), CONF_THRESHOLD, NMS_IOU)
+    keep = np.array(keep).reshape(-1)
+    return xywh[keep].astype(int)
+
+
+def _run_coarse_to_fine_prediction(frame_copy, prior_faces=None):
+    """저해상도 전역 패스 + 관심 영역 고해상도 패스 감지 (동기 함수)
+
+    관심 영역은 이전에 알려진 얼굴(prior_faces)과 전역 패스에서 찾은 얼굴 주변을 패딩한 영역.
+    알려진 얼굴도 없고 전역 패스도 아무것도 찾지 못했을 때만 겹치는 타일로 전체를 고해상도 감지하고,
+    영역이 너무 많으면(전역 패스가 이미 교실 대부분을 찾음) 고해상도 패스 없이 전역 결과를 쓴다.
+    """
+    height, width = frame_copy.shape[:2]
+
+    # 1. 저해상도 전역 패스 (고정 크기 버킷으로 레터박스)
+    coarse_scale = min(1.0, COARSE_MAX_SIDE / max(width, height))
+    coarse_plan = ResizePlan(COARSE_MAX_SIDE, coarse_scale,
+                             max(1, round(width * coarse_scale)), max(1, round(height * coarse_scale)))
+    coarse_xyxy, coarse_conf = _predict_boxes(_letterbox(frame_copy, coarse_plan), COARSE_MAX_SIDE)[0]
+    coarse_xyxy = coarse_xyxy / coarse_scale
+
+    # 2. 관심 영역 결정
+    known = [tuple(face) for face in prior_faces] if prior_faces is not None else []
+    known += [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in coarse_xyxy]
+    if not known:
+        # 단서가 전혀 없을 때만 작은 얼굴을 놓치지 않도록 타일 사용
+        regions = _tile_regions(width, height)
+    else:
+        regions = _merge_regions(_pad_regions(known, width, height))
+        if len(regions) > MAX_ROIS:
+            return _nms_xywh(coarse_xyxy, coarse_conf)
+
+    # 3. 영역별 고해상도 패스 (한 번의 배치 예측)
+    crops = [frame_copy[y0:y1, x0:x1] for x0, y0, x1, y1 in regions]
+    all_xyxy = [coarse_xyxy]
+    all_conf = [coarse_conf]
+    for (x0, y0, _, _), (xyxy, conf) in zip(regions, _predict_boxes(crops, FINE_IMGSZ)):
+        all_xyxy.append(xyxy + np.array([x0, y0, x0, y0], dtype=np.float32))
+        all_conf.append(conf)
+
+    # 4. 중복 제거
+    return _nms_xywh(np.concatenate(all_xyxy), np.concatenate(all_conf))
+
+
+# 클라이언트별 장면 변화 게이트 (변화 없는 프레임은 이전 감지 결과 재사용)
+_scene_gates = {}
+# 클라이언트별 가장 최근에 감지된 얼굴 (마감 시간 초과 시 대체 결과)
+_last_known_faces = {}
+# 마감 시간을 넘겨 계속 실행 중인 감지 (클라이언트당 최대 1개)
+_late_detections = {}
+
+
+def forget_client(client_id):
+    """클라이언트 연결 종료 시 감지 관련 상태 제거"""
+    _scene_gates.pop(client_id, None)
+    _last_known_faces.pop(client_id, None)
+    late = _late_detections.pop(client_id, None)
+    if late is not None:
+        late.cancel()
+
+
+def scale_faces(faces, factor):
+    """(x, y, w, h) 얼굴 배열의 좌표계 변환 (축소 프레임 <-> 원본 카메라 좌표)"""
+    if faces is None or len(faces) == 0 or factor == 1.0:
+        return faces
+    return np.round(np.asarray(faces) * factor).astype(int)
+
+
+def last_known_faces(client_id):
+    """클라이언트의 가장 최근 감지 얼굴 (없으면 빈 배열)"""
+    faces = _last_known_faces.get(client_id)
+    return faces.copy() if faces is not None else np.array([])
 
 
 # 기존 detect_faces_yolo 함수를 async 함수로 변경
-async def detect_faces_yolo(frame):
-    """해상도에 따라 적응적으로 조정되는 얼굴 감지 (비동기 실행)"""
-    # 프레임 데이터가 스레드간 공유되지 않도록 복사본 전달 고려
-    # 여기서는 OpenCV 객체 특성상 복사가 필요할 수 있으나,
-    # NumPy 배열은 GIL 때문에 동시 수정 문제는 덜하지만 안전하게 복사본 사용 가능
-    # 다만, 성능 영향 고려 필요. 여기서는 일단 직접 전달
-    faces = await asyncio.to_thread(_run_yolo_prediction, frame.copy()) # frame.copy() 사용 고려
+async def detect_faces_yolo(frame, client_id=None, reuse_age=None, priority=PRIORITY_REFRESH, scale=1.0):
+    """해상도에 따라 적응적으로 조정되는 얼굴 감지 (비동기 실행)
+
+    client_id 가 주어지면 직전 감지 프레임과 거의 같은 프레임에 대해서는
+    YOLO를 실행하지 않고 이전 결과를 재사용한다 (최대 재사용 시간 제한).
+    reuse_age 는 이번 결과를 이후 호출에서 재사용할 수 있는 시간 (사전 감지용).
+    priority 는 추론 스케줄러 우선순위 (시작 감지 > 진행 중 갱신 > 사전 감지).
+    scale 은 frame 픽셀 -> 원본 카메라 좌표 배율 (축소 전송된 프레임). 반환하는 얼굴 좌표와
+    클라이언트별 캐시는 항상 원본 카메라 좌표계.
+    """
+    gate = None
+    thumb = None
+    if client_id is not None:
+        gate = _scene_gates.setdefault(client_id, SceneChangeGate())
+        # 전체 프레임 축소(~2ms @1080p)도 이벤트 루프를 막지 않도록 codec 풀에서 실행
+        thumb = await run_inference(
+            scene_thumbnail, frame, workload='codec', priority=priority, client_id=client_id
+        )
+        cached_faces = gate.lookup(thumb)
+        if cached_faces is not None:
+            DETECTIONS.inc(mode_label(), 'scene_reuse')
+            _remember_faces(client_id, cached_faces)
+            return cached_faces
+
+    # 프레임 데이터가 스레드간 공유되지 않도록 복사본 전달
+    # 전용 추론 풀에서 실행: 호출 태스크가 취소되면 대기 중인 감지 요청은 버려짐
+    if COARSE_TO_FINE_MIN_WIDTH and frame.shape[1] >= COARSE_TO_FINE_MIN_WIDTH:
+        # 고해상도 프레임: 알려진 얼굴 주변만 고해상도로 다시 감지
+        faces = await run_inference(
+            _run_coarse_to_fine_prediction, frame.copy(), scale_faces(_last_known_faces.get(client_id), 1 / scale),
+            priority=priority, client_id=client_id
+        )
+    else:
+        faces = await run_inference(
+            _run_yolo_prediction, frame.copy(), priority=priority, client_id=client_id
+        )
+    faces = scale_faces(faces, scale)
+
+    DETECTIONS.inc(mode_label(), 'yolo')
+    FACES_DETECTED.inc(mode_label(), amount=len(faces))
+
+    if gate is not None:
+        gate.store(thumb, faces, reuse_age=reuse_age)
+        _remember_faces(client_id, faces)
     return faces
 
 
+def _remember_faces(client_id, faces):
+    if len(faces) > 0:
+        _last_known_faces[client_id] = faces
+
+
+async def detect_faces_until(frame, client_id, timeout, priority=PRIORITY_REFRESH, keep_late=DETECTION_KEEP_LATE,
+                             scale=1.0):
+    """마감 시간(timeout 초) 안에 끝나는 얼굴 감지: (faces, is_stale) 반환
+
+    시간 안에 감지가 끝나지 않으면 클라이언트의 가장 최근 감지 얼굴과 is_stale=True 를
+    바로 반환해 연출 속도를 유지한다. 늦은 감지는 keep_late 이면 계속 실행되어 최근 얼굴
+    캐시를 갱신하고 (클라이언트당 1개까지, 이미 있으면 새 요청은 취소), 아니면 취소된다.
+    얼굴 좌표는 detect_faces_yolo 와 같이 원본 카메라 좌표계 (scale 참고).
+    """
+    task = asyncio.ensure_future(detect_faces_yolo(frame, client_id, priority=priority, scale=scale))
+    try:
+        done, _ = await asyncio.wait({task}, timeout=timeout)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    if task in done:
+        return task.result(), False
+
+    pending_late = _late_detections.get(client_id)
+    if keep_late and client_id is not None and (pending_late is None or pending_late.done()):
+        _late_detections[client_id] = task
+        task.add_done_callback(lambda t: _on_late_detection_done(client_id, t))
+    else:
+        task.cancel()
+    return last_known_faces(client_id), True
+
+
+def _on_late_detection_done(client_id, task):
+    if _late_detections.get(client_id) is task:
+        del _late_detections[client_id]
+    # 처리되지 않은 예외가 "never retrieved" 경고로 남지 않도록 회수
+    if not task.cancelled() and task.exception() is not None:
+        print(f"[detect_faces_until] 늦은 감지 오류 (클라이언트: {client_id}): {task.exception()}")
+
+
 # detect_people 함수도 async로 변경 필요 (detect_faces_yolo를 호출하므로)
 async def detect_people(frame):
     """ 얼굴, 상반신, 전신 감지 (비동기) """
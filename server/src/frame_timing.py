@@ -0,0 +1,83 @@
+##frame_timing.py
+
+import time
+import contextvars
+from contextlib import contextmanager
+
+# 클라이언트가 보고하는 glass-to-glass 지연의 허용 범위 (ms) 와 보고 1회당 최대 표본 수
+MAX_REPORTED_LATENCY_MS = 60_000
+MAX_REPORT_SAMPLES = 500
+
+
+class FrameRef:
+    """수신 프레임 하나에서 파생된 결과의 출처와 서버 측 소요 시간
+
+    클라이언트가 프레임에 붙인 frame_seq / capture_ts 를 보관하고, 이 프레임으로
+    실행된 감지·랜드마크 작업의 대기열/추론 시간을 누적한다. 결과 메시지에
+    echo() 를 실으면 클라이언트가 캡처부터 수신까지의 지연을 계산할 수 있다.
+    """
+    __slots__ = ('seq', 'capture_ts', 'received_at', 'decode_ms', 'queue_ms', 'inference_ms')
+
+    def __init__(self, seq, capture_ts, received_at, decode_ms=0.0):
+        self.seq = seq
+        self.capture_ts = capture_ts
+        # 서버 수신 시각 (time.monotonic)
+        self.received_at = received_at
+        self.decode_ms = decode_ms
+        self.queue_ms = 0.0
+        self.inference_ms = 0.0
+
+    @classmethod
+    def from_message(cls, data, decode_ms):
+        """프레임 메시지에서 생성 (클라이언트가 frame_seq 를 보내지 않았으면 None)"""
+        seq = data.get('frame_seq')
+        if seq is None:
+            return None
+        return cls(seq, data.get('capture_ts'), data.get('_received_at', time.monotonic()), decode_ms)
+
+    def derive(self):
+        """같은 프레임에 대한 새 작업용 복사본 (대기열/추론 시간은 0부터 누적)"""
+        return FrameRef(self.seq, self.capture_ts, self.received_at, self.decode_ms)
+
+    def add_job(self, queue_seconds, compute_seconds):
+        self.queue_ms += queue_seconds * 1000
+        self.inference_ms += compute_seconds * 1000
+
+    def echo(self, stale=False):
+        return {
+            'seq': self.seq,
+            'capture_ts': self.capture_ts,
+            # 감지 마감 시간을 넘겨 이전 감지 결과가 쓰인 경우
+            'stale': bool(stale),
+            'timings': {
+                'decode_ms': round(self.decode_ms, 2),
+                'queue_ms': round(self.queue_ms, 2),
+                'inference_ms': round(self.inference_ms, 2),
+                'server_ms': round((time.monotonic() - self.received_at) * 1000, 2),
+            },
+        }
+
+
+# 현재 태스크의 작업이 시간을 누적할 프레임 (추론 스케줄러가 작업 제출 시 읽음)
+current_frame_ref = contextvars.ContextVar('spotlight_current_frame_ref', default=None)
+
+
+@contextmanager
+def tracking(frame_ref):
+    """with tracking(ref): ... 블록 안에서 제출된(또는 시작된 태스크의) 추론 작업 시간을 ref 에 누적"""
+    token = current_frame_ref.set(frame_ref)
+    try:
+        yield frame_ref
+    finally:
+        current_frame_ref.reset(token)
+
+
+def frame_echo(frame_ref, stale=False):
+    """결과 메시지에 펼쳐 넣을 필드 ({'frame_ref': ...}, 프레임 정보가 없으면 빈 dict)"""
+    if frame_ref is None:
+        return {}
+    return {'frame_ref': frame_ref.echo(stale)}
+
+
+def current_frame_echo(stale=False):
+    return frame_echo(current_frame_ref.get(), stale)
@@ -0,0 +1,247 @@
+##inference.py
+
+import time
+import asyncio
+import contextvars
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from src.thread_budget import THREAD_PLAN
+from src.metrics import current_mode, observe_stage, observe_queue_wait, count_error
+from src.config import CODEC_WORKERS
+from src.tracing import active_trace
+from src.frame_timing import current_frame_ref
+
+# 추론 전용 스레드 풀 크기 (기본 executor와 분리하여 대기열을 제한, 워커별 스레드 예산 기준)
+INFERENCE_WORKERS = THREAD_PLAN.inference_threads
+
+# 작업 종류(workload)별 전용 executor 크기
+# - detection: YOLO 얼굴 감지
+# - landmarks: dlib 랜드마크 (YOLO보다 가벼움)
+# - codec: 수신 프레임 디코딩, 송신 프레임 인코딩
+WORKLOAD_WORKERS = {
+    'detection': INFERENCE_WORKERS,
+    'landmarks': max(1, INFERENCE_WORKERS // 2),
+    'codec': CODEC_WORKERS or max(1, INFERENCE_WORKERS // 2),
+}
+
+# 우선순위 (숫자가 작을수록 먼저 실행)
+PRIORITY_INTERACTIVE = 0   # 애니메이션 시작 시점의 1회성 감지
+PRIORITY_REFRESH = 1       # 애니메이션 진행 중 갱신 감지
+PRIORITY_SPECULATIVE = 2   # 대기 화면 사전 감지
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_REFRESH: 'refresh',
+    PRIORITY_SPECULATIVE: 'speculative',
+}
+
+# 우선순위별 대기 시간 통계에 보관할 최근 표본 수
+WAIT_SAMPLES = 512
+
+
+class _Job:
+    __slots__ = ('func', 'args', 'future', 'priority', 'enqueued_at', 'started_at', 'mode', 'context', 'trace', 'frame_ref')
+
+    def __init__(self, func, args, future, priority):
+        self.func = func
+        self.args = args
+        self.future = future
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        # 요청한 태스크의 모드 (지표 레이블)
+        self.mode = current_mode.get()
+        # 요청한 태스크의 컨텍스트 (작업 스레드 안의 지표 기록도 같은 모드 레이블 사용)
+        self.context = contextvars.copy_context()
+        # 요청한 세션의 트레이스 (꺼져 있으면 None)
+        self.trace = active_trace()
+        # 이 작업의 입력 프레임 (대기열/추론 시간을 결과 메시지에 되돌려 보내기 위함)
+        self.frame_ref = current_frame_ref.get()
+
+
+class _WaitStats:
+    """대기열 대기 시간 통계 (초 단위 기록, 보고는 ms)"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=WAIT_SAMPLES)
+
+    def record(self, wait):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+        self.samples.append(wait)
+
+    def report(self):
+        samples = sorted(self.samples)
+
+        def percentile(p):
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+        return {
+            'count': self.count,
+            'mean_ms': (self.total / self.count * 1000) if self.count else 0.0,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'max_ms': self.max * 1000,
+        }
+
+
+class WorkloadScheduler:
+    """작업 종류 하나의 스케줄러: 전용 executor + 우선순위/클라이언트 공정 대기열
+
+    executor 에는 빈 스레드 수만큼만 넘기고 나머지는 자체 대기열에 보관한다.
+    다음 작업은 가장 높은 우선순위에서, 클라이언트 간 라운드로빈으로 고른다
+    (한 클라이언트의 연속 요청이 다른 클라이언트의 요청을 굶기지 않도록).
+    이벤트 루프 스레드에서만 호출된다.
+    """
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        # priority -> OrderedDict(client_id -> deque[_Job]) (OrderedDict 순서 = 라운드로빈 순서)
+        self._queues = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self._queued = 0
+        self._running = 0
+        self.wait_stats = {priority: _WaitStats() for priority in PRIORITY_NAMES}
+
+    def load(self):
+        """대기 중이거나 실행 중인 작업 수"""
+        return self._queued + self._running
+
+    async def submit(self, func, args, priority=PRIORITY_REFRESH, client_id=None):
+        """작업을 대기열에 넣고 결과 대기 (취소 시 대기 중인 작업은 실행되지 않음)"""
+        job = _Job(func, args, asyncio.get_running_loop().create_future(), priority)
+        self._queues[priority].setdefault(client_id, deque()).append(job)
+        self._queued += 1
+        self._dispatch()
+        return await job.future
+
+    def _next_job(self):
+        for priority, clients in self._queues.items():
+            while clients:
+                client_id, jobs = next(iter(clients.items()))
+                job = jobs.popleft()
+                self._queued -= 1
+                if jobs:
+                    # 이 클라이언트를 라운드로빈 순서의 맨 뒤로
+                    clients.move_to_end(client_id)
+                else:
+                    del clients[client_id]
+                if job.future.cancelled():
+                    continue # 대기 중 취소된 작업은 버림
+                return priority, job
+        return None, None
+
+    def _dispatch(self):
+        while self._running < self.workers:
+            priority, job = self._next_job()
+            if job is None:
+                return
+            job.started_at = time.monotonic()
+            wait = job.started_at - job.enqueued_at
+            self.wait_stats[priority].record(wait)
+            observe_stage(f'{self.name}_queue', wait, job.mode)
+            observe_queue_wait(self.name, PRIORITY_NAMES[priority], wait)
+            self._running += 1
+            concurrent_future = self._executor.submit(job.context.run, job.func, *job.args)
+            asyncio.wrap_future(concurrent_future).add_done_callback(
+                lambda done, job=job: self._on_done(job, done)
+            )
+
+    def _on_done(self, job, done):
+        self._running -= 1
+        finished_at = time.monotonic()
+        observe_stage(f'{self.name}_compute', finished_at - job.started_at, job.mode)
+        if job.frame_ref is not None and self.name != 'codec':
+            job.frame_ref.add_job(job.started_at - job.enqueued_at, finished_at - job.started_at)
+        if job.trace is not None:
+            # 대기열 대기와 실제 실행을 구분해 기록
+            func_name = getattr(job.func, '__name__', self.name)
+            args = {'priority': PRIORITY_NAMES[job.priority]}
+            job.trace.complete(f'queue:{func_name}', self.name, job.enqueued_at * 1e6, job.started_at * 1e6, args)
+            job.trace.complete(f'compute:{func_name}', self.name, job.started_at * 1e6, finished_at * 1e6, args)
+        if not done.cancelled() and done.exception() is not None:
+            count_error(self.name, job.mode)
+        if not job.future.done():
+            # 실행 중 호출자가 취소된 경우 결과는 폐기됨
+            if done.cancelled():
+                job.future.cancel()
+            elif done.exception() is not None:
+                job.future.set_exception(done.exception())
+            else:
+                job.future.set_result(done.result())
+        self._dispatch()
+
+    def report(self):
+        return {
+            'workers': self.workers,
+            'queued': self._queued,
+            'running': self._running,
+            'queue_wait': {
+                PRIORITY_NAMES[priority]: stats.report()
+                for priority, stats in self.wait_stats.items()
+            },
+        }
+
+
+# 작업 종류별 스케줄러
+_schedulers = {
+    name: WorkloadScheduler(name, workers)
+    for name, workers in WORKLOAD_WORKERS.items()
+}
+
+
+def inference_load(workload='detection'):
+    """현재 대기 중이거나 실행 중인 추론 작업 수"""
+    return _schedulers[workload].load()
+
+
+def scheduler_report():
+    """작업 종류/우선순위별 대기열 상태와 대기 시간 통계"""
+    return {name: scheduler.report() for name, scheduler in _schedulers.items()}
+
+
+async def run_inference(func, *args, workload='detection', priority=PRIORITY_REFRESH, client_id=None):
+    """CPU 바운드 함수를 작업 종류별 전용 스레드 풀에서 실행 (우선순위/공정성 스케줄링, 취소 가능)
+
+    기본 executor(asyncio.to_thread) 대신 별도 스케줄러를 쓰는 이유:
+    - 작업 종류별 전용 풀: 프레임 디코딩·랜드마크가 YOLO 감지 대기열 뒤에 밀리지 않음
+    - 우선순위: 애니메이션 시작 감지가 진행 중 갱신·대기 화면 사전 감지보다 먼저 실행
+    - 클라이언트별 공정성: 한 교실이 대기열을 독점하지 않도록 클라이언트 간 번갈아 실행
+    호출한 태스크가 취소되면 대기 중인 작업은 버려지고, 이미 실행 중인 작업은 결과만 폐기된다.
+    """
+    return await _schedulers[workload].submit(func, args, priority=priority, client_id=client_id)
+
+
+class Prefetch:
+    """유휴 구간(대기/연출) 시작 시점에 작업을 미리 시작하고, 필요할 때 결과를 수거
+
+    생성한 태스크(애니메이션)가 끝나거나 취소되면 미수거 작업도 함께 취소된다.
+    """
+
+    def __init__(self, awaitable):
+        self._task = asyncio.ensure_future(awaitable)
+        owner = asyncio.current_task()
+        if owner is not None:
+            owner.add_done_callback(lambda _: self.cancel())
+
+    def done(self):
+        return self._task.done()
+
+    async def result(self):
+        """결과 수거 (아직 끝나지 않았으면 완료까지 대기)"""
+        return await self._task
+
+    def cancel(self):
+        if not self._task.done():
+            self._task.cancel()
+
+
+def prefetch(awaitable):
+    """awaitable 을 백그라운드에서 미리 실행하고 Prefetch 핸들 반환"""
+    return Prefetch(awaitable)
@@ -0,0 +1,253 @@
+##landmarks.py
+
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+from src.config import (
+    LANDMARK_BACKEND,
+    LANDMARK_DLIB_MODEL,
+    LANDMARK_ONNX_MODEL,
+    LANDMARK_ONNX_INPUT_SIZE,
+)
+
+# 모든 백엔드가 반환하는 랜드마크 점 수 (dlib 68점 배치, ExpressionDetector 가 사용하는 인덱스)
+NUM_LANDMARKS = 68
+
+
+class LandmarkBackend(ABC):
+    """얼굴 랜드마크 추출기 인터페이스
+
+    predict_batch(frame, boxes) 는 한 프레임의 여러 얼굴 박스 (x, y, w, h) 에 대해
+    박스 순서대로 (68, 2) int 좌표 배열(실패 시 None) 목록을 반환하는 동기 함수.
+    추론 스레드에서 호출된다.
+    """
+
+    name = "base"
+
+    @property
+    @abstractmethod
+    def available(self) -> bool:
+        pass
+
+    @abstractmethod
+    def predict_batch(self, frame: np.ndarray, boxes) -> list:
+        pass
+
+
+class DlibLandmarkBackend(LandmarkBackend):
+    """dlib shape_predictor_68 (얼굴마다 1회 호출, 그레이스케일 변환은 프레임당 1회)"""
+
+    name = "dlib"
+
+    def __init__(self, model_path=LANDMARK_DLIB_MODEL):
+        self._predictor = None
+        try:
+            import dlib
+            self._dlib = dlib
+            self._predictor = dlib.shape_predictor(model_path)
+        except Exception as e:
+            print(f"⚠️ Dlib 초기화 실패: {e}. 랜드마크 기반 기능이 제한됩니다.")
+
+    @property
+    def available(self):
+        return self._predictor is not None
+
+    def predict_batch(self, frame, boxes):
+        if not self.available:
+            return [None] * len(boxes)
+        # dlib은 그레이스케일 이미지를 사용
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        results = []
+        for x, y, w, h in boxes:
+            try:
+                rect = self._dlib.rectangle(int(x), int(y), int(x + w), int(y + h))
+                shape = self._predictor(gray, rect)
+                coords = np.zeros((NUM_LANDMARKS, 2), dtype=int)
+                for i in range(NUM_LANDMARKS):
+                    coords[i] = (shape.part(i).x, shape.part(i).y)
+                results.append(coords)
+            except Exception as e:
+                # 실제 운영 시 로깅 등으로 대체하는 것이 좋음
+                print(f"랜드마크 감지 오류 (동기 함수 내): {e}")
+                results.append(None)
+        return results
+
+
+class OnnxLandmarkBackend(LandmarkBackend):
+    """ONNX Runtime CNN 랜드마크 모델 (얼굴 crop 배치를 한 번에 추론)
+
+    모델 규약: 입력 (N, 3, S, S) float32 RGB 0~1, 출력 (N, 136) 또는 (N, 68, 2) 의
+    crop 기준 정규화 좌표 (0~1, dlib 68점 순서).
+    """
+
+    name = "onnx"
+
+    # 박스 주변 여백 비율 (턱/눈썹이 잘리지 않도록 정사각 crop 확장)
+    CROP_MARGIN = 0.2
+
+    def __init__(self, model_path=LANDMARK_ONNX_MODEL, input_size=LANDMARK_ONNX_INPUT_SIZE):
+        self.input_size = input_size
+        self._session = None
+        try:
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            # 스레드 예산 안에서 실행 (추론 executor 스레드마다 1개)
+            options.intra_op_num_threads = 1
+            options.inter_op_num_threads = 1
+            self._session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+            self._input_name = self._session.get_inputs()[0].name
+        except Exception as e:
+            print(f"⚠️ ONNX 랜드마크 모델 초기화 실패: {e}")
+
+    @property
+    def available(self):
+        return self._session is not None
+
+    def _crop_square(self, box):
+        """박스 중심 기준 여백을 더한 정사각 crop 영역 (x0, y0, side)"""
+        x, y, w, h = box
+        side = max(w, h) * (1 + 2 * self.CROP_MARGIN)
+        cx, cy = x + w / 2, y + h / 2
+        return cx - side / 2, cy - side / 2, side
+
+    def predict_batch(self, frame, boxes):
+        if not self.available or len(boxes) == 0:
+            return [None] * len(boxes)
+        size = self.input_size
+        crops = np.empty((len(boxes), size, size, 3), dtype=np.uint8)
+        regions = []
+        for i, box in enumerate(boxes):
+            x0, y0, side = self._crop_square(box)
+            regions.append((x0, y0, side))
+            # 프레임 밖 영역은 0으로 채우는 affine 변환 (crop + resize 한 번에)
+            scale = size / side
+            matrix = np.array([[scale, 0, -x0 * scale], [0, scale, -y0 * scale]], dtype=np.float32)
+            crops[i] = cv2.warpAffine(frame, matrix, (size, size), flags=cv2.INTER_LINEAR,
+                                      borderMode=cv2.BORDER_CONSTANT)
+        # BGR -> RGB, NHWC -> NCHW, 0~1
+        inputs = crops[..., ::-1].transpose(0, 3, 1, 2).astype(np.float32) / 255.0
+        outputs = self._session.run(None, {self._input_name: inputs})[0]
+        points = np.asarray(outputs, dtype=np.float32).reshape(len(boxes), NUM_LANDMARKS, 2)
+
+        # crop 정규화 좌표 -> 프레임 좌표
+        regions = np.array(regions, dtype=np.float32)
+        coords = points * regions[:, None, 2:3] + regions[:, None, 0:2]
+        return [c for c in coords.astype(int)]
+
+
+_BACKENDS = {
+    DlibLandmarkBackend.name: DlibLandmarkBackend,
+    OnnxLandmarkBackend.name: OnnxLandmarkBackend,
+}
+
+
+def create_landmark_backend(name=LANDMARK_BACKEND):
+    """설정된 백엔드 생성 (사용할 수 없으면 dlib 으로 대체)"""
+    backend_cls = _BACKENDS.get(name)
+    if backend_cls is None:
+        print(f"⚠️ 알 수 없는 랜드마크 백엔드 '{name}', dlib 사용")
+        backend_cls = DlibLandmarkBackend
+    backend = backend_cls()
+    if not backend.available and backend_cls is not DlibLandmarkBackend:
+        print(f"⚠️ 랜드마크 백엔드 '{name}' 사용 불가, dlib 으로 대체")
+        backend = DlibLandmarkBackend()
+    return backend
+
+
+# --- 랜드마크 캐시 (가만히 있는 얼굴은 랜드마크 재추론 생략) ---
+# 같은 얼굴로 볼 최소 IoU
+TRACK_MATCH_IOU = 0.5
+# 랜드마크를 재사용할 최소 IoU (박스가 거의 움직이지 않음)
+BOX_STABLE_IOU = 0.85
+# 얼굴 영역 변화 비교용 축소 패치 크기와 평균 밝기 차이 임계값 (0~255)
+PATCH_SIZE = (24, 24)
+PATCH_DIFF_THRESHOLD = 4.0
+# 클라이언트당 보관할 최대 얼굴 수
+MAX_TRACKS = 32
+
+
+def _box_iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    inter_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    inter_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = inter_w * inter_h
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _face_patch(frame, box):
+    """얼굴 영역을 작은 그레이스케일 패치로 축소 (픽셀 변화 비교용)"""
+    x, y, w, h = box
+    region = frame[max(0, y):max(0, y + h), max(0, x):max(0, x + w)]
+    if region.size == 0:
+        return None
+    small = cv2.resize(region, PATCH_SIZE, interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.int16)
+
+
+class LandmarkCache:
+    """얼굴(IoU 매칭)별 마지막 랜드마크 보관: 박스와 얼굴 영역 픽셀이 거의 그대로면 재사용
+
+    기준 박스/패치는 마지막으로 실제 예측한 시점의 값이므로, 조금씩 움직여도 누적되면 다시 예측한다.
+    predict 는 예측이 필요한 얼굴만 모아 호출하는 코루틴 함수 predict(frame, boxes, client_id)
+    (박스 순서대로 랜드마크 목록 반환).
+    """
+
+    def __init__(self, predict, client_id=None):
+        self.predict = predict
+        self.client_id = client_id
+        # 최근 사용 순서 (앞쪽이 오래된 얼굴)
+        self._tracks = []
+        self.hits = 0
+        self.misses = 0
+
+    def _match(self, box):
+        best, best_iou = None, TRACK_MATCH_IOU
+        for track in self._tracks:
+            iou = _box_iou(track['box'], box)
+            if iou >= best_iou:
+                best, best_iou = track, iou
+        return best, (best_iou if best is not None else 0.0)
+
+    def _reusable(self, track, iou, patch):
+        return (
+            track is not None
+            and track['landmarks'] is not None
+            and iou >= BOX_STABLE_IOU
+            and patch is not None
+            and track['patch'] is not None
+            and np.abs(patch - track['patch']).mean() < PATCH_DIFF_THRESHOLD
+        )
+
+    async def get_many(self, frame, boxes):
+        """박스 (x, y, w, h) 목록의 랜드마크: 변화 없는 얼굴은 캐시, 나머지는 한 번의 배치 예측"""
+        boxes = [tuple(int(v) for v in box) for box in boxes]
+        results = [None] * len(boxes)
+        misses = []
+        for i, box in enumerate(boxes):
+            patch = _face_patch(frame, box)
+            track, iou = self._match(box)
+            if self._reusable(track, iou, patch):
+                self.hits += 1
+                self._touch(track)
+                results[i] = track['landmarks']
+            else:
+                misses.append((i, box, patch, track))
+
+        if misses:
+            self.misses += len(misses)
+            predicted = await self.predict(frame, [box for _, box, _, _ in misses], self.client_id)
+            for (i, box, patch, track), landmarks in zip(misses, predicted):
+                if track is None:
+                    track = {}
+                    self._tracks.append(track)
+                track.update(box=box, patch=patch, landmarks=landmarks)
+                self._touch(track)
+                results[i] = landmarks
+        return results
+
+    def _touch(self, track):
+        self._tracks.remove(track)
+        self._tracks.append(track)
+        del self._tracks[:-MAX_TRACKS]
@@ -0,0 +1,165 @@
+##loop_monitor.py
+
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import deque
+from src.config import LOOP_LAG_INTERVAL, LOOP_BLOCK_THRESHOLD, LOOP_BLOCK_DUMP_INTERVAL
+from src.metrics import Histogram, Counter, register_collector
+
+# 최근 지연 표본 수 (백분위 계산용)
+LAG_SAMPLES = 1024
+# 보관할 최근 블로킹 기록 수
+RECENT_BLOCKS = 8
+# 스택 덤프에 포함할 최대 프레임 수 (가장 안쪽 기준)
+STACK_LIMIT = 25
+
+LOOP_LAG = Histogram(
+    'spotlight_event_loop_lag_seconds',
+    '이벤트 루프 스케줄링 지연 (예약 시각 대비 실제 실행 시각, 초)',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_BLOCKS = Counter(
+    'spotlight_event_loop_blocks_total',
+    '임계 시간 이상 이벤트 루프를 점유한 콜백 수',
+)
+
+
+class LoopMonitor:
+    """이벤트 루프 지연 측정 + 블로킹 감시
+
+    - probe 태스크: interval 마다 깨어나 예약 시각 대비 늦은 시간(lag)을 기록
+    - watchdog 스레드: probe 의 heartbeat 가 threshold 이상 멈추면 루프가 막힌 것으로 보고
+      그 순간 루프 스레드의 스택(막고 있는 코루틴/함수)과 실행 중인 태스크 이름을 출력
+    """
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL, threshold=LOOP_BLOCK_THRESHOLD,
+                 dump_interval=LOOP_BLOCK_DUMP_INTERVAL):
+        self.interval = interval
+        self.threshold = threshold
+        self.dump_interval = dump_interval
+        self.samples = deque(maxlen=LAG_SAMPLES)
+        self.max_lag = 0.0
+        self.blocks = 0
+        self.recent_blocks = deque(maxlen=RECENT_BLOCKS)
+        self._loop = None
+        self._loop_thread_id = None
+        self._probe_task = None
+        self._watchdog = None
+        self._stopping = threading.Event()
+        self._heartbeat = time.monotonic()
+        # 이미 보고한 정지 구간 (같은 정지를 여러 번 보고하지 않도록 heartbeat 값으로 구분)
+        self._reported_heartbeat = None
+        self._last_dump_at = 0.0
+
+    def start(self):
+        """실행 중인 이벤트 루프에서 호출 (startup 이벤트)"""
+        if self._probe_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._probe_task = asyncio.create_task(self._probe(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+
+    async def _probe(self):
+        while True:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - scheduled - self.interval)
+            self._heartbeat = now
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+            if lag >= self.threshold and self._reported_heartbeat is not None:
+                # watchdog 이 보고한 정지 구간이 끝남: 전체 길이 기록
+                self._reported_heartbeat = None
+                if self.recent_blocks:
+                    self.recent_blocks[-1]['duration_ms'] = round(lag * 1000, 1)
+                print(f"⚠️ [LoopMonitor] 이벤트 루프 정지 해제: {lag * 1000:.0f}ms 동안 막혀 있었습니다.")
+
+    def _watch(self):
+        # 임계 시간의 절반 간격으로 heartbeat 확인
+        check_every = max(0.01, self.threshold / 2)
+        while not self._stopping.wait(check_every):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or self._reported_heartbeat == heartbeat:
+                continue
+            self._reported_heartbeat = heartbeat
+            self.blocks += 1
+            LOOP_BLOCKS.inc()
+            self._report_block(stalled)
+
+    def _report_block(self, stalled):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=STACK_LIMIT) if frame is not None else []
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        task_name = task.get_name() if task is not None else None
+        self.recent_blocks.append({
+            'at': time.time(),
+            'stalled_ms': round(stalled * 1000, 1),
+            'duration_ms': None,
+            'task': task_name,
+            'stack': stack,
+        })
+
+        now = time.monotonic()
+        if now - self._last_dump_at < self.dump_interval:
+            return # 로그 폭주 방지: 최근 기록에는 남기고 출력은 생략
+        self._last_dump_at = now
+        print(
+            f"⚠️ [LoopMonitor] 이벤트 루프가 {stalled * 1000:.0f}ms 이상 막혀 있습니다 "
+            f"(태스크: {task_name or '-'}). 루프 스레드 스택:\n" + ''.join(stack)
+        )
+
+    def percentiles(self):
+        """최근 지연 백분위 (ms)"""
+        samples = sorted(self.samples)
+
+        def percentile(p):
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+        return {
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': self.max_lag * 1000,
+        }
+
+    def report(self):
+        return {
+            'interval_ms': self.interval * 1000,
+            'threshold_ms': self.threshold * 1000,
+            'lag': self.percentiles(),
+            'blocks': self.blocks,
+            'recent_blocks': [
+                {key: value for key, value in block.items() if key != 'stack'}
+                for block in self.recent_blocks
+            ],
+        }
+
+    def gauges(self):
+        lag = self.percentiles()
+        return [
+            ('spotlight_event_loop_lag_recent_ms', '최근 이벤트 루프 지연 백분위 (ms)',
+             [({'quantile': name[:-3]}, value) for name, value in lag.items()]),
+        ]
+
+
+loop_monitor = LoopMonitor()
+register_collector(loop_monitor.gauges)
@@ -0,0 +1,132 @@
+##memory_snapshots.py
+
+import os
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from src.config import TRACEMALLOC_MAX_SECONDS
+
+# 보관할 최대 스냅샷 수 (오래된 것부터 삭제)
+MAX_SNAPSHOTS = 4
+# 추적 대상에서 제외할 파일 (tracemalloc 자체, import 과정)
+_EXCLUDE = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _module_name(filename):
+    """파일 경로 -> 모듈 이름 (sys.path 기준, 찾지 못하면 파일 이름)"""
+    best = ''
+    for entry in sys.path:
+        if entry and filename.startswith(entry + os.sep) and len(entry) > len(best):
+            best = entry
+    relative = filename[len(best) + 1:] if best else os.path.basename(filename)
+    module = os.path.splitext(relative)[0].replace(os.sep, '.')
+    return module[:-len('.__init__')] if module.endswith('.__init__') else module
+
+
+def _group_by_module(statistics, diff=False):
+    grouped = {}
+    for stat in statistics:
+        module = _module_name(stat.traceback[0].filename)
+        entry = grouped.setdefault(module, {'module': module, 'size': 0, 'count': 0})
+        entry['size'] += stat.size
+        entry['count'] += stat.count
+        if diff:
+            entry.setdefault('size_diff', 0)
+            entry.setdefault('count_diff', 0)
+            entry['size_diff'] += stat.size_diff
+            entry['count_diff'] += stat.count_diff
+    key = (lambda e: abs(e['size_diff'])) if diff else (lambda e: e['size'])
+    return sorted(grouped.values(), key=key, reverse=True)
+
+
+class MemorySnapshots:
+    """tracemalloc 시작/중지와 스냅샷 보관·비교 (모듈 단위로 묶어 보고)
+
+    추적 중에는 할당마다 비용이 들므로 TRACEMALLOC_MAX_SECONDS 뒤 자동으로 중지된다.
+    """
+
+    def __init__(self):
+        self.snapshots = OrderedDict()
+        self._next_id = 1
+        self.started_at = None
+        self._auto_stop = None
+
+    def start(self, loop, frames=1):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self.started_at = time.time()
+        if self._auto_stop is not None:
+            self._auto_stop.cancel()
+        self._auto_stop = loop.call_later(TRACEMALLOC_MAX_SECONDS, self._expire)
+        return self.status()
+
+    def _expire(self):
+        print(f"[memory] tracemalloc 자동 중지 ({TRACEMALLOC_MAX_SECONDS:.0f}초 경과)")
+        self.stop()
+
+    def stop(self):
+        if self._auto_stop is not None:
+            self._auto_stop.cancel()
+            self._auto_stop = None
+        tracemalloc.stop()
+        self.snapshots.clear()
+        self.started_at = None
+        return self.status()
+
+    def status(self):
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            'tracing': tracing,
+            'started_at': self.started_at,
+            'traced_bytes': current,
+            'peak_bytes': peak,
+            'overhead_bytes': tracemalloc.get_tracemalloc_memory() if tracing else 0,
+            'snapshots': list(self.snapshots.keys()),
+        }
+
+    def take(self, top=30):
+        """스냅샷 저장 후 모듈별 상위 할당 반환 (동기 함수 - 스레드에서 실행)"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc 이 실행 중이 아닙니다.")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_EXCLUDE)
+        snapshot_id = self._next_id
+        self._next_id += 1
+        self.snapshots[snapshot_id] = snapshot
+        while len(self.snapshots) > MAX_SNAPSHOTS:
+            self.snapshots.popitem(last=False)
+
+        modules = _group_by_module(snapshot.statistics('filename'))
+        return {
+            'id': snapshot_id,
+            'total_bytes': sum(m['size'] for m in modules),
+            'modules': modules[:top],
+        }
+
+    def diff(self, base_id=None, target_id=None, top=30):
+        """두 스냅샷의 모듈별 증감 (기본: 가장 오래된 것 -> 가장 최근 것, 동기 함수 - 스레드에서 실행)"""
+        if len(self.snapshots) < 2 and (base_id is None or target_id is None):
+            raise ValueError("비교하려면 스냅샷이 2개 이상 필요합니다.")
+        ids = list(self.snapshots.keys())
+        base_id = ids[0] if base_id is None else base_id
+        target_id = ids[-1] if target_id is None else target_id
+        if base_id not in self.snapshots or target_id not in self.snapshots:
+            raise KeyError(f"스냅샷을 찾을 수 없습니다: {base_id}, {target_id}")
+
+        statistics = self.snapshots[target_id].compare_to(self.snapshots[base_id], 'filename')
+        modules = _group_by_module(statistics, diff=True)
+        return {
+            'base': base_id,
+            'target': target_id,
+            'size_diff': sum(m['size_diff'] for m in modules),
+            'modules': modules[:top],
+        }
+
+
+memory_snapshots = MemorySnapshots()
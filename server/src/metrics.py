@@ -0,0 +1,228 @@
+##metrics.py
+
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from src.config import METRICS_ENABLED
+
+# 지연 시간 히스토그램 버킷 (초) - 프레임 디코딩(ms 미만)부터 애니메이션 전체(수십 초)까지
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# 레이블로 허용하는 모드 (클라이언트가 보낸 임의 문자열로 시계열이 늘어나지 않도록 제한)
+MODE_LABELS = ('slot', 'roulette', 'race', 'curtain', 'scanner', 'handpick')
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 현재 태스크가 처리 중인 모드 (수신 루프/애니메이션 태스크에서 설정)
+# 추론 스케줄러, 웹소켓 전송 등 하위 호출은 이 값을 모드 레이블로 사용한다.
+current_mode = contextvars.ContextVar('spotlight_current_mode', default=None)
+
+
+def mode_label(mode=None):
+    """모드 레이블 정규화 (지정하지 않으면 현재 태스크의 모드)"""
+    if mode is None:
+        mode = current_mode.get()
+    if mode is None:
+        return 'none'
+    return mode if mode in MODE_LABELS else 'other'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """레이블별 누적 카운터"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """레이블별 고정 버킷 히스토그램 (기록은 버킷 카운트 증가만, 누적 합산은 수집 시점에 계산)"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [버킷별 카운트(+Inf 포함), 합계, 개수]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        if not METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (bucket_counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                label_text = _format_labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f'{self.name}_bucket{label_text} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {repr(float(total))}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+# --- 지표 정의 ---
+STAGE_SECONDS = Histogram(
+    'spotlight_stage_seconds',
+    '처리 단계별 소요 시간 (초)',
+    ('mode', 'stage'),
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    'spotlight_queue_wait_seconds',
+    '추론 대기열 대기 시간 (초, workload: 작업 종류 / priority: interactive, refresh, speculative)',
+    ('workload', 'priority'),
+)
+FRAMES = Counter(
+    'spotlight_frames_total',
+    '수신 프레임 수 (result: received, dropped, decode_error)',
+    ('mode', 'result'),
+)
+DETECTIONS = Counter(
+    'spotlight_detections_total',
+    '얼굴 감지 호출 수 (source: yolo, scene_reuse)',
+    ('mode', 'source'),
+)
+FACES_DETECTED = Counter(
+    'spotlight_faces_detected_total',
+    '감지된 얼굴 수 합계',
+    ('mode',),
+)
+ERRORS = Counter(
+    'spotlight_errors_total',
+    '단계별 오류 수',
+    ('mode', 'kind'),
+)
+ANIMATIONS = Counter(
+    'spotlight_animations_total',
+    '애니메이션 실행 결과 (result: completed, cancelled, no_faces, error)',
+    ('mode', 'result'),
+)
+
+MESSAGES = Counter(
+    'spotlight_ws_messages_total',
+    '웹소켓 메시지 수 (direction: in, out / type: 메시지 type)',
+    ('direction', 'mode', 'type'),
+)
+MESSAGE_BYTES = Counter(
+    'spotlight_ws_bytes_total',
+    '웹소켓 메시지 바이트 수 (직렬화된 JSON 기준)',
+    ('direction', 'mode', 'type'),
+)
+
+_METRICS = [STAGE_SECONDS, QUEUE_WAIT_SECONDS, FRAMES, DETECTIONS, FACES_DETECTED, ERRORS, ANIMATIONS, MESSAGES, MESSAGE_BYTES]
+
+# 수집 시점에 값을 읽는 게이지 공급자 목록: () -> [(name, documentation, [(labels dict, value)])]
+_collectors = []
+
+
+def observe_stage(stage, seconds, mode=None):
+    """단계 소요 시간 기록"""
+    STAGE_SECONDS.observe(seconds, mode_label(mode), stage)
+
+
+@contextmanager
+def timed(stage, mode=None):
+    """with timed('imdecode'): ... 블록 소요 시간을 단계 히스토그램에 기록"""
+    if not METRICS_ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started, mode)
+
+
+def observe_queue_wait(workload, priority, seconds):
+    """추론 대기열 대기 시간 기록 (우선순위 등급별)"""
+    QUEUE_WAIT_SECONDS.observe(seconds, workload, priority)
+
+
+def count_error(kind, mode=None):
+    ERRORS.inc(mode_label(mode), kind)
+
+
+def register_collector(collector):
+    """수집(/metrics 요청) 시점에 호출될 게이지 공급자 등록"""
+    _collectors.append(collector)
+
+
+def render_prometheus():
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로 반환"""
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        try:
+            gauges = collector()
+        except Exception as e:
+            print(f"[metrics] 게이지 수집 오류: {e}")
+            continue
+        for name, documentation, samples in gauges:
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} gauge')
+            for labels, value in samples:
+                label_text = _format_labels(labels.keys(), labels.values())
+                lines.append(f'{name}{label_text} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,61 @@
+##model_pool.py
+
+import queue
+import threading
+from contextlib import contextmanager
+
+
+class ModelPool:
+    """모델 복제본 풀: 한 복제본은 동시에 한 스레드만 사용 (check-out / check-in)
+
+    ultralytics predictor 는 동시 호출을 고려하지 않으므로, 추론 스레드마다
+    복제본을 하나씩 빌려 쓰고 반납한다. 빈 복제본이 없으면 반납될 때까지 대기.
+    """
+
+    def __init__(self, factory, size):
+        self.size = max(1, size)
+        # LIFO: 최근 사용한(캐시가 따뜻한) 복제본을 먼저 재사용
+        self._replicas = queue.LifoQueue()
+        for _ in range(self.size):
+            self._replicas.put(factory())
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        # 빈 복제본이 없어 대기한 횟수 (풀 크기 부족 지표)
+        self.waits = 0
+
+    def checkout(self, timeout=None):
+        """복제본 하나를 빌림 (timeout 초 안에 못 빌리면 queue.Empty)"""
+        try:
+            model = self._replicas.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.waits += 1
+            model = self._replicas.get(timeout=timeout)
+        with self._lock:
+            self.checkouts += 1
+        return model
+
+    def checkin(self, model):
+        """빌린 복제본 반납"""
+        self._replicas.put(model)
+
+    @contextmanager
+    def model(self, timeout=None):
+        """with pool.model() as model: ... 형태로 빌리고 자동 반납"""
+        model = self.checkout(timeout)
+        try:
+            yield model
+        finally:
+            self.checkin(model)
+
+    def available(self):
+        """현재 빌릴 수 있는 복제본 수"""
+        return self._replicas.qsize()
+
+    def report(self):
+        return {
+            'size': self.size,
+            'available': self.available(),
+            'checkouts': self.checkouts,
+            'waits': self.waits,
+        }
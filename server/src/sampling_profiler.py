@@ -0,0 +1,109 @@
+##sampling_profiler.py
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from src.config import BASE_DIR
+
+# 한 스택에서 기록할 최대 프레임 수 (가장 바깥 프레임부터 잘림)
+MAX_STACK_DEPTH = 64
+
+
+def _short_path(filename):
+    """프로젝트/라이브러리 경로 앞부분을 잘라 짧은 표시 이름으로"""
+    if filename.startswith(BASE_DIR):
+        return os.path.relpath(filename, BASE_DIR)
+    marker = 'site-packages' + os.sep
+    index = filename.rfind(marker)
+    if index >= 0:
+        return filename[index + len(marker):]
+    return os.path.basename(filename)
+
+
+def _frame_label(frame, with_lines):
+    code = frame.f_code
+    label = f"{code.co_name} ({_short_path(code.co_filename)}"
+    if with_lines:
+        label += f":{frame.f_lineno}"
+    # collapsed stack 형식에서 ';' 와 공백 뒤 숫자는 구분자이므로 치환
+    return (label + ")").replace(';', ',')
+
+
+class SamplingProfiler:
+    """프로세스 내 샘플링 프로파일러: 일정 간격으로 모든 스레드의 스택을 수집해 collapsed stack 으로 집계
+
+    별도 스레드에서 sys._current_frames() 만 읽으므로 대상 코드에는 계측이 들어가지 않는다.
+    비용은 (스레드 수 x 스택 깊이) / interval 에 비례하며, 한 번에 하나의 프로파일만 실행된다.
+    """
+
+    def __init__(self):
+        self._busy = threading.Lock()
+
+    def is_running(self):
+        return self._busy.locked()
+
+    def start(self, duration, interval, thread_ids=None, with_lines=False):
+        """프로파일 시작 후 Future 반환 (이미 실행 중이면 None)
+
+        결과: {'stacks': Counter(collapsed_stack -> 샘플 수), 'samples', 'elapsed', 'sampler_seconds'}
+        """
+        if not self._busy.acquire(blocking=False):
+            return None
+        future = Future()
+        thread = threading.Thread(
+            target=self._run, args=(future, duration, interval, thread_ids, with_lines),
+            name="sampling-profiler", daemon=True
+        )
+        thread.start()
+        return future
+
+    def _run(self, future, duration, interval, thread_ids, with_lines):
+        try:
+            future.set_result(self._sample(duration, interval, thread_ids, with_lines))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self._busy.release()
+
+    def _sample(self, duration, interval, thread_ids, with_lines):
+        own_id = threading.get_ident()
+        stacks = Counter()
+        samples = 0
+        sampler_seconds = 0.0
+        started = time.monotonic()
+        deadline = started + duration
+        while True:
+            tick = time.monotonic()
+            if tick >= deadline:
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (thread_ids is not None and thread_id not in thread_ids):
+                    continue
+                labels = []
+                while frame is not None and len(labels) < MAX_STACK_DEPTH:
+                    labels.append(_frame_label(frame, with_lines))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, f"thread-{thread_id}").replace(';', ','))
+                stacks[';'.join(reversed(labels))] += 1
+            samples += 1
+            spent = time.monotonic() - tick
+            sampler_seconds += spent
+            time.sleep(max(0.0, interval - spent))
+        return {
+            'stacks': stacks,
+            'samples': samples,
+            'elapsed': time.monotonic() - started,
+            'sampler_seconds': sampler_seconds,
+        }
+
+
+def render_collapsed(stacks):
+    """flamegraph.pl / speedscope 용 collapsed stack 텍스트 ("a;b;c 샘플수")"""
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,67 @@
+##scene_gate.py
+
+import time
+import cv2
+import numpy as np
+
+# 장면 변화 판단용 썸네일 크기 (가로, 세로) - 각 픽셀이 원본의 한 블록 평균에 해당
+THUMB_SIZE = (32, 18)
+# 블록 평균 밝기 차이의 전체 평균 임계값 (이보다 작으면 "변화 없음" 후보)
+MEAN_DIFF_THRESHOLD = 3.0
+# 단일 블록 최대 차이 임계값 (한 사람만 움직여도 변화로 판단하기 위함)
+MAX_BLOCK_DIFF_THRESHOLD = 20.0
+# 이전 감지 결과 최대 재사용 시간 (초) - 결과가 오래되지 않도록 제한
+MAX_REUSE_AGE = 1.5
+
+
+def scene_thumbnail(frame):
+    """프레임을 작은 그레이스케일 썸네일로 축소 (INTER_AREA = 블록 평균)"""
+    small = cv2.resize(frame, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small.astype(np.int16)
+
+
+class SceneChangeGate:
+    """시각적으로 거의 변하지 않은 프레임에 대해 이전 감지 결과를 재사용하는 게이트"""
+
+    def __init__(self, mean_threshold=MEAN_DIFF_THRESHOLD,
+                 max_block_threshold=MAX_BLOCK_DIFF_THRESHOLD,
+                 max_reuse_age=MAX_REUSE_AGE):
+        self.mean_threshold = mean_threshold
+        self.max_block_threshold = max_block_threshold
+        self.max_reuse_age = max_reuse_age
+        # 마지막으로 실제 감지를 수행한 프레임의 썸네일과 결과
+        self._thumb = None
+        self._faces = None
+        self._detected_at = 0.0
+        self._reuse_age = max_reuse_age
+        self.hits = 0
+        self.misses = 0
+
+    def is_unchanged(self, thumb):
+        """마지막 감지 프레임 대비 변화가 임계값 미만인지 여부"""
+        if self._thumb is None or self._thumb.shape != thumb.shape:
+            return False
+        diff = np.abs(thumb - self._thumb)
+        return diff.mean() < self.mean_threshold and diff.max() < self.max_block_threshold
+
+    def lookup(self, thumb, now=None):
+        """재사용 가능한 이전 감지 결과 반환 (없으면 None)"""
+        now = time.monotonic() if now is None else now
+        if (
+            self._faces is not None
+            and now - self._detected_at <= self._reuse_age
+            and self.is_unchanged(thumb)
+        ):
+            self.hits += 1
+            return self._faces.copy()
+        self.misses += 1
+        return None
+
+    def store(self, thumb, faces, now=None, reuse_age=None):
+        """실제 감지 결과를 기준 프레임으로 저장 (reuse_age 로 이 결과의 재사용 시간 지정 가능)"""
+        self._thumb = thumb
+        self._faces = faces.copy()
+        self._detected_at = time.monotonic() if now is None else now
+        self._reuse_age = self.max_reuse_age if reuse_age is None else reuse_age
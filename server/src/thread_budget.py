@@ -0,0 +1,162 @@
+##thread_budget.py
+
+import os
+import re
+import math
+import tempfile
+from src.config import WORKER_COUNT, PIN_WORKERS, YOLO_REPLICAS
+
+# 워커당 추론 스레드 최대 수
+MAX_INFERENCE_THREADS = 4
+
+
+def available_cpus():
+    """이 프로세스가 사용할 수 있는 CPU 번호 목록 (affinity 기준)"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+def cgroup_cpu_limit():
+    """cgroup CPU 할당량 (코어 단위, 제한이 없으면 None)"""
+    # cgroup v2: "<quota> <period>" 또는 "max <period>"
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()[:2]
+        if quota != 'max':
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    # cgroup v1
+    try:
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def configured_workers():
+    """gunicorn 워커 수 (SPOTLIGHT_WORKERS > WEB_CONCURRENCY > GUNICORN_CMD_ARGS)"""
+    if WORKER_COUNT > 0:
+        return WORKER_COUNT
+    web_concurrency = os.environ.get('WEB_CONCURRENCY')
+    if web_concurrency and web_concurrency.isdigit():
+        return max(1, int(web_concurrency))
+    match = re.search(r'(?:-w|--workers)[\s=]+(\d+)', os.environ.get('GUNICORN_CMD_ARGS', ''))
+    if match:
+        return max(1, int(match.group(1)))
+    return 1
+
+
+def _claim_worker_slot(workers):
+    """워커 번호(0..workers-1) 확보: 슬롯별 잠금 파일을 선점 (프로세스 종료 시 자동 해제)"""
+    try:
+        import fcntl
+    except ImportError:
+        # Windows 등 flock 미지원 환경에서는 번호 없이 실행 (CPU 고정 안 함)
+        return None
+    for index in range(workers):
+        path = os.path.join(tempfile.gettempdir(), f'spotlight-worker-{index}.lock')
+        fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            continue
+        # 잠금 유지를 위해 fd 는 닫지 않음
+        return index
+    return None
+
+
+class ThreadPlan:
+    """워커 하나의 스레드 예산"""
+
+    def __init__(self, workers, cores, cpus, worker_index=None, pin=False, replicas=0):
+        self.workers = workers
+        self.cores = cores
+        self.worker_index = worker_index
+        # 워커당 코어 수
+        self.worker_cores = max(1, cores // workers)
+        # 추론 스레드 수 (= 전용 executor 크기)
+        self.inference_threads = max(1, min(MAX_INFERENCE_THREADS, self.worker_cores))
+        # YOLO 모델 복제본 수 (기본: 추론 스레드마다 하나)
+        self.model_replicas = replicas or self.inference_threads
+        # 복제본 x torch intra-op 스레드 = 워커당 코어 수
+        self.intra_op_threads = max(1, self.worker_cores // self.model_replicas)
+        # OpenCV 내부 병렬화도 추론 스레드 안에서 돌기 때문에 같은 예산 사용
+        self.opencv_threads = self.intra_op_threads
+        # 기본 executor (to_thread / run_in_executor(None, ...)) 스레드 수
+        self.default_executor_threads = max(2, self.worker_cores)
+        # CPU 고정: 워커 번호에 해당하는 연속 구간
+        self.cpuset = None
+        if pin and worker_index is not None and len(cpus) >= workers:
+            per_worker = len(cpus) // workers
+            self.cpuset = cpus[worker_index * per_worker:(worker_index + 1) * per_worker]
+
+    def as_dict(self):
+        return {
+            'workers': self.workers,
+            'worker_index': self.worker_index,
+            'cores': self.cores,
+            'worker_cores': self.worker_cores,
+            'inference_threads': self.inference_threads,
+            'model_replicas': self.model_replicas,
+            'intra_op_threads': self.intra_op_threads,
+            'opencv_threads': self.opencv_threads,
+            'default_executor_threads': self.default_executor_threads,
+            'cpuset': self.cpuset,
+        }
+
+    def describe(self):
+        cpuset = ','.join(map(str, self.cpuset)) if self.cpuset else '고정 안 함'
+        index = '?' if self.worker_index is None else self.worker_index
+        return (
+            f"[ThreadBudget] 워커 {index}/{self.workers} (pid {os.getpid()}): "
+            f"코어 {self.cores}개 중 {self.worker_cores}개, "
+            f"추론 스레드 {self.inference_threads}, YOLO 복제본 {self.model_replicas} x torch {self.intra_op_threads}, "
+            f"OpenCV {self.opencv_threads}, 기본 executor {self.default_executor_threads}, CPU 고정: {cpuset}"
+        )
+
+
+def build_thread_plan():
+    """현재 환경(cgroup 할당량, affinity, 워커 수)에 맞는 스레드 예산 계산"""
+    cpus = available_cpus()
+    cores = len(cpus)
+    limit = cgroup_cpu_limit()
+    if limit is not None:
+        cores = max(1, min(cores, math.ceil(limit)))
+    workers = configured_workers()
+    worker_index = _claim_worker_slot(workers) if PIN_WORKERS else None
+    return ThreadPlan(workers, cores, cpus, worker_index=worker_index, pin=PIN_WORKERS, replicas=YOLO_REPLICAS)
+
+
+def apply_thread_plan(plan):
+    """CPU 고정, OpenCV / torch 스레드 수 적용 (모델 로드 전에 호출)"""
+    if plan.cpuset:
+        try:
+            os.sched_setaffinity(0, plan.cpuset)
+        except (AttributeError, OSError) as e:
+            print(f"⚠️ [ThreadBudget] CPU 고정 실패: {e}")
+
+    import cv2
+    cv2.setNumThreads(plan.opencv_threads)
+
+    import torch
+    torch.set_num_threads(plan.intra_op_threads)
+    try:
+        # 연산 간 병렬화는 복제본 병렬 실행으로 대신함
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # 이미 병렬 작업이 시작된 뒤에는 변경 불가
+        pass
+
+
+# 워커 프로세스마다 한 번 계산 (gunicorn 은 앱을 워커에서 import)
+THREAD_PLAN = build_thread_plan()
@@ -0,0 +1,272 @@
+##tracing.py
+
+import os
+import json
+import time
+import queue
+import random
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from src.config import TRACING_ENABLED, TRACE_SAMPLE_RATE, TRACE_DIR, TRACE_MAX_BYTES, TRACE_BACKUPS
+
+# 파일에 한 번에 기록할 이벤트 수 (작을수록 파일 쓰기가 잦아짐)
+TRACE_FLUSH_EVENTS = 256
+
+# 세션 안의 표시 구간(lane): 서로 겹칠 수 있는 구간은 다른 트랙(tid)에 기록
+TRACE_LANES = ('recv', 'animation', 'sleep', 'send', 'detection', 'landmarks', 'codec')
+
+
+def _now_us():
+    return time.monotonic() * 1_000_000
+
+
+class TraceWriter:
+    """Chrome trace event(JSON 배열) 파일 기록기 - 크기 기준으로 회전 (trace.json -> trace.json.1 ...)
+
+    열려 있는 파일은 닫는 ']' 가 없는 배열이며, Perfetto / chrome://tracing 은 이를 그대로 읽는다.
+    회전 시 이전 파일은 ']' 로 닫혀 완전한 JSON 이 된다.
+    호출 측(이벤트 루프)은 이벤트를 모아 대기열에 넘기기만 하고, 직렬화와 파일 쓰기는
+    전용 기록 스레드가 한다 (파일 쓰기가 측정 대상인 연결들의 지연을 늘리지 않도록).
+    """
+
+    def __init__(self, path, max_bytes=TRACE_MAX_BYTES, backups=TRACE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._pending = []
+        # 기록 스레드로 넘기는 작업: ('events', [...]) / ('flush', None) / ('stop', None)
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        # 아래 파일 상태는 기록 스레드만 사용
+        self._file = None
+        self._size = 0
+        self._first = True
+        # tid -> 트랙 이름 (새 파일마다 메타데이터로 다시 기록)
+        self._thread_names = {}
+        self._next_tid = 1
+
+    def allocate_tid(self, name):
+        with self._lock:
+            tid = self._next_tid
+            self._next_tid += 1
+            self._thread_names[tid] = name
+            self._pending.append(self._thread_name_event(tid, name))
+        return tid
+
+    def release_tid(self, tid):
+        with self._lock:
+            self._thread_names.pop(tid, None)
+
+    def add(self, event):
+        with self._lock:
+            self._pending.append(event)
+            if len(self._pending) < TRACE_FLUSH_EVENTS:
+                return
+            events, self._pending = self._pending, []
+        self._submit('events', events)
+
+    def flush(self):
+        """모아 둔 이벤트를 기록 스레드로 넘기고 파일 flush 요청 (기다리지 않음)"""
+        with self._lock:
+            events, self._pending = self._pending, []
+        if events:
+            self._submit('events', events)
+        if self._thread is not None:
+            self._queue.put(('flush', None))
+
+    def close(self):
+        """남은 이벤트를 기록하고 파일을 닫음 (종료 시에만 호출, 기록 스레드가 끝날 때까지 대기)"""
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(('stop', None))
+            self._thread.join()
+            self._thread = None
+
+    def _submit(self, kind, payload):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='trace-writer', daemon=True)
+                    self._thread.start()
+        self._queue.put((kind, payload))
+
+    def _run(self):
+        while True:
+            kind, payload = self._queue.get()
+            if kind == 'events':
+                self._write(payload)
+                continue
+            try:
+                if kind == 'flush':
+                    if self._file is not None:
+                        self._file.flush()
+                else:
+                    self._close_file()
+                    return
+            except OSError as e:
+                print(f"[tracing] 트레이스 파일 기록 오류: {e}")
+                if kind == 'stop':
+                    return
+
+    @staticmethod
+    def _thread_name_event(tid, name):
+        return {'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+
+    def _open_file(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write('[\n')
+        self._size = 2
+        self._first = True
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': f'spotlight worker {os.getpid()}'}}]
+        with self._lock:
+            thread_names = list(self._thread_names.items())
+        metadata += [self._thread_name_event(tid, name) for tid, name in thread_names]
+        self._write_lines(metadata)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.write('\n]\n')
+            self._file.close()
+            self._file = None
+
+    def _rotate(self):
+        self._close_file()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups > 0 and os.path.exists(self.path):
+            os.replace(self.path, f"{self.path}.1")
+
+    def _write_lines(self, events):
+        for event in events:
+            line = json.dumps(event, separators=(',', ':'), ensure_ascii=False)
+            if not self._first:
+                line = ',\n' + line
+            self._first = False
+            self._file.write(line)
+            self._size += len(line)
+
+    def _write(self, events):
+        try:
+            if self._file is None:
+                self._open_file()
+            self._write_lines(events)
+            if self._size >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            print(f"[tracing] 트레이스 파일 기록 오류: {e}")
+
+
+_writer = None
+
+
+def get_writer():
+    """워커 프로세스의 트레이스 기록기 (처음 사용할 때 생성)"""
+    global _writer
+    if _writer is None:
+        _writer = TraceWriter(os.path.join(TRACE_DIR, f"spotlight-trace-{os.getpid()}.json"))
+    return _writer
+
+
+class SessionTrace:
+    """웹소켓 세션(연결) 하나의 트레이스 상태
+
+    enabled 가 아니면 모든 기록 호출은 즉시 반환된다. 연결 시 샘플링 비율로 켜지거나,
+    클라이언트의 'set_tracing' 제어 메시지로 켜고 끌 수 있다 (TRACING_ENABLED 일 때만).
+    """
+
+    def __init__(self, client_id, enabled=None):
+        self.client_id = client_id
+        if enabled is None:
+            enabled = TRACING_ENABLED and TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+        self.enabled = enabled
+        self.mode = None
+        self._tids = {}
+
+    def set_enabled(self, enabled):
+        """세션 트레이스 켜기/끄기 (전역 설정이 꺼져 있으면 항상 꺼짐), 적용된 상태 반환"""
+        self.enabled = bool(enabled) and TRACING_ENABLED
+        if not self.enabled:
+            get_writer().flush()
+        return self.enabled
+
+    def _tid(self, lane):
+        tid = self._tids.get(lane)
+        if tid is None:
+            tid = self._tids[lane] = get_writer().allocate_tid(f"client {self.client_id} / {lane}")
+        return tid
+
+    def complete(self, name, lane, start_us, end_us, args=None):
+        """완료 구간(ph='X') 기록 - 시각은 time.monotonic 기준 µs"""
+        if not self.enabled:
+            return
+        event_args = {'client_id': self.client_id, 'mode': self.mode}
+        if args:
+            event_args.update(args)
+        get_writer().add({
+            'name': name,
+            'cat': lane,
+            'ph': 'X',
+            'ts': round(start_us, 1),
+            'dur': round(max(0.0, end_us - start_us), 1),
+            'pid': os.getpid(),
+            'tid': self._tid(lane),
+            'args': event_args,
+        })
+
+    def close(self):
+        if self._tids:
+            writer = get_writer()
+            for tid in self._tids.values():
+                writer.release_tid(tid)
+            writer.flush()
+            self._tids.clear()
+
+
+# 현재 태스크가 속한 세션 트레이스 (수신 루프에서 설정, 애니메이션 태스크/작업 스레드로 전파)
+current_trace = contextvars.ContextVar('spotlight_current_trace', default=None)
+
+
+def active_trace():
+    """현재 태스크의 세션 트레이스 (꺼져 있으면 None)"""
+    trace = current_trace.get()
+    return trace if trace is not None and trace.enabled else None
+
+
+@contextmanager
+def span(name, lane, **args):
+    """with span('detect', 'detection'): ... 블록을 현재 세션 트레이스에 기록 (꺼져 있으면 기록 없음)"""
+    trace = active_trace()
+    if trace is None:
+        yield
+        return
+    started = _now_us()
+    try:
+        yield
+    finally:
+        trace.complete(name, lane, started, _now_us(), args)
+
+
+def record_span(name, lane, started, ended, **args):
+    """이미 측정한 구간 기록 (started/ended: time.monotonic 초)"""
+    trace = active_trace()
+    if trace is not None:
+        trace.complete(name, lane, started * 1_000_000, ended * 1_000_000, args)
+
+
+async def sleep(seconds, name='sleep'):
+    """asyncio.sleep + 대기 구간 기록 (연출 대기를 트레이스에서 구분하기 위함)"""
+    trace = active_trace()
+    if trace is None:
+        await asyncio.sleep(seconds)
+        return
+    started = _now_us()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        trace.complete(name, 'sleep', started, _now_us(), {'seconds': seconds})
@@ -0,0 +1,470 @@
+"""서버 핫패스 마이크로벤치마크 + 기준선(baseline) 비교
+
+사용법 (server/ 에서, 네트워크/GPU 불필요):
+    python test/bench_hotpaths.py                        # 측정 후 기준선과 비교
+    python test/bench_hotpaths.py --save-baseline        # 측정 결과를 기준선으로 저장 (기존 항목은 덮어씀)
+    python test/bench_hotpaths.py --only 'race_*' 'codec_*'
+    python test/bench_hotpaths.py --max-regression 0.2 --threshold 'yolo_*=0.3'
+
+측정 항목:
+    codec_decode_{720p,1080p}          codec.decode_frame (Base64 JPEG -> BGR)
+    codec_decode_corpus                (--corpus) 코퍼스 프레임을 순서대로 디코딩
+    yolo_{single,coarse_to_fine}_{720p,1080p}  face_detection 감지 경로별 1회 예측
+    landmarks_{dlib,onnx}_x{1,8}       랜드마크 백엔드 predict_batch (얼굴 1명 / 8명 배치)
+    expression_{smile,...}             ExpressionDetector 표정 측정 함수 1회
+    race_tick_{6,12,50}                레이스 메인 루프 1스텝 (전송 제외)
+    race_update_json_{12,50}           race_update 메시지 직렬화 (MeteredWebSocket 과 같은 설정)
+
+각 항목은 라운드별 1회 호출 시간의 최솟값(min, --compare-on 으로 변경 가능)으로 기준선과 비교하며,
+(현재 / 기준선 - 1) 이 임계값을 넘으면 회귀로 보고 종료 코드 1.
+공유 CPU 에서는 다른 프로세스 때문에 느려진 라운드가 중앙값까지 끌어올리므로, 잡음이 더해지지 않은
+최솟값을 기본 비교 기준으로 쓴다 (기준선을 저장한 환경에서 연속 3회 실행해 통과하는지 확인할 것).
+모델 파일/패키지가 없어 실행할 수 없는 항목은 건너뛴다 (기준선에 있어도 실패로 보지 않음).
+기준선은 측정한 환경(CPU, 버전) 정보와 함께 저장되며, 환경이 다르면 경고만 출력한다.
+저장소의 test/baselines/hotpaths.json 은 추론 패키지(torch/ultralytics/dlib) 없이 이 스크립트로
+측정한 codec_*/race_* 항목뿐이다. 다른 항목은 모델이 있는 환경에서 --save-baseline 으로 추가할 것.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import importlib
+import types
+import platform
+import fnmatch
+import statistics
+from importlib import metadata
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+import cv2
+import numpy as np
+
+from frame_to_base64 import FrameCorpus
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'hotpaths.json')
+RESOLUTIONS = {'720p': (1280, 720), '1080p': (1920, 1080)}
+EXPRESSION_MEASURES = {
+    'smile': '_measure_smile',
+    'open_mouth': '_measure_mouth_openness',
+    'surprise': '_measure_surprise',
+    'ugly_face': '_measure_ugly_face',
+}
+
+
+# 측정 회차마다 레이스 전체 실행 최소 횟수/최소 시간 (첫 실행은 워밍업으로 버림, 실행별 스텝 시간 중앙값이 표본 1개)
+RACE_RUNS = 4
+RACE_MIN_SECONDS = 1.0
+# race_update 직렬화처럼 짧은 항목의 회차별 최소 라운드 수
+FAST_ITEM_ROUNDS = 40
+
+
+class SkipBenchmark(Exception):
+    """현재 환경에서 실행할 수 없는 항목 (모델 파일/패키지 없음)"""
+
+
+# --- 측정용 입력 ---
+
+def load_frame(image_path, width, height):
+    """측정용 프레임 (이미지가 있으면 크기만 맞춰 사용, 없으면 합성 장면)
+
+    무작위 잡음은 JPEG 크기/디코딩 비용이 실제 카메라 프레임과 크게 달라 쓰지 않는다.
+    """
+    if image_path and os.path.exists(image_path):
+        return cv2.resize(cv2.imread(image_path), (width, height), interpolation=cv2.INTER_AREA)
+    rng = np.random.default_rng(0)
+    xs = np.linspace(0, 255, width, dtype=np.float32)
+    ys = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.dstack([np.broadcast_to(xs, (height, width)), np.broadcast_to(ys, (height, width)),
+                       np.full((height, width), 128, np.float32)]).astype(np.uint8)
+    for _ in range(40):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        axes = (int(rng.integers(20, width // 8)), int(rng.integers(20, height // 6)))
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        cv2.ellipse(frame, center, axes, float(rng.integers(0, 180)), 0, 360, color, -1)
+    noise = rng.normal(0, 6, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def face_grid(width, height, count):
+    """프레임 안에 겹치지 않게 배치한 (x, y, w, h) 얼굴 박스 count 개"""
+    columns = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / columns))
+    side = int(min(width / columns, height / rows) * 0.6)
+    boxes = []
+    for idx in range(count):
+        row, column = divmod(idx, columns)
+        x = int((column + 0.2) * width / columns)
+        y = int((row + 0.2) * height / rows)
+        boxes.append((x, y, side, side))
+    return boxes
+
+
+def template_landmarks(scale=100.0):
+    """68점 랜드마크 (iBUG 배치를 따르는 단순한 정면 얼굴 형태)"""
+    points = []
+    # 턱선 0-16
+    for t in np.linspace(np.pi * 0.95, np.pi * 0.05, 17):
+        points.append((np.cos(t) * 0.9, 0.1 + np.sin(t) * 1.0))
+    # 눈썹 17-21, 22-26
+    for side in (-1, 1):
+        for x in np.linspace(0.75, 0.15, 5)[::side]:
+            points.append((side * x, -0.45 - 0.08 * np.sin(np.pi * (x - 0.15) / 0.6)))
+    # 콧대 27-30, 콧볼 31-35
+    points += [(0.0, -0.3 + 0.12 * i) for i in range(4)]
+    points += [(x, 0.22) for x in np.linspace(-0.18, 0.18, 5)]
+    # 눈 36-41, 42-47
+    for cx in (-0.4, 0.4):
+        for t in np.linspace(np.pi, -np.pi, 6, endpoint=False):
+            points.append((cx + 0.15 * np.cos(t), -0.25 + 0.06 * np.sin(t)))
+    # 입 바깥 48-59, 안쪽 60-67
+    for t in np.linspace(np.pi, -np.pi, 12, endpoint=False):
+        points.append((0.35 * np.cos(t), 0.5 + 0.15 * np.sin(t)))
+    for t in np.linspace(np.pi, -np.pi, 8, endpoint=False):
+        points.append((0.25 * np.cos(t), 0.5 + 0.06 * np.sin(t)))
+    return (np.array(points, dtype=np.float64) * scale + 2 * scale).astype(np.int32)
+
+
+def encode_base64_jpeg(frame, quality):
+    import base64
+    return base64.b64encode(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1]).decode('ascii')
+
+
+# --- 측정 ---
+
+def time_calls(func, rounds, min_round_seconds):
+    """func 1회 호출 시간 목록 (라운드별 평균, 라운드당 min_round_seconds 이상 반복)"""
+    func()
+    started = time.perf_counter()
+    func()
+    single = max(time.perf_counter() - started, 1e-7)
+    number = max(1, int(min_round_seconds / single))
+
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'median_us': round(statistics.median(ordered) * 1e6, 3),
+        'p90_us': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))] * 1e6, 3),
+        'min_us': round(ordered[0] * 1e6, 3),
+        'samples': len(ordered),
+    }
+
+
+def bench_codec(args):
+    from src.codec import decode_frame
+
+    for label, (width, height) in RESOLUTIONS.items():
+        data = encode_base64_jpeg(load_frame(args.image, width, height), args.jpeg_quality)
+        yield f'codec_decode_{label}', lambda data=data: decode_frame(data)
+
+    if args.corpus:
+        # 실제 카메라 프레임 순서대로 디코딩 (코퍼스 앞부분, Base64 변환은 측정 밖에서)
+        # 기존 항목의 입력은 그대로 두어 기준선 비교가 유지되도록 별도 항목으로 추가
+        corpus = FrameCorpus(args.corpus)
+        frames = [corpus.base64(i) for i in range(min(len(corpus), 64))]
+        cursor = iter(range(sys.maxsize))
+        yield 'codec_decode_corpus', lambda: decode_frame(frames[next(cursor) % len(frames)])
+
+
+def bench_yolo(args):
+    try:
+        from src import face_detection
+    except ImportError as e:
+        raise SkipBenchmark(f"face_detection 임포트 실패: {e}")
+    if not os.path.exists(face_detection.MODEL_PATH):
+        raise SkipBenchmark(f"모델 파일 없음: {face_detection.MODEL_PATH}")
+
+    for label, (width, height) in RESOLUTIONS.items():
+        frame = load_frame(args.image, width, height)
+        yield f'yolo_single_{label}', lambda frame=frame: face_detection._run_yolo_prediction(frame.copy())
+        yield f'yolo_coarse_to_fine_{label}', \
+            lambda frame=frame: face_detection._run_coarse_to_fine_prediction(frame.copy())
+
+
+def bench_landmarks(args):
+    try:
+        from src.landmarks import DlibLandmarkBackend, OnnxLandmarkBackend
+    except ImportError as e:
+        raise SkipBenchmark(f"landmarks 임포트 실패: {e}")
+
+    width, height = RESOLUTIONS['720p']
+    frame = load_frame(args.image, width, height)
+    for backend_cls in (DlibLandmarkBackend, OnnxLandmarkBackend):
+        try:
+            backend = backend_cls()
+        except Exception as e:
+            print(f"  - 랜드마크 백엔드 {backend_cls.name} 생성 실패: {e}")
+            continue
+        if not backend.available:
+            print(f"  - 랜드마크 백엔드 {backend_cls.name} 사용 불가, 건너뜀")
+            continue
+        for batch in (1, 8):
+            boxes = face_grid(width, height, batch)
+            yield f'landmarks_{backend_cls.name}_x{batch}', lambda b=backend, boxes=boxes: b.predict_batch(frame, boxes)
+
+
+def bench_expression(args):
+    try:
+        from src.animation.handpick import ExpressionDetector
+    except ImportError as e:
+        raise SkipBenchmark(f"handpick 임포트 실패: {e}")
+
+    detector = ExpressionDetector()
+    landmarks = template_landmarks()
+    for mode, method in EXPRESSION_MEASURES.items():
+        yield f'expression_{mode}', lambda measure=getattr(detector, method): measure(landmarks)
+
+
+class _RecordingSocket:
+    """race_update 전송 시각만 기록하는 웹소켓 대역 (직렬화/전송 비용 제외)"""
+
+    def __init__(self, keep_update=100):
+        self.update_times = []
+        self.kept_update = None
+        self._keep_update = keep_update
+
+    async def send_json(self, data, mode='text'):
+        if data.get('type') == 'race_update':
+            self.update_times.append(time.perf_counter())
+            if len(self.update_times) == self._keep_update:
+                # 진행 중인 레이스 상태 한 장면 보관 (직렬화 측정용)
+                self.kept_update = json.loads(json.dumps(data))
+
+
+async def _no_sleep(seconds, name=None):
+    return None
+
+
+def import_race():
+    """src.animation.race 만 임포트 (패키지 __init__ 은 모든 애니메이션 -> 감지 모델까지 불러오므로 건너뜀)
+
+    src.animation 이 아직 임포트되지 않았으면 __init__ 을 실행하지 않는 빈 패키지를 잠시 등록해
+    race 와 그 상대 임포트(capture_profile)만 불러온 뒤 제거한다.
+    """
+    if 'src.animation' in sys.modules:
+        return importlib.import_module('src.animation.race')
+    package = types.ModuleType('src.animation')
+    package.__path__ = [os.path.join(SERVER_DIR, 'src', 'animation')]
+    package.__package__ = 'src.animation'
+    sys.modules['src.animation'] = package
+    try:
+        return importlib.import_module('src.animation.race')
+    except ImportError as e:
+        raise SkipBenchmark(f"race 임포트 실패: {e}")
+    finally:
+        # 이후 정상적인 src.animation 임포트는 __init__ 을 그대로 실행 (불러온 하위 모듈은 재사용됨)
+        sys.modules.pop('src.animation', None)
+
+
+def run_race(racers, seed=0):
+    """racers 명으로 레이스 전체 실행 후 (스텝 간격 목록, 보관한 race_update) 반환
+
+    sleep 을 생략하므로 race_update 전송 간격 = 메인 루프 1스텝 계산 시간.
+    """
+    race = import_race()
+
+    random.seed(seed)
+    faces = np.array(face_grid(*RESOLUTIONS['1080p'], racers))
+    socket = _RecordingSocket()
+    original_sleep, original_max = race.sleep, race.MAX_RACERS
+    race.sleep, race.MAX_RACERS = _no_sleep, max(original_max, racers)
+    try:
+        asyncio.run(race.apply_race_effect(np.zeros((1080, 1920, 3), np.uint8), faces, socket))
+    finally:
+        race.sleep, race.MAX_RACERS = original_sleep, original_max
+    times = socket.update_times
+    return [b - a for a, b in zip(times, times[1:])], socket.kept_update
+
+
+def bench_race(args):
+    # 레이스 스텝은 같은 시드로 여러 번 실행해 실행별 스텝 시간 중앙값을 표본으로 사용
+    # (한 번의 실행은 수백 ms 라 그동안 CPU 를 뺏기면 스텝 전체가 함께 느려짐)
+    for racers in (6, 12, 50):
+        run_medians = []
+        started = time.perf_counter()
+        while len(run_medians) < RACE_RUNS or time.perf_counter() - started < RACE_MIN_SECONDS:
+            ticks, update = run_race(racers)
+            if not ticks:
+                raise SkipBenchmark("race_update 가 기록되지 않았습니다.")
+            run_medians.append(statistics.median(ticks))
+        run_medians = run_medians[1:]
+        yield f'race_tick_{racers}', run_medians
+        if racers >= 12 and update is not None:
+            yield f'race_update_json_{racers}', (
+                lambda update=update: json.dumps(update, separators=(',', ':'), ensure_ascii=False)
+            ), FAST_ITEM_ROUNDS
+
+
+BENCHMARKS = (bench_codec, bench_yolo, bench_landmarks, bench_expression, bench_race)
+
+
+def run_benchmarks(args):
+    """모든 항목을 args.passes 번 반복 측정해 항목별 표본을 합친 요약
+
+    공유 CPU 의 느린 구간은 수 초씩 이어지므로, 한 항목을 한 번에 몰아서 재지 않고
+    전체 항목을 여러 번 돌아 각 항목의 표본이 실행 시간 전체에 흩어지게 한다.
+    """
+    samples = {}
+    skipped = set()
+    for _ in range(args.passes):
+        for group in BENCHMARKS:
+            if group in skipped:
+                continue
+            try:
+                # (이름, 함수 또는 표본 목록[, 최소 라운드 수])
+                for name, target, *min_rounds in group(args):
+                    if args.only and not any(fnmatch.fnmatch(name, pattern) for pattern in args.only):
+                        continue
+                    if not isinstance(target, list):
+                        target = time_calls(target, max([args.rounds, *min_rounds]), args.min_round_seconds)
+                    samples.setdefault(name, []).extend(target)
+            except SkipBenchmark as e:
+                skipped.add(group)
+                print(f"  - {group.__name__} 건너뜀: {e}")
+
+    results = {}
+    for name, item_samples in samples.items():
+        result = results[name] = summarize(item_samples)
+        print(f"  {name:<28} min {result['min_us']:>12.1f}us  median {result['median_us']:>12.1f}us  "
+              f"p90 {result['p90_us']:>12.1f}us  (n={result['samples']})")
+    return results
+
+
+# --- 기준선 ---
+
+def environment():
+    info = {
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+    }
+    # 설치된 추론 패키지 버전 (임포트 없이 메타데이터로 확인)
+    for package in ('torch', 'ultralytics', 'dlib', 'onnxruntime'):
+        try:
+            info[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            pass
+    return info
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, previous):
+    merged = dict(previous['results']) if previous else {}
+    merged.update(results)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 임시 파일에 쓴 뒤 교체 (중간에 실패해도 기존 기준선 유지)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'environment': environment(),
+            'results': dict(sorted(merged.items())),
+        }, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(temp_path, path)
+    print(f"기준선 저장: {path} ({len(results)}개 항목 갱신)")
+
+
+def parse_thresholds(items):
+    """['yolo_*=0.3', ...] -> [('yolo_*', 0.3), ...]"""
+    thresholds = []
+    for item in items:
+        pattern, _, value = item.partition('=')
+        if not value:
+            raise argparse.ArgumentTypeError(f"임계값 형식은 이름패턴=비율 입니다: {item}")
+        thresholds.append((pattern, float(value)))
+    return thresholds
+
+
+def threshold_for(name, default, thresholds):
+    # 나중에 지정한 패턴이 우선
+    for pattern, value in reversed(thresholds):
+        if fnmatch.fnmatch(name, pattern):
+            return value
+    return default
+
+
+def compare(results, baseline, default_threshold, thresholds, stat='min_us'):
+    """기준선 대비 회귀 항목 이름 목록 (stat: 비교할 요약값)"""
+    if baseline['environment'] != environment():
+        print("⚠️ 기준선과 측정 환경이 다릅니다 (결과 비교는 참고용):")
+        for key, value in environment().items():
+            if baseline['environment'].get(key) != value:
+                print(f"    {key}: 기준선 {baseline['environment'].get(key)} / 현재 {value}")
+
+    regressions = []
+    print(f"\n기준선 비교 ({baseline.get('saved_at', '-')} 저장, {stat} 기준):")
+    for name, result in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            print(f"  {name:<28} 기준선 없음")
+            continue
+        change = result[stat] / reference[stat] - 1
+        limit = threshold_for(name, default_threshold, thresholds)
+        regressed = change > limit
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<28} {reference[stat]:>12.1f}us -> {result[stat]:>12.1f}us  "
+              f"{change * 100:+6.1f}% (허용 +{limit * 100:.0f}%){'  ❌ 회귀' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--image', default='test/test_face_image.jpg', help='측정 프레임으로 쓸 이미지 (없으면 합성 장면)')
+    parser.add_argument('--corpus', help='측정 프레임으로 쓸 프레임 코퍼스 (frame_to_base64.py build)')
+    parser.add_argument('--jpeg-quality', type=int, default=85, help='디코딩 측정용 JPEG 품질 (클라이언트 기본값)')
+    parser.add_argument('--rounds', type=int, default=15, help='측정 회차마다 항목별 라운드 수')
+    parser.add_argument('--passes', type=int, default=3, help='전체 항목 반복 측정 횟수 (표본은 합쳐서 요약)')
+    parser.add_argument('--min-round-seconds', type=float, default=0.05)
+    parser.add_argument('--only', nargs='+', metavar='PATTERN', help='측정할 항목 이름 패턴 (fnmatch)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare-on', choices=('min_us', 'median_us'), default='min_us',
+                        help='기준선과 비교할 요약값 (기본: 라운드 최솟값)')
+    parser.add_argument('--max-regression', type=float, default=0.25, help='기본 허용 증가율 (0.25 = 25%%)')
+    parser.add_argument('--threshold', action='append', default=[], metavar='PATTERN=RATIO',
+                        help='항목별 허용 증가율 (여러 번 지정 가능)')
+    args = parser.parse_args()
+    thresholds = parse_thresholds(args.threshold)
+
+    print(f"코어 {os.cpu_count()}개, Python {platform.python_version()}, 라운드 {args.rounds} x {args.passes}회")
+    results = run_benchmarks(args)
+    baseline = load_baseline(args.baseline)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, baseline)
+        return
+    if baseline is None:
+        print(f"\n기준선 없음: {args.baseline} (--save-baseline 으로 생성)")
+        return
+    regressions = compare(results, baseline, args.max_regression, thresholds, args.compare_on)
+    if regressions:
+        print(f"\n회귀 {len(regressions)}건: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
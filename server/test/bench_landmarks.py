@@ -0,0 +1,115 @@
+"""랜드마크 백엔드 일치도(parity) 검사 + 처리량 측정
+
+사용법 (server/ 에서):
+    python test/bench_landmarks.py --image test/test_face_image.jpg
+    python test/bench_landmarks.py --image class.jpg --batch-sizes 1 4 8 16 --max-nme 0.08
+
+1. 이미지에서 YOLO 로 얼굴을 찾고, dlib 과 ONNX 백엔드의 68점 결과를 비교한다.
+   - NME: 점 사이 평균 거리 / 눈 사이 거리 (dlib 기준)
+   - 표정 점수 차이: ExpressionDetector 모드별 점수 (handpick 이 실제로 쓰는 값)
+   NME 평균이 --max-nme 를 넘으면 종료 코드 1.
+2. 백엔드별로 배치 크기마다 초당 처리 얼굴 수를 출력한다.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from src.landmarks import DlibLandmarkBackend, OnnxLandmarkBackend
+from src.face_detection import _run_yolo_prediction
+from src.animation.handpick import ExpressionDetector
+
+EXPRESSION_MODES = ('smile', 'open_mouth', 'surprise', 'ugly_face')
+
+
+def inter_ocular(points):
+    left = points[36:42].mean(axis=0)
+    right = points[42:48].mean(axis=0)
+    return float(np.linalg.norm(left - right))
+
+
+def check_parity(frame, boxes, reference, candidate):
+    expression = ExpressionDetector()
+    ref_points = reference.predict_batch(frame, boxes)
+    cand_points = candidate.predict_batch(frame, boxes)
+
+    nmes = []
+    score_diffs = {mode: [] for mode in EXPRESSION_MODES}
+    for idx, (ref, cand) in enumerate(zip(ref_points, cand_points)):
+        if ref is None or cand is None:
+            print(f"  얼굴 #{idx}: 랜드마크 없음 (reference={ref is not None}, candidate={cand is not None})")
+            continue
+        iod = inter_ocular(ref)
+        if iod <= 0:
+            continue
+        nme = float(np.linalg.norm(ref - cand, axis=1).mean()) / iod
+        nmes.append(nme)
+        for mode in EXPRESSION_MODES:
+            diff = abs(expression.get_expression_score(idx, ref, mode) - expression.get_expression_score(idx, cand, mode))
+            score_diffs[mode].append(diff)
+        print(f"  얼굴 #{idx}: NME {nme:.4f}")
+
+    if nmes:
+        print(f"NME 평균 {np.mean(nmes):.4f}, 최대 {np.max(nmes):.4f} ({len(nmes)}명)")
+        for mode, diffs in score_diffs.items():
+            print(f"  표정 점수 차이 [{mode}]: 평균 {np.mean(diffs):.3f}, 최대 {np.max(diffs):.3f}")
+    return nmes
+
+
+def benchmark(backend, frame, boxes, batch_sizes, iterations):
+    for batch_size in batch_sizes:
+        batch = [boxes[i % len(boxes)] for i in range(batch_size)]
+        backend.predict_batch(frame, batch)  # 워밍업
+        started = time.perf_counter()
+        for _ in range(iterations):
+            backend.predict_batch(frame, batch)
+        elapsed = time.perf_counter() - started
+        print(f"  [{backend.name}] 배치 {batch_size:>2}: {batch_size * iterations / elapsed:8.1f} 얼굴/s "
+              f"({elapsed / iterations * 1000:.2f} ms/배치)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--image', default='test/test_face_image.jpg')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--max-nme', type=float, default=0.08)
+    args = parser.parse_args()
+
+    frame = cv2.imread(args.image)
+    if frame is None:
+        print(f"오류: 이미지 파일 '{args.image}'를 찾을 수 없습니다.")
+        return 2
+
+    boxes = [tuple(int(v) for v in face) for face in _run_yolo_prediction(frame)]
+    if not boxes:
+        print("오류: 이미지에서 얼굴을 찾지 못했습니다.")
+        return 2
+    print(f"얼굴 {len(boxes)}명 감지")
+
+    backends = [backend for backend in (DlibLandmarkBackend(), OnnxLandmarkBackend()) if backend.available]
+    print(f"사용 가능한 백엔드: {[backend.name for backend in backends]}")
+
+    status = 0
+    if len(backends) == 2:
+        print("\n[일치도] dlib (기준) vs onnx")
+        nmes = check_parity(frame, boxes, backends[0], backends[1])
+        if not nmes or np.mean(nmes) > args.max_nme:
+            print(f"❌ NME 평균이 기준 {args.max_nme} 을 넘었습니다.")
+            status = 1
+    else:
+        print("일치도 검사를 건너뜀 (두 백엔드가 모두 필요)")
+
+    print("\n[처리량]")
+    for backend in backends:
+        benchmark(backend, frame, boxes, args.batch_sizes, args.iterations)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
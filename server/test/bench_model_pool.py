@@ -0,0 +1,85 @@
+"""YOLO 모델 풀 크기별 얼굴 감지 처리량 측정
+
+사용법 (server/ 에서):
+    python test/bench_model_pool.py --image test/test_face_image.jpg --sizes 1 2 4 --requests 64
+
+풀 크기마다 복제본 수만큼의 스레드로 같은 프레임을 반복 감지하고,
+복제본 x torch 스레드 = 코어 수 조건에서 초당 처리량을 출력한다.
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# 기본 풀은 1개만 로드 (측정용 풀은 아래에서 크기별로 생성)
+os.environ.setdefault('SPOTLIGHT_YOLO_REPLICAS', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+import torch
+from ultralytics import YOLO
+
+from src import face_detection
+from src.model_pool import ModelPool
+
+
+def load_frame(image_path, width, height):
+    """측정용 프레임 (이미지가 없으면 같은 크기의 무작위 프레임)"""
+    if image_path and os.path.exists(image_path):
+        return cv2.imread(image_path)
+    print(f"이미지 '{image_path}' 없음 - {width}x{height} 무작위 프레임 사용")
+    return np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def run(pool_size, frame, requests, warmup):
+    cores = os.cpu_count() or 1
+    torch.set_num_threads(max(1, cores // pool_size))
+
+    # _run_yolo_prediction 이 측정 대상 풀을 사용하도록 교체
+    face_detection.face_model_pool = ModelPool(lambda: YOLO(face_detection.MODEL_PATH), pool_size)
+
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        list(executor.map(face_detection._run_yolo_prediction, [frame.copy() for _ in range(warmup)]))
+
+        started = time.perf_counter()
+        list(executor.map(face_detection._run_yolo_prediction, [frame.copy() for _ in range(requests)]))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'pool_size': pool_size,
+        'torch_threads': torch.get_num_threads(),
+        'requests': requests,
+        'elapsed': elapsed,
+        'throughput': requests / elapsed,
+        'waits': face_detection.face_model_pool.waits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--image', default='test/test_face_image.jpg')
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--requests', type=int, default=64)
+    parser.add_argument('--warmup', type=int, default=4)
+    args = parser.parse_args()
+
+    frame = load_frame(args.image, args.width, args.height)
+    print(f"프레임 {frame.shape[1]}x{frame.shape[0]}, 코어 {os.cpu_count()}개, 요청 {args.requests}건")
+
+    baseline = None
+    for size in args.sizes:
+        result = run(size, frame, args.requests, args.warmup)
+        baseline = baseline or result['throughput']
+        print(
+            f"풀 {result['pool_size']:>2} x torch 스레드 {result['torch_threads']:>2}: "
+            f"{result['throughput']:7.2f} req/s ({result['elapsed']:.2f}s, "
+            f"x{result['throughput'] / baseline:.2f}, 대기 {result['waits']}회)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""pytest 공통 설정 (server/test 에서 실행해도 src, api 패키지를 임포트할 수 있도록)"""
+import os
+import sys
+import types
+import importlib
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+
+@pytest.fixture
+def animation_module():
+    """src/animation 하위 모듈을 패키지 __init__ 없이 임포트하는 함수
+
+    src.animation 의 __init__ 은 모든 애니메이션 -> 감지 모델(ultralytics)까지 불러오므로,
+    아직 임포트되지 않았으면 빈 패키지를 잠시 등록해 필요한 모듈만 불러온다 (bench_hotpaths 와 같은 방식).
+    """
+
+    def load(name):
+        if 'src.animation' in sys.modules:
+            return importlib.import_module(f'src.animation.{name}')
+        package = types.ModuleType('src.animation')
+        package.__path__ = [os.path.join(SERVER_DIR, 'src', 'animation')]
+        package.__package__ = 'src.animation'
+        sys.modules['src.animation'] = package
+        try:
+            return importlib.import_module(f'src.animation.{name}')
+        finally:
+            sys.modules.pop('src.animation', None)
+
+    return load
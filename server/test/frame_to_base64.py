@@ -1,20 +1,304 @@
+"""프레임 준비 도구: 단일 이미지 Base64 변환 + 재생/벤치마크용 프레임 코퍼스
+
+사용법 (server/test/ 에서):
+    python frame_to_base64.py                                  # 기존 동작: test_face_image.jpg -> base64_output.txt (k6 스크립트용)
+    python frame_to_base64.py base64 class.jpg -o base64_output.txt
+    python frame_to_base64.py build class.mp4 corpus/class --every 3 --max-frames 3000 --decoded
+    python frame_to_base64.py build frames_dir/ corpus/frames --fps 10
+    python frame_to_base64.py info corpus/class
+
+코퍼스 디렉터리 구성:
+    frames.bin   JPEG 바이트를 이어 붙인 파일
+    frames.b64   같은 프레임의 Base64 텍스트를 이어 붙인 파일 (전송 시 다시 인코딩하지 않음)
+    index.npy    프레임별 (offset, length, b64_offset, b64_length, timestamp, width, height)
+    frames.npy   (--decoded) 디코딩된 BGR 프레임 (N, H, W, 3) uint8, 메모리 맵으로 읽음
+                 (모든 프레임 크기가 같아야 함)
+    meta.json    원본, 프레임 수, JPEG 품질 등
+
+FrameCorpus 로 읽으면 JPEG 바이트/Base64 텍스트/디코딩 프레임을 메모리 맵에서 바로 꺼낸다
+(replay_load.py --frames, bench_hotpaths.py --corpus 에서 사용).
+"""
+import os
+import sys
+import json
+import time
 import base64
+import binascii
+import argparse
+
+import cv2
+import numpy as np
+
+CORPUS_VERSION = 2
+INDEX_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('length', '<u4'),
+    ('b64_offset', '<u8'),
+    ('b64_length', '<u4'),
+    ('timestamp', '<f8'),   # 원본 기준 초 (동영상: 재생 위치, 이미지: 순번 / fps)
+    ('width', '<u2'),
+    ('height', '<u2'),
+])
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+JPEG_EXTENSIONS = ('.jpg', '.jpeg')
+
+
+# --- 기존 기능: 단일 이미지 -> Base64 텍스트 ---
+
+def image_to_base64(image_path, output_file):
+    try:
+        with open(image_path, "rb") as image_file:
+            encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+
+        with open(output_file, "w") as text_file:
+            text_file.write(encoded_string)
+
+        print(f"이미지 '{image_path}'가 Base64로 인코딩되어 '{output_file}'에 저장되었습니다.")
+
+    except FileNotFoundError:
+        print(f"오류: 이미지 파일 '{image_path}'를 찾을 수 없습니다.")
+    except Exception as e:
+        print(f"오류 발생: {e}")
+
+
+# --- 코퍼스 읽기 ---
+
+class FrameCorpus:
+    """프레임 코퍼스 읽기 (메모리 맵, 복사 없음)
+
+    corpus.jpeg(i)      JPEG 바이트 (memoryview, 파일 페이지를 그대로 참조)
+    corpus.base64(i)    클라이언트 전송 형식 Base64 문자열 (frames.b64 에서 잘라 냄)
+    corpus.decoded(i)   BGR 프레임 (frames.npy 가 있으면 메모리 맵 뷰, 없으면 디코딩)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != CORPUS_VERSION:
+            raise ValueError(f"지원하지 않는 코퍼스 형식: {path} ({self.meta.get('version')}) - build 로 다시 만들 것")
+        self.index = np.load(os.path.join(path, 'index.npy'))
+        self._data = np.memmap(os.path.join(path, 'frames.bin'), dtype=np.uint8, mode='r')
+        self._view = memoryview(self._data)
+        self._b64 = np.memmap(os.path.join(path, 'frames.b64'), dtype=np.uint8, mode='r')
+        self._b64_view = memoryview(self._b64)
+        decoded_path = os.path.join(path, 'frames.npy')
+        self._decoded = np.load(decoded_path, mmap_mode='r') if os.path.exists(decoded_path) else None
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def timestamps(self):
+        return self.index['timestamp']
+
+    @property
+    def has_decoded(self):
+        return self._decoded is not None
+
+    def jpeg(self, i):
+        entry = self.index[i]
+        offset = int(entry['offset'])
+        return self._view[offset:offset + int(entry['length'])]
+
+    def base64(self, i):
+        entry = self.index[i]
+        offset = int(entry['b64_offset'])
+        return str(self._b64_view[offset:offset + int(entry['b64_length'])], 'ascii')
+
+    def decoded(self, i):
+        """BGR 프레임 (메모리 맵 뷰는 읽기 전용 - 수정하려면 복사)"""
+        if self._decoded is not None:
+            return self._decoded[i]
+        return cv2.imdecode(np.frombuffer(self.jpeg(i), np.uint8), cv2.IMREAD_COLOR)
+
+    def base64_frames(self):
+        """인덱스로 접근하면 그때 Base64 문자열을 꺼내는 시퀀스 (전체를 메모리에 올리지 않음)"""
+        return _Base64Frames(self)
+
+
+class _Base64Frames:
+    def __init__(self, corpus):
+        self._corpus = corpus
+
+    def __len__(self):
+        return len(self._corpus)
+
+    def __getitem__(self, i):
+        return self._corpus.base64(i)
+
+
+def is_corpus(path):
+    return os.path.isfile(os.path.join(path, 'meta.json'))
+
+
+# --- 코퍼스 만들기 ---
+
+def _scaled(frame, max_dimension):
+    scale = min(1.0, max_dimension / max(frame.shape[:2])) if max_dimension else 1.0
+    if scale < 1.0:
+        frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return frame
+
+
+def iter_source(source, every, fps, max_frames, max_dimension):
+    """(timestamp, BGR 프레임 또는 None, 원본 JPEG 바이트 또는 None) 순회
+
+    크기 조정이 필요 없는 JPEG 이미지는 다시 인코딩하지 않도록 원본 바이트를 함께 넘긴다.
+    """
+    count = 0
+    if os.path.isdir(source):
+        names = sorted(name for name in os.listdir(source) if name.lower().endswith(IMAGE_EXTENSIONS))
+        for position, name in enumerate(names[::every]):
+            if count >= max_frames:
+                break
+            path = os.path.join(source, name)
+            with open(path, 'rb') as f:
+                raw = f.read()
+            frame = cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                print(f"  건너뜀 (읽기 실패): {name}")
+                continue
+            resized = _scaled(frame, max_dimension)
+            reusable = name.lower().endswith(JPEG_EXTENSIONS) and resized is frame
+            yield position * every / fps, resized, raw if reusable else None
+            count += 1
+        return
+
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise ValueError(f"동영상을 열 수 없습니다: {source}")
+    position = 0
+    try:
+        while count < max_frames:
+            ok = capture.grab()
+            if not ok:
+                break
+            if position % every == 0:
+                ok, frame = capture.retrieve()
+                if ok:
+                    yield capture.get(cv2.CAP_PROP_POS_MSEC) / 1000, _scaled(frame, max_dimension), None
+                    count += 1
+            position += 1
+    finally:
+        capture.release()
+
+
+def build_corpus(source, output, every=1, fps=10.0, max_frames=10000, max_dimension=1280, quality=80, decoded=False):
+    os.makedirs(output, exist_ok=True)
+    entries = []
+    frame_sizes = set()
+    offset = 0
+    b64_offset = 0
+    started = time.time()
+    reused = 0
+
+    # 디코딩 프레임 메모리 맵은 프레임 수를 알아야 만들 수 있으므로 먼저 JPEG/Base64 만 기록
+    with open(os.path.join(output, 'frames.bin'), 'wb') as data, \
+            open(os.path.join(output, 'frames.b64'), 'wb') as data_b64:
+        for timestamp, frame, raw in iter_source(source, every, fps, max_frames, max_dimension):
+            if raw is None:
+                raw = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+            else:
+                reused += 1
+            encoded = binascii.b2a_base64(raw, newline=False)
+            height, width = frame.shape[:2]
+            if decoded and frame_sizes and (width, height) not in frame_sizes:
+                # frames.npy 는 (N, H, W, 3) 하나의 배열이므로 크기가 섞이면 받지 않음 (늘려 맞추면 비율이 왜곡됨)
+                raise ValueError(
+                    f"--decoded 는 모든 프레임 크기가 같아야 합니다: {frame_sizes.pop()} / {(width, height)} "
+                    f"(t={timestamp:.2f}초) - 원본 크기를 맞추거나 --decoded 없이 만들 것"
+                )
+            frame_sizes.add((width, height))
+            data.write(raw)
+            data_b64.write(encoded)
+            entries.append((offset, len(raw), b64_offset, len(encoded), timestamp, width, height))
+            offset += len(raw)
+            b64_offset += len(encoded)
+    if not entries:
+        raise ValueError(f"프레임을 읽지 못했습니다: {source}")
+
+    index = np.array(entries, dtype=INDEX_DTYPE)
+    np.save(os.path.join(output, 'index.npy'), index)
+
+    decoded_shape = None
+    if decoded:
+        (width, height), = frame_sizes
+        decoded_shape = (len(index), height, width, 3)
+        frames = np.lib.format.open_memmap(os.path.join(output, 'frames.npy'), mode='w+',
+                                           dtype=np.uint8, shape=decoded_shape)
+        data = np.memmap(os.path.join(output, 'frames.bin'), dtype=np.uint8, mode='r')
+        for i, entry in enumerate(index):
+            frames[i] = cv2.imdecode(data[entry['offset']:entry['offset'] + entry['length']], cv2.IMREAD_COLOR)
+        frames.flush()
+        del frames, data
+
+    with open(os.path.join(output, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': CORPUS_VERSION,
+            'source': os.path.abspath(source),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'count': len(index),
+            'every': every,
+            'max_dimension': max_dimension,
+            'jpeg_quality': quality,
+            'jpeg_bytes': offset,
+            'base64_bytes': b64_offset,
+            'decoded_shape': decoded_shape,
+        }, f, indent=2, ensure_ascii=False)
+
+    print(
+        f"코퍼스 저장: {output} - 프레임 {len(index)}장 (원본 JPEG 재사용 {reused}장), "
+        f"JPEG {offset / 1e6:.1f}MB" + (f", 디코딩 {np.prod(decoded_shape) / 1e6:.1f}MB" if decoded_shape else '')
+        + f" ({time.time() - started:.1f}초)"
+    )
+
+
+def print_info(path):
+    corpus = FrameCorpus(path)
+    lengths = corpus.index['length']
+    sizes = sorted(set(zip(corpus.index['width'].tolist(), corpus.index['height'].tolist())))
+    print(json.dumps(corpus.meta, indent=2, ensure_ascii=False))
+    print(f"프레임 {len(corpus)}장, 크기 {sizes[:5]}{' ...' if len(sizes) > 5 else ''}, "
+          f"JPEG 평균 {lengths.mean() / 1024:.1f}KB (최대 {lengths.max() / 1024:.1f}KB), "
+          f"시간 {corpus.timestamps[0]:.2f}~{corpus.timestamps[-1]:.2f}초, 디코딩 프레임 {'있음' if corpus.has_decoded else '없음'}")
+
+
+def main():
+    if len(sys.argv) == 1:
+        # 인자 없이 실행하면 기존과 동일하게 동작
+        image_to_base64('./test_face_image.jpg', 'base64_output.txt')
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    to_base64 = commands.add_parser('base64', help='단일 이미지를 Base64 텍스트로 저장')
+    to_base64.add_argument('image', nargs='?', default='./test_face_image.jpg')
+    to_base64.add_argument('-o', '--output', default='base64_output.txt')
 
-image_path = './test_face_image.jpg' # 실제 이미지 파일 경로로 변경하세요
-output_file = 'base64_output.txt' # Base64 문자열을 저장할 파일 이름
+    build = commands.add_parser('build', help='동영상/이미지 디렉터리로 코퍼스 생성')
+    build.add_argument('source', help='동영상 파일 또는 이미지 디렉터리')
+    build.add_argument('output', help='코퍼스 디렉터리')
+    build.add_argument('--every', type=int, default=1, help='N 프레임마다 1장 사용')
+    build.add_argument('--fps', type=float, default=10.0, help='이미지 디렉터리의 타임스탬프 간격 기준')
+    build.add_argument('--max-frames', type=int, default=10000)
+    build.add_argument('--max-dimension', type=int, default=1280, help='긴 변 최대 길이 (0: 원본 유지)')
+    build.add_argument('--quality', type=int, default=80, help='다시 인코딩할 때의 JPEG 품질')
+    build.add_argument('--decoded', action='store_true', help='디코딩된 프레임 frames.npy 도 저장')
 
-try:
-    with open(image_path, "rb") as image_file:
-        encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
+    info = commands.add_parser('info', help='코퍼스 정보 출력')
+    info.add_argument('path')
 
-    with open(output_file, "w") as text_file:
-        text_file.write(encoded_string)
+    args = parser.parse_args()
+    if args.command == 'base64':
+        image_to_base64(args.image, args.output)
+    elif args.command == 'build':
+        build_corpus(args.source, args.output, every=max(1, args.every), fps=args.fps, max_frames=args.max_frames,
+                     max_dimension=args.max_dimension, quality=args.quality, decoded=args.decoded)
+    else:
+        print_info(args.path)
 
-    print(f"이미지 '{image_path}'가 Base64로 인코딩되어 '{output_file}'에 저장되었습니다.")
-    # print("\nBase64 String (일부):") # 너무 길어서 일부만 출력 (선택 사항)
-    # print(encoded_string[:200] + "...")
 
-except FileNotFoundError:
-    print(f"오류: 이미지 파일 '{image_path}'를 찾을 수 없습니다.")
-except Exception as e:
-    print(f"오류 발생: {e}")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,465 @@
+"""녹화 세션 재생 부하 생성기 (오프라인, asyncio)
+
+여러 가상 교실(웹소켓 연결)이 녹화된 세션의 메시지를 원래 시간 간격대로(또는 N배속으로) 다시 보내고,
+모드별 응답 지연/처리량/오류율을 집계한다. 기본으로 프로세스 안에서 서버를 띄우며
+(입장 인원 관리는 Redis 대신 프로세스 내 저장소), --url 로 이미 실행 중인 로컬 서버를 대상으로 할 수도 있다.
+
+세션 녹화 (server/ 에서 녹화 모드로 서버 실행 후 실제 클라이언트로 모드를 한 번씩 진행):
+    SPOTLIGHT_SESSION_RECORDING=1 SPOTLIGHT_ADMISSION_BACKEND=local uvicorn api.main:app
+
+사용법 (server/ 에서):
+    python test/replay_load.py recordings/*.jsonl --classrooms 20 --speed 2
+    python test/replay_load.py recordings/*.jsonl --url ws://localhost:8000/ws/animation --ramp 10
+    # 녹화 없이: 이미지 디렉터리/동영상/프레임 코퍼스로 클라이언트 동작(캡처 프로파일 fps 준수)을 흉내
+    python test/replay_load.py --synthesize handpick curtain --frames class.mp4 --classrooms 6
+
+지연 항목 (ms):
+    입장 응답   check_availability -> availability_response
+    시작 응답   start_animation(startAnimation) -> animation_start
+    프레임 왕복 프레임 전송 -> 그 프레임의 frame_ref 가 실린 결과 수신
+    서버 처리   frame_ref.timings.server_ms (서버 수신 -> 결과 전송)
+    애니메이션  시작 요청 -> animation_complete (초)
+"""
+import os
+import sys
+import glob
+import json
+import time
+import base64
+import asyncio
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+
+from frame_to_base64 import FrameCorpus, is_corpus
+
+# 클라이언트가 직접 완료를 알려야 하는 모드와 그때까지의 대기 시간 (초, 합성 세션용)
+CLIENT_COMPLETED_MODES = {'roulette': 8.0}
+# 합성 세션: 대기 화면에서 머무는 시간 (초)
+SYNTHETIC_LOBBY_SECONDS = 2.0
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+# --- 세션 ---
+
+class Session:
+    """재생할 메시지 목록 [(t 초, 메시지 dict)] 과 모드"""
+
+    def __init__(self, name, events):
+        self.name = name
+        self.events = events
+        self.mode = next((message['mode'] for _, message in events if message.get('mode')), None)
+
+    @property
+    def duration(self):
+        return self.events[-1][0] if self.events else 0.0
+
+
+def load_session(path):
+    """SessionRecorder 가 기록한 JSONL (첫 줄 헤더) 읽기"""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('version') != 1:
+            raise ValueError(f"지원하지 않는 녹화 형식: {path} ({header})")
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                events.append((entry['t'], entry['message']))
+    return Session(os.path.basename(path), events)
+
+
+def load_frames(source, max_frames, max_dimension=1280, quality=80):
+    """이미지 디렉터리 또는 동영상 -> Base64 JPEG 목록 (클라이언트 전송 형식)
+
+    프레임 코퍼스 디렉터리면 다시 인코딩하지 않고 메모리 맵에서 필요한 프레임만 꺼낸다.
+    """
+    if is_corpus(source):
+        return FrameCorpus(source).base64_frames()
+    def encode(frame):
+        scale = min(1.0, max_dimension / max(frame.shape[:2]))
+        if scale < 1.0:
+            frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return base64.b64encode(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])[1]).decode('ascii')
+
+    frames = []
+    if os.path.isdir(source):
+        for path in sorted(os.listdir(source)):
+            if path.lower().endswith(IMAGE_EXTENSIONS) and len(frames) < max_frames:
+                image = cv2.imread(os.path.join(source, path))
+                if image is not None:
+                    frames.append(encode(image))
+    else:
+        capture = cv2.VideoCapture(source)
+        while len(frames) < max_frames:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(encode(frame))
+        capture.release()
+    if not frames:
+        raise ValueError(f"프레임을 읽지 못했습니다: {source}")
+    return frames
+
+
+# --- 집계 ---
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class ModeStats:
+    """모드별 집계 (여러 교실 합산)"""
+
+    LATENCIES = (('availability', '입장 응답', 'ms'), ('start', '시작 응답', 'ms'),
+                 ('frame_echo', '프레임 왕복', 'ms'), ('server', '서버 처리', 'ms'), ('animation', '애니메이션', 's'))
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.classrooms = 0
+        self.rejected = 0
+        self.started = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.stale_echoes = 0
+        self.errors = {}
+        self.latencies = {name: [] for name, _, _ in self.LATENCIES}
+        self.sent = [0, 0, 0]       # 메시지 수, 바이트, 프레임 수
+        self.received = [0, 0]      # 메시지 수, 바이트
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def report(self, elapsed):
+        errors = sum(self.errors.values())
+        lines = [
+            f"[{self.mode}] 교실 {self.classrooms} (입장 거부 {self.rejected}), 애니메이션 {self.completed}/{self.started} 완료, "
+            f"시간 초과 {self.timeouts}, 오류 {errors} ({errors / max(1, self.classrooms) * 100:.1f}%/교실)"
+            + (f" {self.errors}" if self.errors else '')
+        ]
+        for name, label, unit in self.LATENCIES:
+            values = self.latencies[name]
+            if values:
+                lines.append(
+                    f"  {label:<6} p50 {percentile(values, 50):8.1f}{unit}  p95 {percentile(values, 95):8.1f}{unit}  "
+                    f"p99 {percentile(values, 99):8.1f}{unit}  (n={len(values)})"
+                )
+        lines.append(
+            f"  처리량  송신 {self.sent[0] / elapsed:7.1f} msg/s {self.sent[1] / elapsed / 1e6:6.2f} MB/s "
+            f"(프레임 {self.sent[2] / elapsed:.1f}/s) | 수신 {self.received[0] / elapsed:7.1f} msg/s "
+            f"{self.received[1] / elapsed / 1e6:6.2f} MB/s"
+            + (f" | 이전 감지 결과 사용 {self.stale_echoes}회" if self.stale_echoes else '')
+        )
+        return '\n'.join(lines)
+
+    def to_dict(self, elapsed):
+        return {
+            'classrooms': self.classrooms,
+            'rejected': self.rejected,
+            'started': self.started,
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'latency': {
+                name: {'p50': percentile(v, 50), 'p95': percentile(v, 95), 'p99': percentile(v, 99), 'n': len(v)}
+                for name, v in self.latencies.items() if v
+            },
+            'sent_per_second': {'messages': self.sent[0] / elapsed, 'bytes': self.sent[1] / elapsed,
+                                'frames': self.sent[2] / elapsed},
+            'received_per_second': {'messages': self.received[0] / elapsed, 'bytes': self.received[1] / elapsed},
+        }
+
+
+# --- 가상 교실 ---
+
+class VirtualClassroom:
+    """웹소켓 연결 하나: 세션 메시지를 보내고 응답을 분류해 ModeStats 에 기록"""
+
+    def __init__(self, index, mode, stats, args):
+        self.index = index
+        self.mode = mode
+        self.stats = stats
+        self.args = args
+        self.frame_seq = 0
+        # frame_seq -> 전송 시각 (perf_counter 초)
+        self.frame_sent_at = {}
+        self.availability_sent_at = None
+        self.start_sent_at = None
+        self.admitted = asyncio.Event()
+        self.rejected = False
+        self.completed = asyncio.Event()
+        # 서버가 요청한 프레임 전송 속도 (capture_profile, 합성 세션용)
+        self.fps = 0
+
+    def reset(self):
+        """다음 반복(새 연결) 전에 연결별 상태 초기화"""
+        self.frame_sent_at.clear()
+        self.availability_sent_at = None
+        self.start_sent_at = None
+        self.admitted.clear()
+        self.rejected = False
+        self.completed.clear()
+        self.fps = 0
+
+    # 송신
+
+    async def send(self, ws, message):
+        message = dict(message)
+        now = time.perf_counter()
+        message_type = message.get('type')
+        if message_type == 'check_availability':
+            self.availability_sent_at = now
+        elif message_type == 'start_animation' and message.get('startAnimation'):
+            self.start_sent_at = now
+            self.stats.started += 1
+        if 'frame' in message:
+            # 결과 메시지의 frame_ref 로 왕복 지연을 계산하도록 순번/캡처 시각을 새로 붙임
+            self.frame_seq += 1
+            message['frame_seq'] = self.frame_seq
+            message['capture_ts'] = now * 1000
+            self.frame_sent_at[self.frame_seq] = now
+            self.stats.sent[2] += 1
+        text = json.dumps(message, separators=(',', ':'))
+        self.stats.sent[0] += 1
+        self.stats.sent[1] += len(text)
+        await ws.send(text)
+
+    # 수신
+
+    async def receive(self, ws):
+        async for text in ws:
+            now = time.perf_counter()
+            self.stats.received[0] += 1
+            self.stats.received[1] += len(text)
+            self.handle(json.loads(text), now)
+
+    def handle(self, message, now):
+        message_type = message.get('type')
+        if message_type == 'animation_timeline':
+            for event in message.get('events', []):
+                self.handle(event['message'], now)
+            return
+
+        frame_ref = message.get('frame_ref')
+        if frame_ref is not None:
+            sent_at = self.frame_sent_at.get(frame_ref.get('seq'))
+            if sent_at is not None:
+                self.stats.latencies['frame_echo'].append((now - sent_at) * 1000)
+            self.stats.latencies['server'].append(frame_ref['timings']['server_ms'])
+            if frame_ref.get('stale'):
+                self.stats.stale_echoes += 1
+
+        if message_type == 'availability_response':
+            if self.availability_sent_at is not None:
+                self.stats.latencies['availability'].append((now - self.availability_sent_at) * 1000)
+                self.availability_sent_at = None
+            if message.get('allowed'):
+                self.admitted.set()
+            else:
+                self.rejected = True
+                self.stats.rejected += 1
+                self.admitted.set()
+        elif message_type == 'animation_start' and self.start_sent_at is not None:
+            self.stats.latencies['start'].append((now - self.start_sent_at) * 1000)
+        elif message_type == 'animation_complete':
+            if self.start_sent_at is not None:
+                self.stats.latencies['animation'].append(now - self.start_sent_at)
+                self.stats.completed += 1
+                self.start_sent_at = None
+            self.completed.set()
+        elif message_type == 'capture_profile':
+            self.fps = message.get('fps', 0)
+        elif message_type == 'error':
+            self.stats.error('server_error')
+
+    # 실행
+
+    async def run(self, url, play):
+        import websockets
+
+        self.stats.classrooms += 1
+        try:
+            async with websockets.connect(url, max_size=None, open_timeout=self.args.connect_timeout) as ws:
+                receiver = asyncio.create_task(self.receive(ws))
+                try:
+                    await play(ws)
+                    await self.wait_completion()
+                except asyncio.TimeoutError:
+                    # 입장 응답을 받지 못함
+                    self.stats.error('no_availability_response')
+                finally:
+                    receiver.cancel()
+                    await asyncio.gather(receiver, return_exceptions=True)
+        except (OSError, asyncio.TimeoutError) as e:
+            self.stats.error(f'connect:{type(e).__name__}')
+        except websockets.ConnectionClosed as e:
+            self.stats.error(f'closed:{e.code}')
+
+    async def wait_completion(self):
+        """시작한 애니메이션이 끝날 때까지 대기 (tail_timeout 초과 시 시간 초과로 집계)"""
+        if self.start_sent_at is None or self.completed.is_set():
+            return
+        try:
+            await asyncio.wait_for(self.completed.wait(), self.args.tail_timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+
+    async def replay(self, ws, session):
+        """녹화된 시간 간격을 speed 배로 줄여 메시지 전송 (입장이 거부되면 중단)"""
+        started = time.perf_counter()
+        for t, message in session.events:
+            delay = started + t / self.args.speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.rejected:
+                return
+            if message.get('type') == 'start_animation' and message.get('startAnimation'):
+                # 입장 응답을 받기 전에는 시작하지 않음 (실제 클라이언트와 동일)
+                await asyncio.wait_for(self.admitted.wait(), self.args.tail_timeout)
+                if self.rejected:
+                    return
+                self.completed.clear()
+            await self.send(ws, message)
+
+    async def synthesize(self, ws, frames):
+        """클라이언트 동작 흉내: 입장 -> 대기 화면 -> 시작 -> 서버가 요청한 fps 로 프레임 전송 -> 완료"""
+        await self.send(ws, {'type': 'check_availability', 'mode': self.mode})
+        await asyncio.wait_for(self.admitted.wait(), self.args.tail_timeout)
+        if self.rejected:
+            return
+        cursor = self.index * 7
+        lobby_until = time.perf_counter() + SYNTHETIC_LOBBY_SECONDS
+        while time.perf_counter() < lobby_until:
+            if self.fps > 0:
+                await self.send(ws, {'type': 'start_animation', 'mode': self.mode, 'frame': frames[cursor % len(frames)]})
+                cursor += 1
+            await asyncio.sleep(1 / self.fps if self.fps > 0 else 0.1)
+
+        await self.send(ws, {'type': 'start_animation', 'mode': self.mode, 'frame': frames[cursor % len(frames)],
+                             'startAnimation': True})
+        client_done_at = None
+        if self.mode in CLIENT_COMPLETED_MODES:
+            client_done_at = time.perf_counter() + CLIENT_COMPLETED_MODES[self.mode]
+        deadline = time.perf_counter() + self.args.tail_timeout
+        while not self.completed.is_set() and time.perf_counter() < deadline:
+            if client_done_at is not None and time.perf_counter() >= client_done_at:
+                await self.send(ws, {'type': 'animation_complete_client', 'mode': self.mode, 'winnerIndex': 0})
+                client_done_at = None
+            if self.fps > 0:
+                cursor += 1
+                await self.send(ws, {'type': 'start_animation', 'mode': self.mode, 'frame': frames[cursor % len(frames)]})
+            try:
+                await asyncio.wait_for(self.completed.wait(), 1 / self.fps if self.fps > 0 else 0.1)
+            except asyncio.TimeoutError:
+                pass
+
+
+# --- 프로세스 내 서버 ---
+
+def start_local_server():
+    """별도 스레드(자체 이벤트 루프)에서 uvicorn 실행 후 (server, ws_url) 반환"""
+    # 설정은 임포트 시점에 읽히므로 앱 임포트 전에 지정 (Redis 없이 실행)
+    os.environ.setdefault('SPOTLIGHT_ADMISSION_BACKEND', 'local')
+    import uvicorn
+    from api.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=0, log_level='warning'))
+    thread = threading.Thread(target=server.run, name='replay-server', daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("프로세스 내 서버 시작 실패")
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, thread, f"ws://127.0.0.1:{port}/ws/animation"
+
+
+# --- 실행 ---
+
+async def run_load(args, url, plans):
+    """plans: [(mode, 재생 함수 생성기)] 를 교실 수만큼 ramp 동안 나눠 시작"""
+    stats = {}
+    tasks = []
+    started = time.perf_counter()
+    for index in range(args.classrooms):
+        mode, make_play = plans[index % len(plans)]
+        mode_stats = stats.setdefault(mode, ModeStats(mode))
+        classroom = VirtualClassroom(index, mode, mode_stats, args)
+
+        async def classroom_loop(classroom=classroom, make_play=make_play, delay=args.ramp * index / args.classrooms):
+            await asyncio.sleep(delay)
+            for _ in range(args.loops):
+                await classroom.run(url, make_play(classroom))
+                classroom.reset()
+
+        tasks.append(asyncio.create_task(classroom_loop()))
+    await asyncio.gather(*tasks)
+    return stats, time.perf_counter() - started
+
+
+def build_plans(args):
+    if args.synthesize:
+        if not args.frames:
+            raise SystemExit("--synthesize 에는 --frames (이미지 디렉터리 또는 동영상) 가 필요합니다.")
+        frames = load_frames(args.frames, args.max_frames)
+        print(f"합성 세션: 모드 {', '.join(args.synthesize)}, 프레임 {len(frames)}장")
+        return [(mode, lambda classroom: (lambda ws: classroom.synthesize(ws, frames))) for mode in args.synthesize]
+
+    paths = sorted(path for pattern in args.sessions for path in glob.glob(pattern))
+    if not paths:
+        raise SystemExit("재생할 세션 파일이 없습니다 (녹화 파일 경로 또는 --synthesize 지정).")
+    sessions = [load_session(path) for path in paths]
+    for session in sessions:
+        frames = sum(1 for _, message in session.events if 'frame' in message)
+        print(f"세션 {session.name}: 모드 {session.mode}, 메시지 {len(session.events)}개 (프레임 {frames}), {session.duration:.1f}초")
+    return [(session.mode or 'unknown', lambda classroom, s=session: (lambda ws: classroom.replay(ws, s)))
+            for session in sessions]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sessions', nargs='*', help='녹화 세션 파일 (glob 가능, 교실마다 순서대로 배정)')
+    parser.add_argument('--synthesize', nargs='+', metavar='MODE', help='녹화 대신 합성 세션으로 실행할 모드')
+    parser.add_argument('--frames', help='합성 세션 프레임 원본 (이미지 디렉터리, 동영상 또는 프레임 코퍼스)')
+    parser.add_argument('--max-frames', type=int, default=300)
+    parser.add_argument('--url', help='대상 서버 웹소켓 주소 (없으면 프로세스 내 서버 실행)')
+    parser.add_argument('--classrooms', type=int, default=4, help='동시 가상 교실 수')
+    parser.add_argument('--speed', type=float, default=1.0, help='녹화 재생 배속')
+    parser.add_argument('--ramp', type=float, default=0.0, help='교실 시작을 나눠 배치할 시간 (초)')
+    parser.add_argument('--loops', type=int, default=1, help='교실별 세션 반복 횟수')
+    parser.add_argument('--tail-timeout', type=float, default=60.0, help='애니메이션 완료 최대 대기 (초)')
+    parser.add_argument('--connect-timeout', type=float, default=10.0)
+    parser.add_argument('--json', help='결과를 JSON 파일로 저장')
+    args = parser.parse_args()
+
+    plans = build_plans(args)
+    server = None
+    url = args.url
+    if url is None:
+        server, thread, url = start_local_server()
+        print(f"프로세스 내 서버: {url} (입장 관리 {os.environ['SPOTLIGHT_ADMISSION_BACKEND']})")
+
+    print(f"교실 {args.classrooms}개, {args.speed}배속, ramp {args.ramp}초, 반복 {args.loops}회 -> {url}")
+    try:
+        stats, elapsed = asyncio.run(run_load(args, url, plans))
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    print(f"\n=== 결과 ({elapsed:.1f}초) ===")
+    for mode_stats in stats.values():
+        print(mode_stats.report(elapsed))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed': elapsed, 'modes': {mode: s.to_dict(elapsed) for mode, s in stats.items()}},
+                      f, indent=2, ensure_ascii=False)
+        print(f"결과 저장: {args.json}")
+
+
+if __name__ == '__main__':
+    main()
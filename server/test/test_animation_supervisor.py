@@ -0,0 +1,101 @@
+"""AnimationSupervisor: 재시작 시 취소, 누수 집계, 완료 정리 (모델 불필요)"""
+import asyncio
+
+from api.services.animation_supervisor import AnimationSupervisor
+
+
+async def _forever(started):
+    started.set()
+    await asyncio.sleep(3600)
+
+
+async def _ignores_cancel(started, release):
+    """취소를 삼키고 release 될 때까지 계속 실행되는 태스크 (누수 재현)"""
+    started.set()
+    while not release.is_set():
+        try:
+            await release.wait()
+        except asyncio.CancelledError:
+            pass
+
+
+def test_cancel_stops_previous_animation_on_restart():
+    async def scenario():
+        supervisor = AnimationSupervisor(cancel_grace=1.0)
+        started = asyncio.Event()
+        old = supervisor.spawn('a', _forever(started))
+        await started.wait()
+        other = supervisor.spawn('b', _forever(asyncio.Event()))
+
+        # 같은 클라이언트가 새 애니메이션을 시작하기 전 이전 태스크 취소
+        assert await supervisor.cancel('a') == 0
+        assert old.cancelled()
+        assert not supervisor.is_active('a')
+        assert supervisor.is_active('b')
+        assert 'a' not in supervisor.tasks
+
+        await supervisor.cancel_all()
+        assert other.cancelled()
+        return supervisor.report()
+
+    report = asyncio.run(scenario())
+    assert report == {
+        'clients': 0, 'running': 0, 'started': 2, 'completed': 0,
+        'cancelled': 2, 'leaked_total': 0, 'leaked_now': 0,
+    }
+
+
+def test_task_ignoring_cancel_is_counted_as_leaked():
+    async def scenario():
+        supervisor = AnimationSupervisor(cancel_grace=0.05)
+        started, release = asyncio.Event(), asyncio.Event()
+        task = supervisor.spawn('a', _ignores_cancel(started, release))
+        await started.wait()
+
+        assert await supervisor.cancel('a') == 1
+        assert task in supervisor.leaked_tasks
+        assert supervisor.report()['leaked_now'] == 1
+        assert supervisor.report()['leaked_total'] == 1
+
+        # 뒤늦게 끝나면 현재 누수 목록과 클라이언트 태스크에서 빠지고 누적 수만 남음
+        release.set()
+        await task
+        assert task not in supervisor.leaked_tasks
+        return supervisor.report()
+
+    report = asyncio.run(scenario())
+    assert report['leaked_now'] == 0
+    assert report['leaked_total'] == 1
+    assert report['clients'] == 0
+    assert report['completed'] == 1
+
+
+def test_finished_tasks_are_removed_and_errors_retrieved(capsys):
+    async def fail():
+        raise RuntimeError('boom')
+
+    async def scenario():
+        supervisor = AnimationSupervisor()
+        done = supervisor.spawn('a', asyncio.sleep(0))
+        failed = supervisor.spawn('a', fail())
+        await asyncio.wait([done, failed])
+        await asyncio.sleep(0)
+        return supervisor
+
+    supervisor = asyncio.run(scenario())
+    assert supervisor.tasks == {}
+    assert supervisor.report()['completed'] == 2
+    assert 'boom' in capsys.readouterr().out
+
+
+def test_cancel_skips_the_calling_task():
+    async def scenario():
+        supervisor = AnimationSupervisor(cancel_grace=0.05)
+
+        async def restart_self():
+            # 애니메이션 태스크 안에서 자기 클라이언트를 취소해도 자신은 취소되지 않음
+            return await supervisor.cancel('a')
+
+        return await supervisor.spawn('a', restart_self())
+
+    assert asyncio.run(scenario()) == 0
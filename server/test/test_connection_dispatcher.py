@@ -0,0 +1,105 @@
+"""ConnectionDispatcher / FrameMailbox: 최신 프레임만 처리, 수신 순번 부여 (모델 불필요)"""
+import asyncio
+import json
+
+from api.services.connection_dispatcher import ConnectionDispatcher, FrameMailbox, is_frame_update
+from api.services.metered_websocket import TrafficStats
+from src.tracing import SessionTrace
+
+
+class _Disconnect(Exception):
+    pass
+
+
+class _FakeWebSocket:
+    """보낸 메시지를 순서대로 돌려주고, 소비자 태스크가 처리할 시간을 준 뒤 연결 종료"""
+
+    def __init__(self, messages):
+        self._messages = [json.dumps(message) for message in messages]
+        self.traffic = TrafficStats()
+        self.trace = SessionTrace(id(self), enabled=False)
+
+    async def receive_text(self):
+        if self._messages:
+            return self._messages.pop(0)
+        await asyncio.sleep(0.05)
+        raise _Disconnect()
+
+
+class _FakeService:
+    def __init__(self):
+        self.lobby_modes = {}
+        self.controls = []
+        self.frames = []
+
+    async def handle_animation(self, websocket, data):
+        self.controls.append(data)
+
+    async def handle_frame_update(self, client_id, data):
+        self.frames.append(data)
+
+
+def _frame(n):
+    return {'type': 'start_animation', 'mode': 'curtain', 'frame': f'frame-{n}'}
+
+
+def test_mailbox_keeps_only_latest_frame():
+    async def scenario():
+        mailbox = FrameMailbox()
+        assert mailbox.put('a') is False
+        assert mailbox.put('b') is True
+        assert mailbox.put('c') is True
+        assert mailbox.dropped == 2
+        assert await mailbox.get() == 'c'
+        # 비운 뒤 넣은 프레임은 버려진 것으로 세지 않음
+        assert mailbox.put('d') is False
+        assert await mailbox.get() == 'd'
+
+    asyncio.run(scenario())
+
+
+def test_mailbox_get_waits_for_next_put():
+    async def scenario():
+        mailbox = FrameMailbox()
+        getter = asyncio.create_task(mailbox.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+        mailbox.put('x')
+        assert await asyncio.wait_for(getter, 1) == 'x'
+
+    asyncio.run(scenario())
+
+
+def test_is_frame_update():
+    assert is_frame_update(_frame(1))
+    assert not is_frame_update({**_frame(1), 'startAnimation': True})
+    assert not is_frame_update({'type': 'check_availability', 'mode': 'curtain'})
+
+
+def test_dispatcher_routes_latest_frame_and_orders_seq():
+    messages = [
+        {'type': 'check_availability', 'mode': 'curtain'},
+        _frame(1),
+        _frame(2),
+        _frame(3),
+        {'type': 'stop_animation', 'mode': 'curtain'},
+    ]
+    service = _FakeService()
+    websocket = _FakeWebSocket(messages)
+    dispatcher = ConnectionDispatcher(websocket, service)
+
+    async def scenario():
+        try:
+            await dispatcher.run()
+        except _Disconnect:
+            pass
+
+    asyncio.run(scenario())
+
+    # 제어 메시지는 모두 순서대로, 수신 순번은 메시지 도착 순서
+    assert [data['type'] for data in service.controls] == ['check_availability', 'stop_animation']
+    assert [data['_seq'] for data in service.controls] == [1, 5]
+    # 연속으로 도착한 프레임은 마지막 것만 처리되고 앞의 두 장은 버려짐
+    assert [data['frame'] for data in service.frames] == ['frame-3']
+    assert service.frames[0]['_seq'] == 4
+    assert dispatcher.frames.dropped == 2
@@ -0,0 +1,102 @@
+"""WorkloadScheduler: 우선순위/클라이언트 공정성/취소 (모델 불필요)"""
+import asyncio
+import threading
+
+from src import metrics
+from src.inference import (
+    WorkloadScheduler,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_REFRESH,
+    PRIORITY_SPECULATIVE,
+)
+
+
+async def _with_blocked_worker(scheduler, submit_jobs, after_queued=None):
+    """워커 1개를 막아 둔 상태에서 작업을 대기열에 쌓은 뒤 풀어 주고, 실행 순서를 반환"""
+    gate = threading.Event()
+    order = []
+    blocker = asyncio.create_task(scheduler.submit(gate.wait, ()))
+    await asyncio.sleep(0)
+    tasks = submit_jobs(order)
+    await asyncio.sleep(0)
+    if after_queued is not None:
+        after_queued(tasks)
+        await asyncio.sleep(0)
+    gate.set()
+    await blocker
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return order
+
+
+def _job(scheduler, order, label, priority=PRIORITY_REFRESH, client_id=None):
+    return asyncio.create_task(scheduler.submit(order.append, (label,), priority=priority, client_id=client_id))
+
+
+def test_higher_priority_runs_first():
+    scheduler = WorkloadScheduler('test_priority', 1)
+
+    def submit_jobs(order):
+        return [
+            _job(scheduler, order, 'speculative', PRIORITY_SPECULATIVE),
+            _job(scheduler, order, 'refresh', PRIORITY_REFRESH),
+            _job(scheduler, order, 'interactive', PRIORITY_INTERACTIVE),
+        ]
+
+    order = asyncio.run(_with_blocked_worker(scheduler, submit_jobs))
+    assert order == ['interactive', 'refresh', 'speculative']
+    assert scheduler.load() == 0
+
+
+def test_clients_are_served_round_robin():
+    scheduler = WorkloadScheduler('test_round_robin', 1)
+
+    def submit_jobs(order):
+        # 클라이언트 a 가 먼저 세 개를 쌓아도 b 가 사이사이 실행됨
+        return [
+            _job(scheduler, order, 'a1', client_id='a'),
+            _job(scheduler, order, 'a2', client_id='a'),
+            _job(scheduler, order, 'a3', client_id='a'),
+            _job(scheduler, order, 'b1', client_id='b'),
+            _job(scheduler, order, 'b2', client_id='b'),
+        ]
+
+    order = asyncio.run(_with_blocked_worker(scheduler, submit_jobs))
+    assert order == ['a1', 'b1', 'a2', 'b2', 'a3']
+
+
+def test_cancelled_queued_job_is_dropped():
+    scheduler = WorkloadScheduler('test_cancel', 1)
+
+    def submit_jobs(order):
+        return [
+            _job(scheduler, order, 'kept-1', client_id='a'),
+            _job(scheduler, order, 'cancelled', client_id='b'),
+            _job(scheduler, order, 'kept-2', client_id='a'),
+        ]
+
+    def cancel_second(tasks):
+        # 대기열에 들어간 뒤(실행 전) 호출자가 취소
+        assert scheduler.load() == 4
+        tasks[1].cancel()
+
+    order = asyncio.run(_with_blocked_worker(scheduler, submit_jobs, cancel_second))
+    assert order == ['kept-1', 'kept-2']
+    assert scheduler.load() == 0
+
+
+def test_queue_wait_is_recorded_per_priority(monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', True)
+    scheduler = WorkloadScheduler('test_wait', 1)
+
+    def submit_jobs(order):
+        return [
+            _job(scheduler, order, 'interactive', PRIORITY_INTERACTIVE),
+            _job(scheduler, order, 'speculative', PRIORITY_SPECULATIVE),
+        ]
+
+    asyncio.run(_with_blocked_worker(scheduler, submit_jobs))
+    report = scheduler.report()['queue_wait']
+    assert report['interactive']['count'] == 1
+    assert report['refresh']['count'] == 1   # 워커를 막아 둔 작업
+    assert report['speculative']['count'] == 1
+    assert metrics.QUEUE_WAIT_SECONDS.count('test_wait', 'speculative') == 1
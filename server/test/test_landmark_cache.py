@@ -0,0 +1,97 @@
+"""LandmarkCache: IoU 매칭과 박스/픽셀 안정성 기준 랜드마크 재사용 (모델 불필요)"""
+import asyncio
+
+import numpy as np
+
+from src.landmarks import LandmarkCache, MAX_TRACKS, _box_iou
+
+
+class _Predictor:
+    """호출된 박스를 기록하고 박스별 가짜 랜드마크 반환"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, frame, boxes, client_id=None):
+        self.calls.append(list(boxes))
+        return [np.full((68, 2), box[0], dtype=int) for box in boxes]
+
+
+def _frame():
+    # 부드러운 그라디언트 (박스가 1px 움직여도 얼굴 패치는 거의 같음)
+    xs = np.linspace(0, 200, 640)[None, :]
+    ys = np.linspace(0, 50, 360)[:, None]
+    gray = (xs + ys).astype(np.uint8)
+    return np.repeat(gray[:, :, None], 3, axis=2)
+
+
+def _get(cache, frame, boxes):
+    return asyncio.run(cache.get_many(frame, boxes))
+
+
+def test_box_iou():
+    assert _box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert _box_iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+    assert _box_iou((0, 0, 10, 10), (5, 0, 10, 10)) == 50 / 150
+
+
+def test_still_face_is_reused():
+    predictor = _Predictor()
+    cache = LandmarkCache(predictor, client_id=1)
+    frame = _frame()
+    first = _get(cache, frame, [(100, 100, 80, 80)])
+    # 박스가 1px 움직인 정도는 같은 얼굴, 같은 랜드마크
+    second = _get(cache, frame, [np.array([101, 100, 80, 80])])
+    assert predictor.calls == [[(100, 100, 80, 80)]]
+    assert second[0] is first[0]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_only_changed_faces_are_predicted_in_one_batch():
+    predictor = _Predictor()
+    cache = LandmarkCache(predictor)
+    frame = _frame()
+    _get(cache, frame, [(100, 100, 80, 80), (300, 100, 80, 80)])
+
+    # 두 번째 얼굴 영역의 픽셀만 바뀜 (표정 변화)
+    changed = frame.copy()
+    changed[100:180, 300:380] = 255 - changed[100:180, 300:380]
+    results = _get(cache, changed, [(100, 100, 80, 80), (300, 100, 80, 80), (500, 200, 60, 60)])
+
+    # 바뀐 얼굴과 새 얼굴만 한 번의 배치로 예측, 결과는 입력 박스 순서대로
+    assert predictor.calls[1] == [(300, 100, 80, 80), (500, 200, 60, 60)]
+    assert [int(r[0, 0]) for r in results] == [100, 300, 500]
+    assert cache.hits == 1
+
+
+def test_moved_box_below_stable_iou_is_predicted_again():
+    predictor = _Predictor()
+    cache = LandmarkCache(predictor)
+    frame = _frame()
+    _get(cache, frame, [(100, 100, 80, 80)])
+    # 같은 얼굴로 매칭되지만(IoU >= 0.5) 안정 기준(0.85) 미만 -> 다시 예측하고 기준 박스 갱신
+    _get(cache, frame, [(110, 100, 80, 80)])
+    _get(cache, frame, [(110, 100, 80, 80)])
+    assert predictor.calls == [[(100, 100, 80, 80)], [(110, 100, 80, 80)]]
+    assert len(cache._tracks) == 1
+
+
+def test_failed_landmarks_are_not_reused():
+    async def failing(frame, boxes, client_id=None):
+        calls.append(boxes)
+        return [None for _ in boxes]
+
+    calls = []
+    cache = LandmarkCache(failing)
+    frame = _frame()
+    assert _get(cache, frame, [(100, 100, 80, 80)]) == [None]
+    assert _get(cache, frame, [(100, 100, 80, 80)]) == [None]
+    assert len(calls) == 2
+
+
+def test_tracks_are_capped():
+    cache = LandmarkCache(_Predictor())
+    frame = _frame()
+    boxes = [(x * 10, 0, 8, 8) for x in range(MAX_TRACKS + 5)]
+    _get(cache, frame, boxes)
+    assert len(cache._tracks) == MAX_TRACKS
@@ -0,0 +1,97 @@
+"""render_prometheus: Prometheus 텍스트 형식 (모델 불필요)"""
+import pytest
+
+from src import metrics
+from src.metrics import Counter, Histogram, render_prometheus, mode_label, current_mode
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """전역 지표 대신 테스트 전용 지표/게이지만 렌더링"""
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', True)
+    monkeypatch.setattr(metrics, '_METRICS', [])
+    monkeypatch.setattr(metrics, '_collectors', [])
+    return metrics._METRICS
+
+
+def test_counter_format(registry):
+    frames = Counter('test_frames_total', '수신 프레임 수', ('mode', 'result'))
+    registry.append(frames)
+    frames.inc('curtain', 'received')
+    frames.inc('curtain', 'received', amount=2)
+    frames.inc('slot', 'dropped')
+
+    assert render_prometheus() == (
+        '# HELP test_frames_total 수신 프레임 수\n'
+        '# TYPE test_frames_total counter\n'
+        'test_frames_total{mode="curtain",result="received"} 3\n'
+        'test_frames_total{mode="slot",result="dropped"} 1\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    stage = Histogram('test_stage_seconds', '단계별 소요 시간', ('stage',), buckets=(0.01, 0.1, 1.0))
+    registry.append(stage)
+    for value in (0.005, 0.01, 0.05, 2.0):
+        stage.observe(value, 'decode')
+
+    lines = render_prometheus().splitlines()
+    assert lines[:2] == ['# HELP test_stage_seconds 단계별 소요 시간', '# TYPE test_stage_seconds histogram']
+    # 경계값은 해당 버킷에 포함 (le = less or equal)
+    assert lines[2:6] == [
+        'test_stage_seconds_bucket{stage="decode",le="0.01"} 2',
+        'test_stage_seconds_bucket{stage="decode",le="0.1"} 3',
+        'test_stage_seconds_bucket{stage="decode",le="1.0"} 3',
+        'test_stage_seconds_bucket{stage="decode",le="+Inf"} 4',
+    ]
+    assert lines[6] == 'test_stage_seconds_sum{stage="decode"} ' + repr(0.005 + 0.01 + 0.05 + 2.0)
+    assert lines[7] == 'test_stage_seconds_count{stage="decode"} 4'
+    assert stage.count('decode') == 4
+
+
+def test_label_values_are_escaped(registry):
+    errors = Counter('test_errors_total', '오류 수', ('kind',))
+    registry.append(errors)
+    errors.inc('bad "quote" \\ and\nnewline')
+    assert 'test_errors_total{kind="bad \\"quote\\" \\\\ and\\nnewline"} 1' in render_prometheus()
+
+
+def test_gauge_collectors(registry):
+    metrics.register_collector(lambda: [
+        ('test_queue_depth', '대기열 길이', [({'workload': 'detection'}, 3), ({'workload': 'codec'}, 0.5)]),
+        ('test_workers', '워커 수', [({}, 2)]),
+    ])
+
+    def broken():
+        raise RuntimeError('boom')
+
+    # 실패한 공급자는 건너뛰고 나머지는 그대로 출력
+    metrics.register_collector(broken)
+    assert render_prometheus() == (
+        '# HELP test_queue_depth 대기열 길이\n'
+        '# TYPE test_queue_depth gauge\n'
+        'test_queue_depth{workload="detection"} 3\n'
+        'test_queue_depth{workload="codec"} 0.5\n'
+        '# HELP test_workers 워커 수\n'
+        '# TYPE test_workers gauge\n'
+        'test_workers 2\n'
+    )
+
+
+def test_disabled_metrics_record_nothing(registry, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_ENABLED', False)
+    frames = Counter('test_frames_total', '수신 프레임 수', ('mode',))
+    registry.append(frames)
+    frames.inc('slot')
+    assert render_prometheus().splitlines()[2:] == []
+
+
+def test_mode_label_is_bounded():
+    assert mode_label('curtain') == 'curtain'
+    assert mode_label('anything-from-client') == 'other'
+    token = current_mode.set('race')
+    try:
+        assert mode_label() == 'race'
+    finally:
+        current_mode.reset(token)
+    assert mode_label() == 'none'
@@ -0,0 +1,61 @@
+"""SceneChangeGate: 변화 없는 프레임의 감지 결과 재사용과 만료 (모델 불필요)"""
+import numpy as np
+
+from src.scene_gate import SceneChangeGate, scene_thumbnail, MAX_REUSE_AGE
+
+FACES = np.array([[100, 80, 60, 60], [400, 90, 64, 64]])
+
+
+def _frame(value=120):
+    return np.full((360, 640, 3), value, dtype=np.uint8)
+
+
+def test_reuses_faces_for_unchanged_frame():
+    gate = SceneChangeGate()
+    gate.store(scene_thumbnail(_frame()), FACES, now=10.0)
+
+    reused = gate.lookup(scene_thumbnail(_frame()), now=10.5)
+    assert np.array_equal(reused, FACES)
+    # 재사용 결과는 복사본 (호출자가 수정해도 저장된 결과는 그대로)
+    reused[0, 0] = -1
+    assert np.array_equal(gate.lookup(scene_thumbnail(_frame()), now=10.6), FACES)
+    assert (gate.hits, gate.misses) == (2, 0)
+
+
+def test_small_noise_is_still_unchanged():
+    gate = SceneChangeGate()
+    gate.store(scene_thumbnail(_frame(120)), FACES, now=0.0)
+    assert gate.lookup(scene_thumbnail(_frame(121)), now=0.1) is not None
+
+
+def test_expires_after_max_reuse_age():
+    gate = SceneChangeGate()
+    thumb = scene_thumbnail(_frame())
+    gate.store(thumb, FACES, now=10.0)
+    assert gate.lookup(thumb, now=10.0 + MAX_REUSE_AGE) is not None
+    assert gate.lookup(thumb, now=10.0 + MAX_REUSE_AGE + 0.01) is None
+    assert gate.misses == 1
+
+
+def test_store_reuse_age_overrides_default():
+    gate = SceneChangeGate()
+    thumb = scene_thumbnail(_frame())
+    gate.store(thumb, FACES, now=0.0, reuse_age=5.0)
+    assert gate.lookup(thumb, now=4.0) is not None
+    # 다음 저장은 다시 기본 재사용 시간
+    gate.store(thumb, FACES, now=10.0)
+    assert gate.lookup(thumb, now=10.0 + MAX_REUSE_AGE + 0.01) is None
+
+
+def test_local_change_invalidates():
+    gate = SceneChangeGate()
+    gate.store(scene_thumbnail(_frame()), FACES, now=0.0)
+    # 한 사람만 움직여도(한 블록의 큰 변화) 전체 평균과 관계없이 다시 감지
+    moved = _frame()
+    moved[0:40, 0:40] = 255
+    assert gate.lookup(scene_thumbnail(moved), now=0.1) is None
+
+
+def test_no_reuse_before_first_store():
+    gate = SceneChangeGate()
+    assert gate.lookup(scene_thumbnail(_frame()), now=0.0) is None
@@ -0,0 +1,68 @@
+"""Timeline.compile: 이벤트 시각(오프셋)과 전체 길이 (모델 불필요)"""
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def Timeline(animation_module):
+    return animation_module('base').Timeline
+
+
+def _offsets(compiled):
+    return [(event['t'], event['message']['type']) for event in compiled['events']]
+
+
+def test_events_are_placed_at_cursor(Timeline):
+    timeline = Timeline('curtain')
+    timeline.sound('curtain/open').wait(0.3)
+    timeline.add({'type': 'curtain_intro'}).wait(0.25).wait(0.25)
+    timeline.stop_sound('curtain/open')
+
+    compiled = timeline.compile()
+    assert compiled['type'] == 'animation_timeline'
+    assert compiled['mode'] == 'curtain'
+    assert _offsets(compiled) == [(0.0, 'play_sound'), (0.3, 'curtain_intro'), (0.8, 'stop_sound')]
+    assert compiled['duration'] == 0.8
+
+
+def test_explicit_offsets_are_sorted_and_do_not_move_cursor(Timeline):
+    timeline = Timeline('scanner')
+    timeline.add({'type': 'late'}, at=2.0)
+    timeline.add({'type': 'first'})
+    timeline.wait(0.5).add({'type': 'second'})
+
+    compiled = timeline.compile()
+    assert _offsets(compiled) == [(0.0, 'first'), (0.5, 'second'), (2.0, 'late')]
+    assert timeline.cursor == 0.5
+    # 전체 길이는 커서와 마지막 이벤트 중 늦은 쪽
+    assert compiled['duration'] == 2.0
+
+
+def test_trailing_wait_extends_duration(Timeline):
+    timeline = Timeline('slot')
+    timeline.add({'type': 'slot_spin'}).wait(1.25)
+    assert timeline.compile()['duration'] == 1.25
+    assert Timeline('slot').compile() == {'type': 'animation_timeline', 'mode': 'slot', 'duration': 0.0, 'events': []}
+
+
+def test_offsets_are_rounded_to_milliseconds(Timeline):
+    timeline = Timeline('slot')
+    for _ in range(3):
+        timeline.wait(0.1)
+    timeline.add({'type': 'tick'})
+    assert _offsets(timeline.compile()) == [(0.3, 'tick')]
+
+
+def test_send_returns_duration(Timeline):
+    class Socket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_json(self, data):
+            self.sent.append(data)
+
+    socket = Socket()
+    timeline = Timeline('curtain').add({'type': 'curtain_intro'}).wait(0.6)
+    assert asyncio.run(timeline.send(socket)) == pytest.approx(0.6)
+    assert socket.sent == [timeline.compile()]